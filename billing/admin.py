@@ -1,13 +1,20 @@
 """Admin configuration for billing app."""
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
-from .models import Invoice, Payment, BillingPlan
+from core.taskqueue import enqueue
+from .forms import StatementUploadForm
+from .models import Invoice, InvoiceRun, Payment, BillingPlan
+from .pdf import render_invoice_pdfs_by_id
+from .reconciliation import reconcile_file
 
 
 @admin.register(BillingPlan)
 class BillingPlanAdmin(admin.ModelAdmin):
-    list_display = ["name", "plan_type", "is_active"]
+    list_display = ["name", "plan_type", "is_active", "version"]
     list_filter = ["plan_type", "is_active"]
 
 
@@ -25,6 +32,7 @@ class InvoiceAdmin(admin.ModelAdmin):
     search_fields = ["invoice_number", "seller__shop_name", "seller__user__email"]
     readonly_fields = ["created_at", "updated_at", "invoice_number"]
     inlines = [PaymentInline]
+    change_list_template = "admin/billing/invoice/change_list.html"
     fieldsets = (
         ("Invoice Information", {
             "fields": ("invoice_number", "seller", "amount", "billing_plan")
@@ -58,18 +66,101 @@ class InvoiceAdmin(admin.ModelAdmin):
         )
     days_until_due_display.short_description = "Days Until Due"
 
-    actions = ["mark_overdue", "mark_verified"]
+    actions = ["mark_overdue", "mark_verified", "render_pdfs"]
+
+    def get_urls(self):
+        urls = [
+            path(
+                "reconcile/",
+                self.admin_site.admin_view(self.reconcile_view),
+                name="billing_invoice_reconcile",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def reconcile_view(self, request):
+        """Upload a bank statement and match it against open invoices."""
+        if not self.has_change_permission(request):
+            return redirect("admin:billing_invoice_changelist")
+
+        if request.method == "POST":
+            form = StatementUploadForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    result = reconcile_file(
+                        form.cleaned_data["statement"],
+                        fmt=form.cleaned_data["format"] or None,
+                        verified_by=request.user,
+                    )
+                except ValueError as e:
+                    self.message_user(request, str(e), messages.ERROR)
+                else:
+                    self.message_user(
+                        request,
+                        f"{result.lines} line(s): {result.matched} invoice(s) verified, "
+                        f"{result.duplicates} already recorded, "
+                        f"{result.sellers_reactivated} seller(s) reactivated.",
+                    )
+                    if result.errors:
+                        self.message_user(
+                            request,
+                            f"{len(result.errors)} line(s) could not be read.",
+                            messages.WARNING,
+                        )
+                    context = {
+                        **self.admin_site.each_context(request),
+                        "opts": self.model._meta,
+                        "title": "Reconciliation result",
+                        "form": StatementUploadForm(),
+                        "result": result,
+                    }
+                    return TemplateResponse(
+                        request, "admin/billing/invoice/reconcile.html", context
+                    )
+        else:
+            form = StatementUploadForm()
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Reconcile bank statement",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/billing/invoice/reconcile.html", context)
 
     def mark_overdue(self, request, queryset):
         """Admin action to mark invoices as overdue."""
-        for invoice in queryset:
-            invoice.mark_overdue()
-        self.message_user(request, f"{queryset.count()} invoice(s) marked as overdue.")
+        invoices, sellers = queryset.mark_overdue()
+        self.message_user(
+            request,
+            f"{invoices} invoice(s) marked as overdue, {sellers} seller(s) suspended."
+        )
     mark_overdue.short_description = "Mark selected invoices as overdue"
 
     def mark_verified(self, request, queryset):
         """Admin action to mark invoices as verified."""
-        for invoice in queryset:
-            invoice.mark_verified()
-        self.message_user(request, f"{queryset.count()} invoice(s) marked as verified.")
+        invoices, sellers = queryset.mark_verified()
+        self.message_user(
+            request,
+            f"{invoices} invoice(s) marked as verified, {sellers} seller(s) reactivated."
+        )
     mark_verified.short_description = "Mark selected invoices as verified"
+
+    def render_pdfs(self, request, queryset):
+        """Admin action to (re-)render invoice PDFs in the background."""
+        invoice_ids = list(queryset.values_list("pk", flat=True))
+        enqueue(render_invoice_pdfs_by_id, args=[invoice_ids])
+        self.message_user(
+            request, f"PDF rendering queued for {len(invoice_ids)} invoice(s)."
+        )
+    render_pdfs.short_description = "Render PDFs for selected invoices"
+
+
+@admin.register(InvoiceRun)
+class InvoiceRunAdmin(admin.ModelAdmin):
+    list_display = ["period_start", "status", "invoices_created", "completed_at"]
+    list_filter = ["status"]
+    readonly_fields = [
+        "period_start", "period_end", "status", "last_seller_id",
+        "invoices_created", "completed_at", "created_at", "updated_at",
+    ]
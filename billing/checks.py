@@ -0,0 +1,39 @@
+"""
+System checks for billing data.
+"""
+
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ValidationError
+from django.db import connections
+
+
+@register(Tags.database)
+def check_billing_plans(app_configs, databases=None, **kwargs):
+    """
+    Report active plans whose config no longer compiles.
+
+    Billing runs skip (invoicing) or hold (renewals) the sellers on such a
+    plan. Runs with ``migrate`` and ``check --database default``.
+    """
+    if not databases or "default" not in databases:
+        return []
+    from .models import BillingPlan
+    from .pricing import compile_plan
+
+    # migrate runs database checks before creating the table
+    if BillingPlan._meta.db_table not in connections["default"].introspection.table_names():
+        return []
+    # Only columns from the first migration, so a partly migrated schema works
+    plans = BillingPlan.objects.using("default").filter(is_active=True).only("name", "plan_type", "config")
+    errors = []
+    for plan in plans:
+        try:
+            compile_plan(plan.plan_type, plan.config)
+        except ValidationError as e:
+            errors.append(Error(
+                f"Billing plan {plan.pk} ({plan.name}) has an invalid config: {'; '.join(e.messages)}",
+                hint="Fix the config in the admin; its sellers are not billed until then.",
+                obj=plan,
+                id="billing.E001",
+            ))
+    return errors
@@ -0,0 +1,27 @@
+"""
+Forms for billing administration.
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .reconciliation import PARSERS
+
+
+class StatementUploadForm(forms.Form):
+    """Form for uploading a bank statement to reconcile."""
+
+    MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
+
+    statement = forms.FileField(help_text='CSV or MT940 bank statement')
+    format = forms.ChoiceField(
+        choices=[('', 'Detect from file name')] + [(fmt, fmt.upper()) for fmt in sorted(PARSERS)],
+        required=False,
+    )
+
+    def clean_statement(self):
+        """Validate file size."""
+        statement = self.cleaned_data.get('statement')
+        if statement and statement.size > self.MAX_FILE_SIZE:
+            raise ValidationError('File size must be less than 20MB.')
+        return statement
@@ -0,0 +1,194 @@
+"""
+Monthly invoice generation driven by each seller's BillingPlan.
+
+Only usage-based plans are billed here; flat subscription fees are
+billed per cycle by ``billing.renewals``.
+
+Sellers are processed in primary-key batches. For each batch the engine
+issues one grouped aggregate for commissionable sales, one grouped count
+for new listings, allocates a block of invoice numbers and writes the
+invoices with ``bulk_create``. Progress is checkpointed on the period's
+``InvoiceRun`` so an interrupted run resumes where it stopped, and a
+completed run is a no-op.
+"""
+
+import calendar
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Sum
+from django.utils import timezone
+
+from orders.models import OrderItem
+from products.models import Product
+from sellers.models import Seller, SellerSubscription
+from .models import Invoice, InvoiceRun, InvoiceSequence
+from .pricing import billable_strategy
+
+# Orders whose items count towards commission
+COMMISSIONABLE_ORDER_STATUSES = ("processing", "shipped", "delivered")
+
+
+def month_bounds(period_start):
+    """Return the first and last day of the month containing ``period_start``."""
+    first = period_start.replace(day=1)
+    last_day = calendar.monthrange(first.year, first.month)[1]
+    return first, first.replace(day=last_day)
+
+
+def previous_month(today=None):
+    """Return the first day of the month before ``today``."""
+    today = today or timezone.now().date()
+    return (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def _period_datetimes(period_start, period_end):
+    """Half-open datetime range covering the period in the current timezone."""
+    start = timezone.make_aware(datetime.combine(period_start, time.min))
+    end = timezone.make_aware(datetime.combine(period_end + timedelta(days=1), time.min))
+    return start, end
+
+
+def _sales_by_seller(seller_ids, start, end):
+    """Commissionable sales per seller in one grouped aggregate."""
+    rows = (
+        OrderItem.objects.filter(
+            product__seller_id__in=seller_ids,
+            order__status__in=COMMISSIONABLE_ORDER_STATUSES,
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+        )
+        .order_by()
+        .values("product__seller_id")
+        .annotate(total=Sum(F("quantity") * F("price_at_purchase")))
+        .values_list("product__seller_id", "total")
+    )
+    return {seller_id: total or Decimal("0") for seller_id, total in rows}
+
+
+def _listings_by_seller(seller_ids, start, end):
+    """New listings per seller in one grouped count."""
+    rows = (
+        Product.objects.filter(
+            seller_id__in=seller_ids, created_at__gte=start, created_at__lt=end
+        )
+        .order_by()
+        .values("seller_id")
+        .annotate(count=Count("pk"))
+        .values_list("seller_id", "count")
+    )
+    return dict(rows)
+
+
+def _invoice_batch(run, sellers, issue_date):
+    """Create invoices for one batch of sellers and return how many were written."""
+    seller_ids = [seller.pk for seller in sellers]
+    already_invoiced = set(
+        Invoice.objects.filter(
+            seller_id__in=seller_ids,
+            period_start=run.period_start,
+            period_end=run.period_end,
+        ).values_list("seller_id", flat=True)
+    )
+    start, end = _period_datetimes(run.period_start, run.period_end)
+    sales = _sales_by_seller(seller_ids, start, end)
+    listings = _listings_by_seller(seller_ids, start, end)
+
+    # Group sellers by compiled strategy so each plan prices its sellers in one batch
+    groups = {}
+    for seller in sellers:
+        if seller.pk in already_invoiced or not seller.active_subscriptions:
+            continue
+        subscription = seller.active_subscriptions[0]
+        plan = subscription.billing_plan
+        if plan is not None and not plan.is_active:
+            plan = None
+        strategy = billable_strategy(plan)
+        if strategy is None or not strategy.usage_based:
+            continue
+        groups.setdefault(strategy, (plan, []))[1].append((seller, subscription))
+
+    pending = []
+    for strategy, (plan, members) in groups.items():
+        amounts = strategy.price_batch(
+            [sales.get(seller.pk, Decimal("0")) for seller, _ in members],
+            [listings.get(seller.pk, 0) for seller, _ in members],
+            [subscription.amount for _, subscription in members],
+        )
+        pending.extend(
+            (seller, plan, amount)
+            for (seller, _), amount in zip(members, amounts)
+            if amount > 0
+        )
+
+    if not pending:
+        return 0
+
+    period_code = run.period_start.strftime("%Y%m")
+    numbers = InvoiceSequence.allocate(period_code, len(pending))
+    due_date = issue_date + timedelta(days=settings.BILLING_INVOICE_DUE_DAYS)
+    Invoice.objects.bulk_create([
+        Invoice(
+            seller=seller,
+            invoice_number=InvoiceSequence.format_number(period_code, number),
+            amount=amount,
+            due_date=due_date,
+            billing_plan=plan,
+            period_start=run.period_start,
+            period_end=run.period_end,
+        )
+        for (seller, plan, amount), number in zip(pending, numbers)
+    ])
+    return len(pending)
+
+
+def generate_invoices(period_start, batch_size=None, issue_date=None):
+    """
+    Generate invoices for every active seller on a usage-based plan for the
+    month of ``period_start``.
+
+    Safe to call repeatedly and from several processes: each batch locks
+    the period's ``InvoiceRun`` row and continues after its checkpoint.
+    Returns the ``InvoiceRun``.
+    """
+    batch_size = batch_size or settings.BILLING_RUN_BATCH_SIZE
+    issue_date = issue_date or timezone.now().date()
+    period_start, period_end = month_bounds(period_start)
+
+    run, _ = InvoiceRun.objects.get_or_create(
+        period_start=period_start, defaults={"period_end": period_end}
+    )
+    sellers = (
+        Seller.objects.filter(status="active")
+        .order_by("pk")
+        .prefetch_related(
+            Prefetch(
+                "subscriptions",
+                queryset=SellerSubscription.objects.filter(status="active")
+                .select_related("billing_plan")
+                .order_by("-created_at"),
+                to_attr="active_subscriptions",
+            )
+        )
+    )
+
+    while True:
+        with transaction.atomic():
+            run = InvoiceRun.objects.select_for_update().get(pk=run.pk)
+            if run.status == "completed":
+                break
+
+            batch = list(sellers.filter(pk__gt=run.last_seller_id)[:batch_size])
+            if not batch:
+                run.status = "completed"
+                run.completed_at = timezone.now()
+                run.save(update_fields=["status", "completed_at", "updated_at"])
+                break
+
+            run.invoices_created += _invoice_batch(run, batch, issue_date)
+            run.last_seller_id = batch[-1].pk
+            run.save(update_fields=["invoices_created", "last_seller_id", "updated_at"])
+
+    return run
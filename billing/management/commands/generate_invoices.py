@@ -0,0 +1,55 @@
+"""
+Management command to generate monthly seller invoices.
+Usage: python manage.py generate_invoices [--period YYYY-MM] [--batch-size N] [--no-pdf]
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.invoicing import generate_invoices, previous_month
+from billing.pdf import render_period_pdfs
+
+
+class Command(BaseCommand):
+    help = 'Generate invoices for all active sellers for a billing month'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            help='Billing month as YYYY-MM (defaults to the previous month)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of sellers processed per transaction',
+        )
+        parser.add_argument(
+            '--no-pdf',
+            action='store_true',
+            help='Skip rendering invoice PDFs',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of processes used to render PDFs',
+        )
+
+    def handle(self, *args, **options):
+        if options['period']:
+            try:
+                period_start = datetime.strptime(options['period'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError(f"Invalid period: {options['period']}")
+        else:
+            period_start = previous_month()
+
+        run = generate_invoices(period_start, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Invoice run {run.period_start:%Y-%m} {run.status}: "
+            f"{run.invoices_created} invoice(s) created"
+        ))
+
+        if not options['no_pdf']:
+            rendered = render_period_pdfs(run.period_start, max_workers=options['workers'])
+            self.stdout.write(self.style.SUCCESS(f'{rendered} invoice PDF(s) rendered'))
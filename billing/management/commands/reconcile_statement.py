@@ -0,0 +1,39 @@
+"""
+Management command to reconcile a bank statement against open invoices.
+Usage: python manage.py reconcile_statement statement.csv [--format csv|mt940]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.reconciliation import PARSERS, reconcile_file
+
+
+class Command(BaseCommand):
+    help = 'Match bank statement credits to open invoices and record payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Path to a CSV or MT940 statement file')
+        parser.add_argument(
+            '--format',
+            choices=sorted(PARSERS),
+            help='Statement format (detected from the file name by default)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['statement'], 'rb') as statement:
+                result = reconcile_file(statement, fmt=options['format'])
+        except OSError as e:
+            raise CommandError(f"Cannot read statement: {e}")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.lines} line(s): {result.matched} matched, '
+            f'{result.duplicates} already recorded, {len(result.unmatched)} unmatched, '
+            f'{result.sellers_reactivated} seller(s) reactivated'
+        ))
+        for line in result.unmatched:
+            self.stdout.write(f'Unmatched: {line}')
+        for error in result.errors:
+            self.stderr.write(error)
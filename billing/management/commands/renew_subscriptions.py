@@ -0,0 +1,38 @@
+"""
+Management command to renew due seller subscriptions and invoice their cycles.
+Usage: python manage.py renew_subscriptions [--date YYYY-MM-DD]
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.tasks import renew_due_subscriptions
+
+
+class Command(BaseCommand):
+    help = 'Advance due subscriptions and invoice each elapsed billing cycle'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Treat this date (YYYY-MM-DD) as today',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        result = renew_due_subscriptions(today=today)
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.subscriptions} subscription(s) renewed, '
+            f'{result.invoices_created} invoice(s) created'
+        ))
+        if result.held:
+            self.stderr.write(self.style.WARNING(
+                f'{len(result.held)} subscription(s) held: seller not active or plan config invalid'
+            ))
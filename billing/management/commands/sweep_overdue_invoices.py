@@ -0,0 +1,33 @@
+"""
+Management command to mark past-due invoices overdue and suspend sellers.
+Usage: python manage.py sweep_overdue_invoices [--date YYYY-MM-DD]
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.tasks import sweep_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = 'Mark pending invoices past their due date as overdue and suspend sellers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Treat this date (YYYY-MM-DD) as today',
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        invoices, sellers = sweep_overdue_invoices(today=today)
+        self.stdout.write(self.style.SUCCESS(
+            f'{invoices} invoice(s) marked overdue, {sellers} seller(s) suspended'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_invoicerun_invoicesequence_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billingplan',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
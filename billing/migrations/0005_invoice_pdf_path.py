@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0004_billingplan_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='pdf_path',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
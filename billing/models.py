@@ -2,11 +2,22 @@
 Billing, invoicing, and payment models.
 """
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.utils import timezone
 from core.models import TimeStampedModel
 
 
+class BillingPlanQuerySet(models.QuerySet):
+    """Plan updates that keep ``version`` in step with the config."""
+
+    def update(self, **kwargs):
+        """``QuerySet.update`` that bumps ``version`` when pricing changes."""
+        if "config" in kwargs or "plan_type" in kwargs:
+            kwargs.setdefault("version", models.F("version") + 1)
+        return super().update(**kwargs)
+
+
 class BillingPlan(models.Model):
     """
     Flexible billing plan configuration.
@@ -30,6 +41,11 @@ class BillingPlan(models.Model):
         default=dict,
         help_text="Plan-specific configuration (e.g., amount, percentage, limits)",
     )
+    # Bumped in the database on every save and config update(); compiled
+    # pricing strategies are cached per (pk, version)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = BillingPlanQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Billing Plan"
@@ -38,6 +54,81 @@ class BillingPlan(models.Model):
     def __str__(self):
         return f"{self.name} ({self.plan_type})"
 
+    def clean(self):
+        """Validate the config against the plan type's pricing strategy."""
+        from .pricing import compile_plan
+
+        try:
+            compile_plan(self.plan_type, self.config)
+        except ValidationError as e:
+            raise ValidationError({"config": e.messages})
+
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding
+        if bump:
+            # Incremented by the UPDATE itself, so concurrent saves each count
+            self.version = models.F("version") + 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=["version"])
+
+    @property
+    def pricing(self):
+        """Compiled pricing strategy for this plan (cached per version)."""
+        from .pricing import get_strategy
+
+        return get_strategy(self)
+
+
+class InvoiceQuerySet(models.QuerySet):
+    """Set-based status changes for invoices."""
+
+    def mark_overdue(self):
+        """
+        Mark pending invoices overdue and suspend their sellers.
+
+        Issues two UPDATEs regardless of how many invoices match: active
+        sellers owning a matching invoice are suspended, then the invoices
+        are flipped to overdue. Returns ``(invoices, sellers)`` counts.
+        """
+        Seller = self.model._meta.get_field("seller").related_model
+        pending = self.filter(status="pending")
+        now = timezone.now()
+        with transaction.atomic():
+            sellers = Seller.objects.filter(
+                models.Exists(pending.filter(seller=models.OuterRef("pk"))),
+                status="active",
+            ).update(status="suspended", updated_at=now)
+            invoices = pending.update(status="overdue", updated_at=now)
+        return invoices, sellers
+
+    def mark_verified(self):
+        """
+        Mark invoices verified and reactivate their suspended sellers.
+
+        Sellers that still have another overdue invoice stay suspended.
+        Returns ``(invoices, sellers)`` counts.
+        """
+        Seller = self.model._meta.get_field("seller").related_model
+        now = timezone.now()
+        with transaction.atomic():
+            seller_ids = set(self.values_list("seller_id", flat=True))
+            invoices = self.exclude(status="verified").update(
+                status="verified", updated_at=now
+            )
+            sellers = Seller.objects.filter(
+                pk__in=seller_ids, status="suspended"
+            ).exclude(
+                models.Exists(
+                    self.model.objects.filter(
+                        seller=models.OuterRef("pk"), status="overdue"
+                    )
+                )
+            ).update(status="active", updated_at=now)
+        return invoices, sellers
+
 
 class Invoice(TimeStampedModel):
     """Monthly invoices for seller subscriptions."""
@@ -71,12 +162,23 @@ class Invoice(TimeStampedModel):
     period_start = models.DateField()
     period_end = models.DateField()
 
+    # Relative to PROTECTED_MEDIA_ROOT; served via X-Accel-Redirect
+    pdf_path = models.CharField(max_length=255, blank=True)
+
+    objects = InvoiceQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["seller", "-created_at"]),
             models.Index(fields=["status", "-created_at"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "period_start", "period_end"],
+                name="unique_invoice_per_seller_period",
+            ),
+        ]
         verbose_name = "Invoice"
         verbose_name_plural = "Invoices"
 
@@ -120,6 +222,67 @@ class Invoice(TimeStampedModel):
                 self.seller.suspend()
 
 
+class InvoiceSequence(models.Model):
+    """
+    Per-month counter used to allocate invoice numbers.
+
+    Numbers are handed out in blocks, so an invoice run takes the row lock
+    once per batch instead of once per invoice.
+    """
+
+    period = models.CharField(max_length=6, unique=True, help_text="YYYYMM")
+    last_number = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Invoice Sequence"
+        verbose_name_plural = "Invoice Sequences"
+
+    def __str__(self):
+        return f"{self.period}: {self.last_number}"
+
+    @classmethod
+    def allocate(cls, period, count):
+        """Reserve ``count`` consecutive numbers and return them as a range."""
+        with transaction.atomic():
+            cls.objects.get_or_create(period=period)
+            sequence = cls.objects.select_for_update().get(period=period)
+            first = sequence.last_number + 1
+            sequence.last_number += count
+            sequence.save(update_fields=["last_number"])
+        return range(first, first + count)
+
+    @staticmethod
+    def format_number(period, number):
+        """Format an invoice number, e.g. ``INV-202501-001``."""
+        return f"INV-{period}-{number:03d}"
+
+
+class InvoiceRun(TimeStampedModel):
+    """Checkpoint for a monthly invoice run, one per billing period."""
+
+    STATUS_CHOICES = (
+        ("running", "Running"),
+        ("completed", "Completed"),
+    )
+
+    period_start = models.DateField(unique=True)
+    period_end = models.DateField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="running"
+    )
+    last_seller_id = models.BigIntegerField(default=0)
+    invoices_created = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+        verbose_name = "Invoice Run"
+        verbose_name_plural = "Invoice Runs"
+
+    def __str__(self):
+        return f"Invoice run {self.period_start:%Y-%m} ({self.status})"
+
+
 class Payment(TimeStampedModel):
     """Payment records for invoices (manual verification)."""
 
@@ -0,0 +1,234 @@
+"""
+Invoice PDF rendering.
+
+PDFs are drawn with Pillow, which is already a dependency, so rendering
+needs no extra libraries. Files are named after a hash of the invoice's
+own printed fields (``HASHED_FIELDS``) and stored under
+``PROTECTED_MEDIA_ROOT``: an unchanged invoice is never rendered twice,
+and a changed amount or period gets a new file. Shop, account holder and
+plan names are printed as they were at first render, so renaming a shop
+does not re-render its old invoices. Batches are rendered in one process
+pool per run so the invoice run is not bound to one core; nothing is
+rendered inside a request, a missing file is queued with
+``queue_invoice_pdf``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+
+from core.models import Task
+from core.taskqueue import enqueue
+from .models import Invoice
+
+logger = logging.getLogger(__name__)
+
+PDF_SUBDIR = "invoices"
+RENDER_TASK = "billing.pdf.render_invoice_pdfs_by_id"
+
+# Printed fields an issued invoice never changes; only these name the file
+HASHED_FIELDS = ("invoice_number", "amount", "due_date", "period_start", "period_end")
+
+# A4 at 150 dpi
+PAGE_SIZE = (1240, 1754)
+MARGIN = 120
+
+
+def invoice_payload(invoice):
+    """Plain, picklable data needed to render an invoice."""
+    seller = invoice.seller
+    return {
+        "invoice_number": invoice.invoice_number,
+        "shop_name": seller.shop_name,
+        "account_holder": seller.bank_account_holder,
+        "amount": str(invoice.amount),
+        "due_date": invoice.due_date.isoformat(),
+        "period_start": invoice.period_start.isoformat(),
+        "period_end": invoice.period_end.isoformat(),
+        "plan": invoice.billing_plan.name if invoice.billing_plan_id else "Monthly subscription",
+    }
+
+
+def payload_path(payload):
+    """Relative path of the PDF for ``payload``, derived from its content hash."""
+    digest = hashlib.sha256(
+        json.dumps({key: payload[key] for key in HASHED_FIELDS}, sort_keys=True).encode()
+    ).hexdigest()[:16]
+    period = payload["period_start"][:7].replace("-", "")
+    return f"{PDF_SUBDIR}/{period}/{payload['invoice_number']}-{digest}.pdf"
+
+
+def _draw_invoice(payload):
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(image)
+    title_font = ImageFont.load_default(size=56)
+    font = ImageFont.load_default(size=30)
+
+    y = MARGIN
+    draw.text((MARGIN, y), "Vintage Shop", fill="#1d4ed8", font=title_font)
+    y += 110
+    draw.text((MARGIN, y), f"Invoice {payload['invoice_number']}", fill="black", font=font)
+    y += 80
+
+    rows = [
+        ("Billed to", payload["shop_name"]),
+        ("Account holder", payload["account_holder"]),
+        ("Billing period", f"{payload['period_start']} - {payload['period_end']}"),
+        ("Plan", payload["plan"]),
+        ("Due date", payload["due_date"]),
+    ]
+    for label, value in rows:
+        draw.text((MARGIN, y), label, fill="#4b5563", font=font)
+        draw.text((MARGIN + 380, y), value or "-", fill="black", font=font)
+        y += 50
+
+    y += 40
+    draw.line((MARGIN, y, PAGE_SIZE[0] - MARGIN, y), fill="#d1d5db", width=3)
+    y += 40
+    draw.text((MARGIN, y), "Amount due", fill="black", font=title_font)
+    draw.text((MARGIN + 600, y), payload["amount"], fill="black", font=title_font)
+    y += 140
+    draw.text(
+        (MARGIN, y),
+        f"Please use {payload['invoice_number']} as the payment reference.",
+        fill="#4b5563",
+        font=font,
+    )
+    return image
+
+
+def render_invoice_pdf(payload, root):
+    """
+    Render one invoice to ``root`` unless its file already exists.
+
+    Module-level so it can run in a worker process. Returns the relative
+    path. The file is written to a temporary name and moved into place,
+    so readers never see a partial PDF.
+    """
+    relative = payload_path(payload)
+    target = Path(root) / relative
+    if target.exists():
+        return relative
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            _draw_invoice(payload).save(tmp, "PDF", resolution=150.0)
+        os.replace(tmp_name, target)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return relative
+
+
+def _render_all(pool, missing, root):
+    return dict(zip(missing, pool.map(
+        render_invoice_pdf, missing.values(), [root] * len(missing), chunksize=16,
+    )))
+
+
+def render_invoice_pdfs(invoices, max_workers=None, pool=None):
+    """
+    Render PDFs for ``invoices`` and record their paths.
+
+    Invoices whose current file already exists are skipped without
+    rendering. Rendering uses ``pool`` when given, otherwise a pool of
+    ``max_workers`` processes; with ``max_workers`` of 1 or less
+    everything runs in this process. Returns the number of invoices whose
+    path changed.
+    """
+    if max_workers is None:
+        max_workers = settings.BILLING_PDF_WORKERS
+    root = settings.PROTECTED_MEDIA_ROOT
+
+    payloads = {invoice.pk: invoice_payload(invoice) for invoice in invoices}
+    invoices = {invoice.pk: invoice for invoice in invoices}
+    missing = {
+        pk: payload for pk, payload in payloads.items()
+        if not (Path(root) / payload_path(payload)).exists()
+    }
+
+    if len(missing) > 1 and pool is not None:
+        paths = _render_all(pool, missing, root)
+    elif len(missing) > 1 and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as own_pool:
+            paths = _render_all(own_pool, missing, root)
+    else:
+        paths = {pk: render_invoice_pdf(payload, root) for pk, payload in missing.items()}
+
+    changed = []
+    for pk, payload in payloads.items():
+        relative = paths.get(pk) or payload_path(payload)
+        if invoices[pk].pdf_path != relative:
+            invoices[pk].pdf_path = relative
+            changed.append(invoices[pk])
+
+    Invoice.objects.bulk_update(changed, ["pdf_path"], batch_size=500)
+    logger.info("Rendered %d invoice PDF(s), %d path(s) updated", len(missing), len(changed))
+    return len(changed)
+
+
+def pdf_is_current(invoice):
+    """Whether ``invoice`` has a rendered file matching its current fields."""
+    return bool(invoice.pdf_path) and invoice.pdf_path == payload_path(invoice_payload(invoice)) and (
+        Path(settings.PROTECTED_MEDIA_ROOT) / invoice.pdf_path
+    ).exists()
+
+
+def queue_invoice_pdf(invoice):
+    """Queue rendering of ``invoice``'s PDF unless it is already queued or running."""
+    pending = Task.objects.filter(
+        name=RENDER_TASK, status__in=("queued", "running"), args=[[invoice.pk]]
+    )
+    if not pending.exists():
+        enqueue(RENDER_TASK, args=[[invoice.pk]])
+
+
+def render_invoice_pdfs_by_id(invoice_ids, max_workers=None):
+    """Render PDFs for the given invoice ids; task-queue entry point."""
+    invoices = list(
+        Invoice.objects.filter(pk__in=invoice_ids).select_related("seller", "billing_plan")
+    )
+    return render_invoice_pdfs(invoices, max_workers=max_workers)
+
+
+def render_period_pdfs(period_start, max_workers=None, batch_size=1000):
+    """
+    Render PDFs for every invoice without one whose period starts in the
+    month of ``period_start``: the monthly run's invoices and subscription
+    renewals, whose cycles do not follow calendar months. One process
+    pool renders every batch.
+    """
+    if max_workers is None:
+        max_workers = settings.BILLING_PDF_WORKERS
+    period_start = period_start.replace(day=1)
+    next_month = (period_start + timedelta(days=32)).replace(day=1)
+    invoices = (
+        Invoice.objects.filter(period_start__gte=period_start, period_start__lt=next_month, pdf_path="")
+        .select_related("seller", "billing_plan")
+        .order_by("pk")
+    )
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    updated = 0
+    last_pk = 0
+    try:
+        while True:
+            batch = list(invoices.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return updated
+            updated += render_invoice_pdfs(batch, max_workers=max_workers, pool=pool)
+            last_pk = batch[-1].pk
+    finally:
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,252 @@
+"""
+Compiled pricing strategies for billing plans.
+
+``BillingPlan.config`` is free-form JSON. Each plan type registers a
+strategy class that validates the config once and compiles it into an
+object holding ready-to-use ``Decimal`` values. Compiled strategies are
+cached per process keyed on ``(plan id, version)``, so repeated pricing
+of the same plan never re-parses its config. ``BillingPlan.save()`` and
+``BillingPlan.objects.update()`` bump ``version`` with an ``F()``
+expression whenever the config may change, so a new config is compiled
+afresh and concurrent writes never reuse a version.
+
+Plans saved before a validation rule existed may not compile. Billing
+runs use ``billable_strategy``, which logs such a plan and skips its
+sellers rather than aborting the run; the ``billing.E001`` database check
+lists them.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
+HUNDRED = Decimal("100")
+
+CACHE_SIZE = 256
+
+_registry = {}
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def register(plan_type):
+    """Class decorator registering a strategy for ``plan_type``."""
+    def decorator(cls):
+        cls.plan_type = plan_type
+        _registry[plan_type] = cls
+        return cls
+    return decorator
+
+
+def _decimal(config, key, required=True, minimum=ZERO, maximum=None):
+    """Read a non-negative decimal from ``config``."""
+    value = config.get(key)
+    if value in (None, ""):
+        if required:
+            raise ValidationError(f"'{key}' is required.")
+        return None
+    try:
+        value = Decimal(str(value))
+    except InvalidOperation:
+        raise ValidationError(f"'{key}' must be a number.")
+    if not value.is_finite() or value < minimum:
+        raise ValidationError(f"'{key}' must be at least {minimum}.")
+    if maximum is not None and value > maximum:
+        raise ValidationError(f"'{key}' must be at most {maximum}.")
+    return value
+
+
+def _quantize(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PricingStrategy:
+    """
+    Base class for compiled plan pricing.
+
+    ``price`` prices one seller; ``price_batch`` prices parallel sequences
+    of usage figures in a single pass. ``base_amount`` is the seller's
+    subscription amount, used when a plan does not set its own.
+
+    Usage-based strategies are invoiced by the calendar-month run; flat
+    fees are invoiced per subscription cycle by the renewal engine.
+    """
+
+    plan_type = None
+    usage_based = True
+
+    @classmethod
+    def compile(cls, config):
+        """Validate ``config`` and return a strategy instance."""
+        raise NotImplementedError
+
+    def price(self, sales_total=ZERO, listing_count=0, base_amount=None):
+        return self.price_batch([sales_total], [listing_count], [base_amount])[0]
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        raise NotImplementedError
+
+
+@register("subscription")
+class SubscriptionPricing(PricingStrategy):
+    """Flat monthly fee."""
+
+    usage_based = False
+
+    def __init__(self, amount=None):
+        self.amount = amount
+
+    @classmethod
+    def compile(cls, config):
+        return cls(amount=_decimal(config, "amount", required=False))
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        if self.amount is not None:
+            return [_quantize(self.amount)] * len(base_amounts)
+        return [_quantize(Decimal(str(base or 0))) for base in base_amounts]
+
+
+@register("commission")
+class CommissionPricing(PricingStrategy):
+    """Percentage of sales."""
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    @classmethod
+    def compile(cls, config):
+        return cls(rate=_decimal(config, "percentage", maximum=HUNDRED) / HUNDRED)
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        rate = self.rate
+        return [_quantize(sales * rate) for sales in sales_totals]
+
+
+@register("hybrid")
+class HybridPricing(PricingStrategy):
+    """Monthly fee plus a percentage of sales."""
+
+    def __init__(self, amount, rate):
+        self.amount = amount
+        self.rate = rate
+
+    @classmethod
+    def compile(cls, config):
+        return cls(
+            amount=_decimal(config, "amount", required=False),
+            rate=_decimal(config, "percentage", maximum=HUNDRED) / HUNDRED,
+        )
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        rate = self.rate
+        if self.amount is not None:
+            bases = [self.amount] * len(sales_totals)
+        else:
+            bases = [Decimal(str(base or 0)) for base in base_amounts]
+        return [
+            _quantize(base + sales * rate)
+            for base, sales in zip(bases, sales_totals)
+        ]
+
+
+@register("per_listing")
+class PerListingPricing(PricingStrategy):
+    """Fixed fee per new listing."""
+
+    def __init__(self, fee):
+        self.fee = fee
+
+    @classmethod
+    def compile(cls, config):
+        return cls(fee=_decimal(config, "fee"))
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        fee = self.fee
+        return [_quantize(fee * count) for count in listing_counts]
+
+
+@register("freemium")
+class FreemiumPricing(PricingStrategy):
+    """Free allowance of listings, then a fee per extra listing."""
+
+    def __init__(self, fee, free_listings):
+        self.fee = fee
+        self.free_listings = free_listings
+
+    @classmethod
+    def compile(cls, config):
+        free_listings = config.get("free_listings", 0)
+        if not isinstance(free_listings, int) or free_listings < 0:
+            raise ValidationError("'free_listings' must be a whole number of at least 0.")
+        return cls(
+            fee=_decimal(config, "fee", required=False) or ZERO,
+            free_listings=free_listings,
+        )
+
+    def price_batch(self, sales_totals, listing_counts, base_amounts):
+        fee, free = self.fee, self.free_listings
+        return [_quantize(fee * max(count - free, 0)) for count in listing_counts]
+
+
+# Used for sellers without a billing plan: they pay their subscription amount
+FLAT_SUBSCRIPTION = SubscriptionPricing()
+
+
+def compile_plan(plan_type, config):
+    """Validate and compile a plan config without touching the cache."""
+    try:
+        strategy_class = _registry[plan_type]
+    except KeyError:
+        raise ValidationError(f"Unknown plan type: {plan_type}")
+    if not isinstance(config, dict):
+        raise ValidationError("Plan configuration must be an object.")
+    return strategy_class.compile(config)
+
+
+def get_strategy(plan):
+    """Return the compiled strategy for ``plan`` (or the flat fallback)."""
+    if plan is None:
+        return FLAT_SUBSCRIPTION
+    if plan.pk is None:
+        return compile_plan(plan.plan_type, plan.config)
+
+    key = (plan.pk, plan.version)
+    with _cache_lock:
+        strategy = _cache.get(key)
+        if strategy is not None:
+            _cache.move_to_end(key)
+            return strategy
+
+    strategy = compile_plan(plan.plan_type, plan.config)
+    with _cache_lock:
+        _cache[key] = strategy
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return strategy
+
+
+def billable_strategy(plan):
+    """
+    ``get_strategy`` for billing runs: returns ``None`` for a plan whose
+    config no longer validates, after logging it, so one bad plan never
+    aborts a run for every other seller.
+    """
+    try:
+        return get_strategy(plan)
+    except ValidationError as e:
+        logger.error("Billing plan %s has an invalid config, skipping its sellers: %s",
+                     plan.pk, "; ".join(e.messages))
+        return None
+
+
+def clear_cache():
+    """Drop all compiled strategies."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,145 @@
+"""
+Subscription renewal engine.
+
+Due subscriptions are found through the ``(status, renewal_date)`` index
+and processed in batches. Each batch is claimed with ``SELECT ... FOR
+UPDATE SKIP LOCKED``, so any number of workers can run the engine at
+once without waiting on each other or renewing the same subscription
+twice. A subscription that is several cycles behind is caught up in one
+pass: every elapsed cycle is invoiced in arrears, then ``renewal_date``
+is advanced past today with a single ``bulk_update`` for the batch.
+
+Only flat fees are invoiced here. Usage-based plans still advance their
+renewal date but are billed by the calendar-month run in
+``billing.invoicing``. A flat-fee subscription whose seller is not
+active, or whose plan config no longer validates, is held: its renewal
+date stays put, so its cycles are billed once the seller is reactivated
+or the plan is fixed, never silently skipped. On backends without row locks (SQLite) the
+invoice uniqueness constraint is what prevents double billing.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from sellers.models import SellerSubscription
+from .models import Invoice, InvoiceSequence
+from .pricing import billable_strategy
+
+
+@dataclass
+class RenewalResult:
+    """Outcome of a renewal pass."""
+
+    subscriptions: int = 0
+    cycles: int = 0
+    invoices_created: int = 0
+    held: list = field(default_factory=list)
+
+
+def _elapsed_cycles(subscription, today):
+    """Yield ``(cycle_start, cycle_end)`` for every cycle ended by ``today``."""
+    renewal_date = subscription.renewal_date
+    while renewal_date <= today:
+        yield renewal_date - SellerSubscription.BILLING_CYCLE, renewal_date - timedelta(days=1)
+        renewal_date += SellerSubscription.BILLING_CYCLE
+
+
+def _renew_batch(subscriptions, today, result):
+    """Invoice elapsed cycles and advance renewal dates for one locked batch."""
+    cycles = {
+        subscription.pk: list(_elapsed_cycles(subscription, today))
+        for subscription in subscriptions
+    }
+    already_invoiced = set(
+        Invoice.objects.filter(
+            seller_id__in={subscription.seller_id for subscription in subscriptions},
+            period_start__in={start for periods in cycles.values() for start, _ in periods},
+        ).values_list("seller_id", "period_start", "period_end")
+    )
+
+    now = timezone.now()
+    pending = []
+    renewed = []
+    for subscription in subscriptions:
+        plan = subscription.billing_plan
+        if plan is not None and not plan.is_active:
+            plan = None
+        strategy = billable_strategy(plan)
+        if strategy is None or (
+            not strategy.usage_based and subscription.seller.status != "active"
+        ):
+            result.held.append(subscription.pk)
+            continue
+        renewed.append(subscription)
+
+        periods = cycles[subscription.pk]
+        result.cycles += len(periods)
+        subscription.renewal_date += SellerSubscription.BILLING_CYCLE * len(periods)
+        subscription.updated_at = now
+
+        if strategy.usage_based:
+            continue
+
+        amount = strategy.price(base_amount=subscription.amount)
+        if amount <= 0:
+            continue
+        pending.extend(
+            (subscription.seller_id, plan, amount, start, end)
+            for start, end in periods
+            if (subscription.seller_id, start, end) not in already_invoiced
+        )
+
+    by_period = {}
+    for entry in pending:
+        by_period.setdefault(entry[3].strftime("%Y%m"), []).append(entry)
+
+    due_date = today + timedelta(days=settings.BILLING_INVOICE_DUE_DAYS)
+    invoices = []
+    for period_code, entries in by_period.items():
+        numbers = InvoiceSequence.allocate(period_code, len(entries))
+        invoices.extend(
+            Invoice(
+                seller_id=seller_id,
+                invoice_number=InvoiceSequence.format_number(period_code, number),
+                amount=amount,
+                due_date=due_date,
+                billing_plan=plan,
+                period_start=start,
+                period_end=end,
+            )
+            for (seller_id, plan, amount, start, end), number in zip(entries, numbers)
+        )
+    Invoice.objects.bulk_create(invoices)
+    SellerSubscription.objects.bulk_update(renewed, ["renewal_date", "updated_at"])
+
+    result.subscriptions += len(renewed)
+    result.invoices_created += len(invoices)
+
+
+def renew_subscriptions(today=None, batch_size=None):
+    """
+    Renew every active subscription whose renewal date is on or before ``today``.
+
+    Returns a ``RenewalResult``. Re-running on the same day is a no-op.
+    """
+    today = today or timezone.now().date()
+    batch_size = batch_size or settings.BILLING_RUN_BATCH_SIZE
+    result = RenewalResult()
+
+    due = (
+        SellerSubscription.objects.due(today)
+        .select_related("seller", "billing_plan")
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by("renewal_date", "pk")
+    )
+    while True:
+        with transaction.atomic():
+            # Held subscriptions are still due; don't claim them again
+            batch = list(due.exclude(pk__in=result.held)[:batch_size])
+            if not batch:
+                return result
+            _renew_batch(batch, today, result)
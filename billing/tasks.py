@@ -0,0 +1,82 @@
+"""
+Scheduled billing jobs.
+"""
+
+import logging
+from datetime import date
+
+from django.utils import timezone
+
+from core.models import Task
+from core.taskqueue import enqueue
+
+from .invoicing import generate_invoices, previous_month
+from .models import Invoice
+from .pdf import render_period_pdfs
+from .renewals import renew_subscriptions
+
+logger = logging.getLogger(__name__)
+
+MONTHLY_INVOICES_TASK = "billing.tasks.generate_monthly_invoices"
+
+
+def sweep_overdue_invoices(today=None):
+    """
+    Mark every pending invoice past its due date as overdue.
+
+    Sellers owning those invoices are suspended in the same transaction.
+    Returns ``(invoices, sellers)`` counts.
+    """
+    today = today or timezone.now().date()
+    invoices, sellers = Invoice.objects.filter(due_date__lt=today).mark_overdue()
+    logger.info(
+        "Overdue sweep for %s: %d invoice(s) overdue, %d seller(s) suspended",
+        today, invoices, sellers,
+    )
+    return invoices, sellers
+
+
+def generate_monthly_invoices(today=None, render_pdfs=True):
+    """
+    Invoice all active sellers for the month before ``today``.
+
+    Intended to run on the 1st of each month; re-running is a no-op once
+    the period's run has completed. PDFs are rendered afterwards in a
+    process pool, outside the run's transactions. ``today`` may be an ISO
+    date string, as passed through the task queue.
+    """
+    if isinstance(today, str):
+        today = date.fromisoformat(today)
+    run = generate_invoices(previous_month(today), issue_date=today)
+    logger.info(
+        "Invoice run for %s: %s, %d invoice(s) created",
+        run.period_start.strftime("%Y-%m"), run.status, run.invoices_created,
+    )
+    if render_pdfs:
+        render_period_pdfs(run.period_start)
+    return run
+
+
+def queue_monthly_invoices():
+    """
+    Hand the monthly invoice run to the task worker (``manage.py run_tasks``).
+
+    Scheduled jobs run inside a web worker; the run and its PDF process
+    pool belong in the task worker instead.
+    """
+    if not Task.objects.filter(name=MONTHLY_INVOICES_TASK, status__in=("queued", "running")).exists():
+        enqueue(MONTHLY_INVOICES_TASK, kwargs={"today": timezone.now().date().isoformat()})
+
+
+def renew_due_subscriptions(today=None):
+    """
+    Advance every due subscription and invoice its elapsed cycles.
+
+    Intended to run daily; safe to run from several workers at once.
+    """
+    result = renew_subscriptions(today=today)
+    logger.info(
+        "Subscription renewals: %d subscription(s), %d cycle(s), %d invoice(s) created, %d held",
+        result.subscriptions, result.cycles, result.invoices_created, len(result.held),
+    )
+    return result
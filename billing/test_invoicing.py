@@ -0,0 +1,177 @@
+"""
+Tests for the monthly invoice run.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.models import User
+from sellers.models import Seller
+from products.models import Product
+from orders.models import Order, OrderItem
+from billing import pricing
+from billing.models import BillingPlan, Invoice, InvoiceRun, InvoiceSequence
+from billing.invoicing import generate_invoices, previous_month
+
+
+JANUARY = date(2025, 1, 1)
+
+
+class InvoiceRunTestMixin:
+    """Shared fixtures for invoice run tests."""
+
+    def _create_seller(self, email, plan=None):
+        user = User.objects.create_user(
+            email=email, username=email, password='testpass123', is_seller=True
+        )
+        seller = Seller.objects.get(user=user)
+        if plan is not None:
+            seller.subscriptions.update(billing_plan=plan)
+        return seller
+
+    def _in_january(self, queryset):
+        """Move rows created by a test into January 2025."""
+        queryset.update(created_at=timezone.make_aware(datetime(2025, 1, 15, 12)))
+
+    def _sell(self, seller, price, status='delivered'):
+        buyer, _ = User.objects.get_or_create(
+            email='buyer@test.com', defaults={'username': 'buyer@test.com'}
+        )
+        product = Product.objects.create(
+            seller=seller, title='Item', description='Item', price=price, status='sold'
+        )
+        order = Order.objects.create(
+            buyer=buyer, status=status, total_price=price,
+            shipping_name='Buyer', shipping_address='Street 1',
+        )
+        OrderItem.objects.create(
+            order=order, product=product, quantity=1, price_at_purchase=price
+        )
+        self._in_january(Order.objects.filter(pk=order.pk))
+        self._in_january(Product.objects.filter(pk=product.pk))
+
+
+class GenerateInvoicesTests(InvoiceRunTestMixin, TestCase):
+    """Tests for generate_invoices."""
+
+    def setUp(self):
+        pricing.clear_cache()
+        self.commission_plan = BillingPlan.objects.create(
+            name='Commission', plan_type='commission', config={'percentage': '10'}
+        )
+        self.listing_plan = BillingPlan.objects.create(
+            name='Per listing', plan_type='per_listing', config={'fee': '0.50'}
+        )
+        self.flat = self._create_seller('flat@test.com')
+        self.commission = self._create_seller('commission@test.com', self.commission_plan)
+        self.listing = self._create_seller('listing@test.com', self.listing_plan)
+
+        self._sell(self.commission, Decimal('100'))
+        self._sell(self.commission, Decimal('50'), status='cancelled')
+        for _ in range(4):
+            Product.objects.create(
+                seller=self.listing, title='Listing', description='x', price=5
+            )
+        self._in_january(Product.objects.filter(seller=self.listing))
+
+    def test_creates_invoice_per_billable_seller(self):
+        """Test each usage-based plan is priced from the period's usage."""
+        run = generate_invoices(JANUARY, issue_date=date(2025, 2, 1))
+        self.assertEqual(run.status, 'completed')
+        self.assertEqual(run.invoices_created, 2)
+
+        amounts = dict(Invoice.objects.values_list('seller_id', 'amount'))
+        self.assertEqual(amounts[self.commission.pk], Decimal('10.00'))
+        self.assertEqual(amounts[self.listing.pk], Decimal('2.00'))
+
+    def test_invalid_plan_is_skipped_not_fatal(self):
+        """Test a plan saved before stricter validation does not abort the run."""
+        BillingPlan.objects.filter(pk=self.commission_plan.pk).update(config={})
+        with self.assertLogs('billing.pricing', 'ERROR'):
+            run = generate_invoices(JANUARY)
+        self.assertEqual(run.status, 'completed')
+        self.assertEqual(
+            list(Invoice.objects.values_list('seller_id', flat=True)), [self.listing.pk]
+        )
+
+    def test_flat_subscriptions_left_to_renewals(self):
+        """Test flat fees are not billed by the calendar-month run."""
+        generate_invoices(JANUARY)
+        self.assertFalse(Invoice.objects.filter(seller=self.flat).exists())
+
+    def test_invoice_numbers_and_period(self):
+        """Test numbering follows INV-YYYYMM-NNN and the period is the month."""
+        generate_invoices(JANUARY, issue_date=date(2025, 2, 1))
+        numbers = sorted(Invoice.objects.values_list('invoice_number', flat=True))
+        self.assertEqual(numbers, ['INV-202501-001', 'INV-202501-002'])
+        invoice = Invoice.objects.first()
+        self.assertEqual(invoice.period_start, JANUARY)
+        self.assertEqual(invoice.period_end, date(2025, 1, 31))
+        self.assertEqual(invoice.due_date, date(2025, 2, 15))
+
+    def test_run_is_idempotent(self):
+        """Test a second run for the same period creates nothing."""
+        generate_invoices(JANUARY)
+        generate_invoices(JANUARY)
+        self.assertEqual(Invoice.objects.count(), 2)
+
+    def test_run_resumes_after_checkpoint(self):
+        """Test an interrupted run only invoices sellers after its checkpoint."""
+        InvoiceRun.objects.create(
+            period_start=JANUARY,
+            period_end=date(2025, 1, 31),
+            last_seller_id=self.commission.pk,
+        )
+        run = generate_invoices(JANUARY)
+        self.assertEqual(run.invoices_created, 1)
+        self.assertFalse(Invoice.objects.filter(seller=self.commission).exists())
+
+    def test_skips_existing_invoices_for_period(self):
+        """Test sellers already invoiced for the period are not billed twice."""
+        Invoice.objects.create(
+            seller=self.commission, invoice_number='INV-MANUAL', amount=1,
+            due_date=date(2025, 2, 15), period_start=JANUARY, period_end=date(2025, 1, 31),
+        )
+        run = generate_invoices(JANUARY)
+        self.assertEqual(run.invoices_created, 1)
+
+    def test_query_count_does_not_grow_with_sellers(self):
+        """Test a batch costs a constant number of queries."""
+        with CaptureQueriesContext(connection) as small:
+            generate_invoices(JANUARY)
+        Invoice.objects.all().delete()
+        InvoiceRun.objects.all().delete()
+        InvoiceSequence.objects.all().delete()
+        hybrid_plan = BillingPlan.objects.create(
+            name='Hybrid', plan_type='hybrid', config={'amount': '5', 'percentage': '1'}
+        )
+        for i in range(10):
+            self._create_seller(f'more{i}@test.com', hybrid_plan)
+        with CaptureQueriesContext(connection) as large:
+            generate_invoices(JANUARY)
+        self.assertEqual(Invoice.objects.count(), 12)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_management_command(self):
+        """Test the management command runs the given period."""
+        call_command('generate_invoices', '--period', '2025-01', '--no-pdf', verbosity=0)
+        self.assertTrue(InvoiceRun.objects.filter(period_start=JANUARY, status='completed').exists())
+
+
+class InvoiceSequenceTests(TestCase):
+    """Tests for invoice number allocation."""
+
+    def test_allocate_returns_consecutive_blocks(self):
+        self.assertEqual(list(InvoiceSequence.allocate('202501', 2)), [1, 2])
+        self.assertEqual(list(InvoiceSequence.allocate('202501', 3)), [3, 4, 5])
+        self.assertEqual(list(InvoiceSequence.allocate('202502', 1)), [1])
+
+    def test_previous_month(self):
+        self.assertEqual(previous_month(date(2025, 3, 1)), date(2025, 2, 1))
+        self.assertEqual(previous_month(date(2025, 1, 31)), date(2024, 12, 1))
@@ -0,0 +1,183 @@
+"""
+Tests for invoice PDF rendering and protected delivery.
+"""
+
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from users.models import User
+from sellers.models import Seller
+from billing.models import Invoice
+from billing import pdf
+from billing.pdf import pdf_is_current, render_invoice_pdfs, render_period_pdfs
+from core.models import Task
+from core.taskqueue import Worker
+
+
+class InvoicePdfTestMixin:
+    """Temporary protected media root and a seller with one invoice."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(PROTECTED_MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            email='seller@test.com', username='seller@test.com',
+            password='testpass123', is_seller=True
+        )
+        self.seller = Seller.objects.get(user=self.user)
+        self.invoice = Invoice.objects.create(
+            seller=self.seller, invoice_number='INV-202501-001', amount=9.99,
+            due_date=date(2025, 2, 15), period_start=date(2025, 1, 1),
+            period_end=date(2025, 1, 31),
+        )
+
+
+class RenderInvoicePdfTests(InvoicePdfTestMixin, TestCase):
+    """Tests for the on-disk PDF cache."""
+
+    def test_renders_pdf_and_records_path(self):
+        updated = render_invoice_pdfs([self.invoice], max_workers=1)
+        self.assertEqual(updated, 1)
+        self.invoice.refresh_from_db()
+        pdf = Path(self.media_root) / self.invoice.pdf_path
+        self.assertTrue(pdf.read_bytes().startswith(b'%PDF'))
+        self.assertTrue(self.invoice.pdf_path.startswith('invoices/202501/INV-202501-001-'))
+
+    def test_unchanged_invoice_is_not_rendered_again(self):
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.invoice.refresh_from_db()
+        pdf = Path(self.media_root) / self.invoice.pdf_path
+        mtime = pdf.stat().st_mtime_ns
+        self.assertEqual(render_invoice_pdfs([self.invoice], max_workers=1), 0)
+        self.assertEqual(pdf.stat().st_mtime_ns, mtime)
+
+    def test_changed_invoice_gets_new_file(self):
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.invoice.refresh_from_db()
+        old_path = self.invoice.pdf_path
+        self.invoice.amount = 19.99
+        self.invoice.save()
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.assertNotEqual(self.invoice.pdf_path, old_path)
+
+    def test_shop_rename_keeps_existing_file(self):
+        """Test fields outside the invoice itself do not re-render old PDFs."""
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.invoice.refresh_from_db()
+        self.seller.shop_name = 'Renamed Shop'
+        self.seller.save()
+        invoice = Invoice.objects.select_related('seller').get(pk=self.invoice.pk)
+        self.assertTrue(pdf_is_current(invoice))
+        self.assertEqual(render_invoice_pdfs([invoice], max_workers=1), 0)
+
+    def test_process_pool_rendering(self):
+        """Test a period is rendered through one worker pool, renewal cycles included."""
+        # Subscription renewals bill cycles, not calendar months
+        cycles = [
+            Invoice.objects.create(
+                seller=self.seller, invoice_number=f'INV-202501-00{day}', amount=5,
+                due_date=date(2025, 2, day), period_start=date(2025, 1, day),
+                period_end=date(2025, 2, day - 1),
+            )
+            for day in (2, 3, 17)
+        ]
+        later = Invoice.objects.create(
+            seller=self.seller, invoice_number='INV-202502-001', amount=5,
+            due_date=date(2025, 3, 15), period_start=date(2025, 2, 1), period_end=date(2025, 2, 28),
+        )
+        with mock.patch.object(pdf, 'ProcessPoolExecutor', wraps=pdf.ProcessPoolExecutor) as pool_class:
+            self.assertEqual(render_period_pdfs(date(2025, 1, 1), max_workers=2, batch_size=2), 4)
+        pool_class.assert_called_once_with(max_workers=2)
+        for invoice in [self.invoice, *cycles]:
+            invoice.refresh_from_db()
+            self.assertTrue((Path(self.media_root) / invoice.pdf_path).exists())
+        later.refresh_from_db()
+        self.assertEqual(later.pdf_path, '')
+        # Invoices that have a PDF are not selected again
+        self.assertEqual(render_period_pdfs(date(2025, 1, 1), max_workers=1), 0)
+
+
+class InvoicePdfViewTests(InvoicePdfTestMixin, TestCase):
+    """Tests for the permission-checked download view."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.url = reverse('invoice_pdf', args=[self.invoice.invoice_number])
+
+    def test_missing_pdf_is_queued_not_rendered(self):
+        """Test a download without a current file queues one render and returns 202."""
+        self.client.force_login(self.user)
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response['Retry-After'], '5')
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.pdf_path, '')
+        self.assertEqual(Task.objects.get().args, [[self.invoice.pk]])
+
+        Worker(concurrency=1).run(burst=True)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(USE_X_ACCEL_REDIRECT=True)
+    def test_owner_gets_x_accel_redirect(self):
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.invoice.refresh_from_db()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.invoice.pdf_path}')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(USE_X_ACCEL_REDIRECT=False)
+    def test_fallback_serves_file(self):
+        render_invoice_pdfs([self.invoice], max_workers=1)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_other_seller_cannot_download(self):
+        other = User.objects.create_user(
+            email='other@test.com', username='other@test.com',
+            password='testpass123', is_seller=True
+        )
+        self.client.force_login(other)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_anonymous_redirected_to_login(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+
+class RenderPdfAdminActionTests(InvoicePdfTestMixin, TestCase):
+    """Tests for queuing PDF rendering from the admin."""
+
+    def test_action_enqueues_task(self):
+        admin = User.objects.create_superuser(
+            email='admin@test.com', username='admin@test.com', password='testpass123'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.post(reverse('admin:billing_invoice_changelist'), {
+            'action': 'render_pdfs', '_selected_action': [self.invoice.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        task = Task.objects.get()
+        self.assertEqual(task.args, [[self.invoice.pk]])
+
+        Worker(concurrency=1).run(burst=True)
+        self.invoice.refresh_from_db()
+        self.assertTrue(self.invoice.pdf_path)
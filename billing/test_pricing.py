@@ -0,0 +1,133 @@
+"""
+Tests for compiled billing plan pricing strategies.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from billing import pricing
+from billing.models import BillingPlan
+from billing.checks import check_billing_plans
+from billing.pricing import compile_plan, get_strategy
+
+
+class CompilePlanTests(TestCase):
+    """Tests for config validation and pricing rules."""
+
+    def test_subscription_uses_base_amount_without_config(self):
+        strategy = compile_plan('subscription', {})
+        self.assertEqual(strategy.price(base_amount=Decimal('9.99')), Decimal('9.99'))
+
+    def test_subscription_amount_overrides_base(self):
+        strategy = compile_plan('subscription', {'amount': '15'})
+        self.assertEqual(strategy.price(base_amount=Decimal('9.99')), Decimal('15.00'))
+
+    def test_commission(self):
+        strategy = compile_plan('commission', {'percentage': '5'})
+        self.assertEqual(strategy.price(sales_total=Decimal('200')), Decimal('10.00'))
+
+    def test_hybrid(self):
+        strategy = compile_plan('hybrid', {'amount': '5', 'percentage': '2.5'})
+        self.assertEqual(strategy.price(sales_total=Decimal('100')), Decimal('7.50'))
+
+    def test_per_listing(self):
+        strategy = compile_plan('per_listing', {'fee': '0.25'})
+        self.assertEqual(strategy.price(listing_count=7), Decimal('1.75'))
+
+    def test_freemium(self):
+        strategy = compile_plan('freemium', {'fee': '1', 'free_listings': 5})
+        self.assertEqual(strategy.price(listing_count=3), Decimal('0.00'))
+        self.assertEqual(strategy.price(listing_count=8), Decimal('3.00'))
+
+    def test_price_batch(self):
+        """Test a whole array of usage figures is priced at once."""
+        strategy = compile_plan('commission', {'percentage': '10'})
+        amounts = strategy.price_batch(
+            [Decimal('10'), Decimal('0'), Decimal('123.45')], [0, 0, 0], [None, None, None]
+        )
+        self.assertEqual(amounts, [Decimal('1.00'), Decimal('0.00'), Decimal('12.35')])
+
+    def test_invalid_configs_raise(self):
+        for plan_type, config in [
+            ('commission', {}),
+            ('commission', {'percentage': 'abc'}),
+            ('commission', {'percentage': '150'}),
+            ('per_listing', {'fee': '-1'}),
+            ('freemium', {'free_listings': 'many'}),
+            ('subscription', []),
+            ('unknown', {}),
+        ]:
+            with self.subTest(plan_type=plan_type, config=config):
+                with self.assertRaises(ValidationError):
+                    compile_plan(plan_type, config)
+
+
+class StrategyCacheTests(TestCase):
+    """Tests for the per-process strategy cache."""
+
+    def setUp(self):
+        pricing.clear_cache()
+        self.plan = BillingPlan.objects.create(
+            name='Commission', plan_type='commission', config={'percentage': '5'}
+        )
+
+    def test_strategy_compiled_once_per_version(self):
+        """Test repeated lookups reuse the compiled strategy."""
+        with patch.object(pricing, 'compile_plan', wraps=pricing.compile_plan) as compile_spy:
+            first = get_strategy(self.plan)
+            second = get_strategy(BillingPlan.objects.get(pk=self.plan.pk))
+        self.assertIs(first, second)
+        self.assertEqual(compile_spy.call_count, 1)
+
+    def test_saving_plan_invalidates_strategy(self):
+        """Test a config change is picked up after save."""
+        self.assertEqual(self.plan.pricing.price(sales_total=Decimal('100')), Decimal('5.00'))
+        self.plan.config = {'percentage': '10'}
+        self.plan.save()
+        self.assertEqual(self.plan.version, 2)
+        self.assertEqual(self.plan.pricing.price(sales_total=Decimal('100')), Decimal('10.00'))
+
+    def test_queryset_update_invalidates_strategy(self):
+        """Test a config written with update() is not served from the cache."""
+        self.assertEqual(self.plan.pricing.price(sales_total=Decimal('100')), Decimal('5.00'))
+        BillingPlan.objects.filter(pk=self.plan.pk).update(config={'percentage': '20'})
+        plan = BillingPlan.objects.get(pk=self.plan.pk)
+        self.assertEqual(plan.version, 2)
+        self.assertEqual(plan.pricing.price(sales_total=Decimal('100')), Decimal('20.00'))
+        BillingPlan.objects.filter(pk=self.plan.pk).update(name='Renamed')
+        self.assertEqual(BillingPlan.objects.get(pk=self.plan.pk).version, 2)
+
+    def test_concurrent_saves_each_bump_version(self):
+        """Test two copies of a plan saved in turn get distinct versions."""
+        first = BillingPlan.objects.get(pk=self.plan.pk)
+        second = BillingPlan.objects.get(pk=self.plan.pk)
+        first.config = {'percentage': '10'}
+        first.save()
+        second.config = {'percentage': '15'}
+        second.save(update_fields=['config'])
+        self.assertEqual((first.version, second.version), (2, 3))
+        plan = BillingPlan.objects.get(pk=self.plan.pk)
+        self.assertEqual(plan.pricing.price(sales_total=Decimal('100')), Decimal('15.00'))
+
+    def test_invalid_plans_fail_database_check(self):
+        """Test the billing.E001 check lists plans that no longer compile."""
+        BillingPlan.objects.filter(pk=self.plan.pk).update(config={})
+        errors = check_billing_plans(None, databases=['default'])
+        self.assertEqual([error.id for error in errors], ['billing.E001'])
+        self.assertEqual(check_billing_plans(None), [])
+
+    def test_database_check_before_migrate(self):
+        """Test the check is silent while the plan table does not exist yet."""
+        BillingPlan.objects.filter(pk=self.plan.pk).update(config={})
+        with patch('django.db.backends.base.introspection.BaseDatabaseIntrospection.table_names', return_value=[]):
+            self.assertEqual(check_billing_plans(None, databases=['default']), [])
+
+    def test_model_clean_reports_config_errors(self):
+        """Test BillingPlan.clean surfaces strategy validation on the config field."""
+        self.plan.config = {'percentage': 'lots'}
+        with self.assertRaises(ValidationError) as ctx:
+            self.plan.full_clean()
+        self.assertIn('config', ctx.exception.message_dict)
@@ -0,0 +1,199 @@
+"""
+Tests for bank statement reconciliation.
+"""
+
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from users.models import User
+from sellers.models import Seller
+from billing.models import Invoice, Payment
+from billing.reconciliation import parse_csv, parse_mt940, reconcile_file, reconcile_statement
+
+
+MT940_STATEMENT = """:20:STMT0001
+:25:RS35160005080006041893
+:28C:1/1
+:60F:C250201RSD1000,00
+:61:2502030203C9,99NTRFNONREF//BANKREF1
+:86:Payment INV-202501-001 from
+Seller One
+:61:2502030203D50,00NTRFNONREF//BANKREF2
+:86:Outgoing fee
+:61:2502040204C20,00NTRFNONREF//BANKREF3
+:86:Monthly fee RS35260005601001611379
+:62F:C250204RSD979,99
+-
+"""
+
+
+class ReconciliationTests(TestCase):
+    """Tests for matching statement lines to open invoices."""
+
+    def setUp(self):
+        self.sellers = []
+        for i, account in enumerate(['RS35 1600 0508 0006 0418 93', 'RS35260005601001611379']):
+            user = User.objects.create_user(
+                email=f'seller{i}@test.com', username=f'seller{i}@test.com',
+                password='testpass123', is_seller=True
+            )
+            seller = Seller.objects.get(user=user)
+            seller.bank_account_number = account
+            seller.status = 'suspended'
+            seller.save()
+            self.sellers.append(seller)
+
+        self.by_number = Invoice.objects.create(
+            seller=self.sellers[0], invoice_number='INV-202501-001', amount=Decimal('9.99'),
+            due_date=date(2025, 2, 15), status='overdue',
+            period_start=date(2025, 1, 1), period_end=date(2025, 1, 31),
+        )
+        self.by_account = Invoice.objects.create(
+            seller=self.sellers[1], invoice_number='INV-202501-002', amount=Decimal('20.00'),
+            due_date=date(2025, 2, 15), status='pending',
+            period_start=date(2025, 1, 1), period_end=date(2025, 1, 31),
+        )
+
+    def _csv(self, *rows):
+        return ['date,amount,reference,description,account\n'] + [row + '\n' for row in rows]
+
+    def test_csv_matches_by_invoice_number(self):
+        """Test an invoice number in the description matches."""
+        result = reconcile_statement(self._csv('2025-02-03,9.99,REF1,Pay INV-202501-001,'))
+        self.assertEqual(result.matched, 1)
+        self.by_number.refresh_from_db()
+        self.assertEqual(self.by_number.status, 'verified')
+        self.assertEqual(self.by_number.payment.bank_reference, 'REF1')
+
+    def test_csv_matches_by_account_and_amount(self):
+        """Test a payer account plus exact amount matches."""
+        result = reconcile_statement(
+            self._csv('2025-02-03,20.00,REF2,Monthly fee,RS35260005601001611379')
+        )
+        self.assertEqual(result.matched, 1)
+        self.by_account.refresh_from_db()
+        self.assertEqual(self.by_account.status, 'verified')
+
+    def test_amount_mismatch_is_unmatched(self):
+        """Test a partial payment is not matched."""
+        result = reconcile_statement(self._csv('2025-02-03,5.00,REF1,INV-202501-001,'))
+        self.assertEqual(result.matched, 0)
+        self.assertEqual(len(result.unmatched), 1)
+
+    def test_csv_amount_formats(self):
+        """Test the last separator is the decimal one."""
+        rows = self._csv(
+            '2025-02-03,"1.234,56",A,,', '2025-02-03,"1,234.56",B,,',
+            '2025-02-03,"9,99",C,,', '2025-02-03,1 234.50,D,,',
+        )
+        self.assertEqual(
+            [line.amount for line in parse_csv(rows)],
+            [Decimal('1234.56'), Decimal('1234.56'), Decimal('9.99'), Decimal('1234.50')],
+        )
+
+    def test_unreadable_amounts_are_reported(self):
+        """Test non-numeric and non-finite amounts become row errors."""
+        result = reconcile_statement(self._csv(
+            '2025-02-03,NaN,REF1,INV-202501-001,',
+            '2025-02-03,Infinity,REF2,,',
+            '2025-02-03,abc,REF3,,',
+            '2025-02-03,20.00,REF4,Fee,RS35260005601001611379',
+        ))
+        self.assertEqual(result.matched, 1)
+        self.assertEqual(result.errors, [
+            "Line 2: invalid amount 'NaN'",
+            "Line 3: invalid amount 'Infinity'",
+            "Line 4: invalid amount 'abc'",
+        ])
+
+    def test_invoice_matched_only_once(self):
+        """Test two payments for one invoice only match the first."""
+        result = reconcile_statement(self._csv(
+            '2025-02-03,9.99,REF1,INV-202501-001,',
+            '2025-02-04,9.99,REF9,INV-202501-001,',
+        ))
+        self.assertEqual(result.matched, 1)
+        self.assertEqual(len(result.unmatched), 1)
+
+    def test_reimport_counts_duplicates(self):
+        """Test re-importing a statement does not create new payments."""
+        rows = self._csv('2025-02-03,9.99,REF1,INV-202501-001,')
+        reconcile_statement(rows)
+        result = reconcile_statement(rows)
+        self.assertEqual(result.duplicates, 1)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_reactivates_sellers(self):
+        """Test sellers with no remaining overdue invoice are reactivated."""
+        result = reconcile_statement(self._csv('2025-02-03,9.99,REF1,INV-202501-001,'))
+        self.assertEqual(result.sellers_reactivated, 1)
+        self.sellers[0].refresh_from_db()
+        self.assertEqual(self.sellers[0].status, 'active')
+
+    def test_small_batches(self):
+        """Test matches are applied across several batches."""
+        result = reconcile_statement(
+            self._csv(
+                '2025-02-03,9.99,REF1,INV-202501-001,',
+                '2025-02-03,20.00,REF2,,RS35260005601001611379',
+            ),
+            batch_size=1,
+        )
+        self.assertEqual(result.matched, 2)
+
+    def test_parse_mt940_yields_credits_only(self):
+        """Test MT940 credits are parsed with multi-line details."""
+        lines = list(parse_mt940(MT940_STATEMENT.splitlines(keepends=True)))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0].amount, Decimal('9.99'))
+        self.assertEqual(lines[0].reference, 'BANKREF1')
+        self.assertIn('INV-202501-001', lines[0].description)
+        self.assertEqual(lines[1].account, 'RS35260005601001611379')
+
+    def test_reconcile_mt940_file(self):
+        """Test a binary MT940 file is reconciled end to end."""
+        statement = BytesIO(MT940_STATEMENT.encode())
+        statement.name = 'statement.sta'
+        result = reconcile_file(statement)
+        self.assertEqual(result.matched, 2)
+        self.assertEqual(Invoice.objects.filter(status='verified').count(), 2)
+
+
+class ReconcileAdminViewTests(TestCase):
+    """Tests for the admin statement upload."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='admin@test.com', username='admin@test.com', password='testpass123'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_upload_page_loads(self):
+        response = self.client.get(reverse('admin:billing_invoice_reconcile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_upload_statement(self):
+        statement = SimpleUploadedFile(
+            'statement.csv', b'date,amount,reference\n2025-02-03,1.00,REF\n', content_type='text/csv'
+        )
+        response = self.client.post(
+            reverse('admin:billing_invoice_reconcile'), {'statement': statement}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['result'].unmatched), 1)
+
+    def test_upload_with_unreadable_amount(self):
+        statement = SimpleUploadedFile(
+            'statement.csv', b'date,amount,reference\n2025-02-03,NaN,REF\n', content_type='text/csv'
+        )
+        response = self.client.post(
+            reverse('admin:billing_invoice_reconcile'), {'statement': statement}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Line 2: invalid amount')
@@ -0,0 +1,184 @@
+"""
+Tests for the subscription renewal engine.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from sellers.models import Seller, SellerSubscription
+from billing import pricing
+from billing.models import BillingPlan, Invoice, InvoiceSequence
+from billing.renewals import renew_subscriptions
+
+
+TODAY = date(2025, 3, 1)
+
+
+class RenewSubscriptionsTests(TestCase):
+    """Tests for renew_subscriptions."""
+
+    def setUp(self):
+        pricing.clear_cache()
+
+    def _create_subscription(self, email, renewal_date, plan=None):
+        user = User.objects.create_user(
+            email=email, username=email, password='testpass123', is_seller=True
+        )
+        subscription = Seller.objects.get(user=user).subscriptions.get()
+        subscription.renewal_date = renewal_date
+        subscription.start_date = renewal_date - SellerSubscription.BILLING_CYCLE
+        subscription.billing_plan = plan
+        subscription.save()
+        return subscription
+
+    def test_new_subscription_renews_after_one_cycle(self):
+        subscription = self._create_subscription('new@test.com', TODAY)
+        self.assertEqual(
+            SellerSubscription.start(subscription.seller, TODAY).renewal_date,
+            TODAY + timedelta(days=30),
+        )
+
+    def test_due_subscription_is_invoiced_and_advanced(self):
+        """Test the cycle just ended is invoiced in arrears."""
+        subscription = self._create_subscription('due@test.com', TODAY)
+        result = renew_subscriptions(today=TODAY)
+
+        self.assertEqual(result.subscriptions, 1)
+        self.assertEqual(result.invoices_created, 1)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.renewal_date, TODAY + timedelta(days=30))
+
+        invoice = Invoice.objects.get(seller=subscription.seller)
+        self.assertEqual(invoice.amount, Decimal('9.99'))
+        self.assertEqual(invoice.period_start, TODAY - timedelta(days=30))
+        self.assertEqual(invoice.period_end, TODAY - timedelta(days=1))
+        self.assertEqual(invoice.due_date, TODAY + timedelta(days=14))
+        self.assertEqual(invoice.invoice_number, 'INV-202501-001')
+
+    def test_missed_cycles_are_caught_up(self):
+        """Test a subscription several cycles behind gets one invoice per cycle."""
+        subscription = self._create_subscription('late@test.com', TODAY - timedelta(days=65))
+        result = renew_subscriptions(today=TODAY)
+
+        self.assertEqual(result.cycles, 3)
+        self.assertEqual(Invoice.objects.filter(seller=subscription.seller).count(), 3)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.renewal_date, TODAY + timedelta(days=25))
+
+    def test_not_due_subscription_untouched(self):
+        self._create_subscription('later@test.com', TODAY + timedelta(days=1))
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.subscriptions, 0)
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_rerun_is_noop(self):
+        self._create_subscription('due@test.com', TODAY)
+        renew_subscriptions(today=TODAY)
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.subscriptions, 0)
+        self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_usage_based_plan_advances_without_invoice(self):
+        """Test usage-based plans are left to the monthly run."""
+        plan = BillingPlan.objects.create(
+            name='Commission', plan_type='commission', config={'percentage': '5'}
+        )
+        subscription = self._create_subscription('usage@test.com', TODAY, plan)
+        result = renew_subscriptions(today=TODAY)
+
+        self.assertEqual(result.subscriptions, 1)
+        self.assertEqual(result.invoices_created, 0)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.renewal_date, TODAY + timedelta(days=30))
+
+    def test_invalid_plan_holds_subscription(self):
+        """Test an uncompilable plan holds the renewal date instead of aborting."""
+        plan = BillingPlan.objects.create(
+            name='Broken', plan_type='freemium', config={'free_listings': '3'}
+        )
+        held = self._create_subscription('held@test.com', TODAY, plan=plan)
+        renewed = self._create_subscription('renewed@test.com', TODAY)
+        with self.assertLogs('billing.pricing', 'ERROR'):
+            result = renew_subscriptions(today=TODAY, batch_size=1)
+
+        self.assertEqual(result.held, [held.pk])
+        self.assertEqual(result.subscriptions, 1)
+        held.refresh_from_db()
+        renewed.refresh_from_db()
+        self.assertEqual(held.renewal_date, TODAY)
+        self.assertEqual(renewed.renewal_date, TODAY + timedelta(days=30))
+
+        # Billed for the held cycle once the plan is fixed
+        plan.config = {'free_listings': 3}
+        plan.save()
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.held, [])
+        held.refresh_from_db()
+        self.assertEqual(held.renewal_date, TODAY + timedelta(days=30))
+
+    def test_subscription_plan_amount_used(self):
+        plan = BillingPlan.objects.create(
+            name='Pro', plan_type='subscription', config={'amount': '19'}
+        )
+        subscription = self._create_subscription('pro@test.com', TODAY, plan)
+        renew_subscriptions(today=TODAY)
+        invoice = Invoice.objects.get(seller=subscription.seller)
+        self.assertEqual(invoice.amount, Decimal('19.00'))
+        self.assertEqual(invoice.billing_plan, plan)
+
+    def test_suspended_seller_held_until_reactivated(self):
+        """Test a suspended seller's cycles are billed on reactivation, not skipped."""
+        subscription = self._create_subscription('suspended@test.com', TODAY - timedelta(days=30))
+        subscription.seller.suspend()
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.held, [subscription.pk])
+        self.assertEqual(result.invoices_created, 0)
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.renewal_date, TODAY - timedelta(days=30))
+
+        subscription.seller.activate()
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.cycles, 2)
+        self.assertEqual(result.invoices_created, 2)
+
+    def test_existing_cycle_invoice_not_duplicated(self):
+        subscription = self._create_subscription('due@test.com', TODAY)
+        Invoice.objects.create(
+            seller=subscription.seller, invoice_number='INV-MANUAL', amount=9.99,
+            due_date=TODAY, period_start=TODAY - timedelta(days=30),
+            period_end=TODAY - timedelta(days=1),
+        )
+        result = renew_subscriptions(today=TODAY)
+        self.assertEqual(result.invoices_created, 0)
+
+    def test_query_count_does_not_grow_with_subscriptions(self):
+        """Test a batch costs a constant number of queries."""
+        self._create_subscription('first@test.com', TODAY)
+        with CaptureQueriesContext(connection) as small:
+            renew_subscriptions(today=TODAY)
+        Invoice.objects.all().delete()
+        InvoiceSequence.objects.all().delete()
+        for i in range(10):
+            self._create_subscription(f'more{i}@test.com', TODAY)
+        with CaptureQueriesContext(connection) as large:
+            renew_subscriptions(today=TODAY)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(Invoice.objects.count(), 10)
+
+    def test_small_batches(self):
+        for i in range(3):
+            self._create_subscription(f'seller{i}@test.com', TODAY)
+        result = renew_subscriptions(today=TODAY, batch_size=2)
+        self.assertEqual(result.subscriptions, 3)
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_management_command(self):
+        self._create_subscription('due@test.com', TODAY)
+        call_command('renew_subscriptions', '--date', TODAY.isoformat(), verbosity=0)
+        self.assertEqual(Invoice.objects.count(), 1)
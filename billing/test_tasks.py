@@ -0,0 +1,139 @@
+"""
+Tests for set-based invoice status changes and the overdue sweep.
+"""
+
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+from sellers.models import Seller
+from billing.models import Invoice
+from billing.tasks import sweep_overdue_invoices
+
+
+class BillingTestMixin:
+    """Shared seller and invoice fixtures."""
+
+    today = date(2025, 2, 10)
+
+    def _create_seller(self, email):
+        user = User.objects.create_user(
+            email=email, username=email, password='testpass123', is_seller=True
+        )
+        return Seller.objects.get(user=user)
+
+    def _create_invoice(self, seller, number, due_date, status='pending'):
+        return Invoice.objects.create(
+            seller=seller,
+            invoice_number=number,
+            amount=9.99,
+            due_date=due_date,
+            status=status,
+            period_start=due_date - timedelta(days=30),
+            period_end=due_date - timedelta(days=1),
+        )
+
+
+class OverdueSweepTests(BillingTestMixin, TestCase):
+    """Tests for sweep_overdue_invoices."""
+
+    def setUp(self):
+        self.late_seller = self._create_seller('late@test.com')
+        self.ontime_seller = self._create_seller('ontime@test.com')
+        self.late_invoice = self._create_invoice(
+            self.late_seller, 'INV-202501-001', self.today - timedelta(days=1)
+        )
+        self.ontime_invoice = self._create_invoice(
+            self.ontime_seller, 'INV-202501-002', self.today
+        )
+
+    def test_sweep_marks_past_due_invoices_overdue(self):
+        """Test only invoices past their due date become overdue."""
+        invoices, sellers = sweep_overdue_invoices(today=self.today)
+        self.assertEqual((invoices, sellers), (1, 1))
+
+        self.late_invoice.refresh_from_db()
+        self.ontime_invoice.refresh_from_db()
+        self.assertEqual(self.late_invoice.status, 'overdue')
+        self.assertEqual(self.ontime_invoice.status, 'pending')
+
+    def test_sweep_suspends_only_matching_sellers(self):
+        """Test sellers with past-due invoices are suspended."""
+        sweep_overdue_invoices(today=self.today)
+        self.late_seller.refresh_from_db()
+        self.ontime_seller.refresh_from_db()
+        self.assertEqual(self.late_seller.status, 'suspended')
+        self.assertEqual(self.ontime_seller.status, 'active')
+
+    def test_sweep_does_not_unban_banned_sellers(self):
+        """Test banned sellers keep their status."""
+        Seller.objects.filter(pk=self.late_seller.pk).update(status='banned')
+        sweep_overdue_invoices(today=self.today)
+        self.late_seller.refresh_from_db()
+        self.assertEqual(self.late_seller.status, 'banned')
+
+    def test_sweep_query_count_is_constant(self):
+        """Test the sweep does not issue a query per invoice."""
+        for i in range(10):
+            seller = self._create_seller(f'bulk{i}@test.com')
+            self._create_invoice(seller, f'INV-202501-1{i:02d}', date(2025, 1, 1))
+
+        with CaptureQueriesContext(connection) as ctx:
+            invoices, sellers = sweep_overdue_invoices(today=self.today)
+        self.assertEqual(invoices, 11)
+        self.assertEqual(sellers, 11)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+
+    def test_sweep_is_idempotent(self):
+        """Test running the sweep twice changes nothing the second time."""
+        sweep_overdue_invoices(today=self.today)
+        self.assertEqual(sweep_overdue_invoices(today=self.today), (0, 0))
+
+    def test_management_command(self):
+        """Test the management command runs the sweep."""
+        call_command('sweep_overdue_invoices', '--date', self.today.isoformat(), verbosity=0)
+        self.late_invoice.refresh_from_db()
+        self.assertEqual(self.late_invoice.status, 'overdue')
+
+
+class InvoiceQuerySetVerifyTests(BillingTestMixin, TestCase):
+    """Tests for InvoiceQuerySet.mark_verified."""
+
+    def setUp(self):
+        self.seller = self._create_seller('seller@test.com')
+        self.first = self._create_invoice(self.seller, 'INV-202501-001', date(2025, 1, 15))
+        self.second = self._create_invoice(self.seller, 'INV-202501-002', date(2025, 1, 20))
+        Invoice.objects.all().mark_overdue()
+
+    def test_verify_reactivates_seller(self):
+        """Test verifying all overdue invoices reactivates the seller."""
+        invoices, sellers = Invoice.objects.all().mark_verified()
+        self.assertEqual((invoices, sellers), (2, 1))
+        self.seller.refresh_from_db()
+        self.assertEqual(self.seller.status, 'active')
+
+    def test_verify_keeps_seller_suspended_with_other_overdue(self):
+        """Test a seller with another overdue invoice stays suspended."""
+        invoices, sellers = Invoice.objects.filter(pk=self.first.pk).mark_verified()
+        self.assertEqual((invoices, sellers), (1, 0))
+        self.seller.refresh_from_db()
+        self.assertEqual(self.seller.status, 'suspended')
+
+
+class MonthlyInvoiceDispatchTests(TestCase):
+    """Tests for handing the monthly run to the task worker."""
+
+    def test_scheduled_job_queues_one_run(self):
+        from core.models import Task
+        from billing.tasks import MONTHLY_INVOICES_TASK, queue_monthly_invoices
+
+        queue_monthly_invoices()
+        queue_monthly_invoices()
+        task = Task.objects.get()
+        self.assertEqual(task.name, MONTHLY_INVOICES_TASK)
+        date.fromisoformat(task.kwargs['today'])
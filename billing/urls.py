@@ -0,0 +1,10 @@
+"""
+URL patterns for billing views.
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('invoices/<str:invoice_number>/pdf/', views.invoice_pdf_view, name='invoice_pdf'),
+]
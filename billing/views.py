@@ -1,3 +1,61 @@
-from django.shortcuts import render
+"""
+Views for seller-facing billing pages.
+"""
 
-# Create your views here.
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_http_methods
+
+from .models import Invoice
+from .pdf import pdf_is_current, queue_invoice_pdf
+
+# Seconds a client is asked to wait while a missing PDF is rendered
+PDF_RETRY_AFTER = 5
+
+
+@login_required
+@require_http_methods(["GET"])
+def invoice_pdf_view(request, invoice_number):
+    """
+    Download an invoice PDF.
+
+    Django only checks permissions; with ``USE_X_ACCEL_REDIRECT`` the file
+    itself is sent by nginx from its internal ``/protected/`` location.
+    A missing or outdated PDF is queued for the task worker and a 202
+    page asks the user to retry, so no worker blocks on rendering.
+    """
+    invoice = get_object_or_404(
+        Invoice.objects.select_related("seller", "billing_plan"),
+        invoice_number=invoice_number,
+    )
+    if not request.user.is_staff and invoice.seller.user_id != request.user.pk:
+        raise Http404("Invoice not found.")
+
+    if not pdf_is_current(invoice):
+        queue_invoice_pdf(invoice)
+        response = render(
+            request,
+            "billing/invoice_pdf_pending.html",
+            {"page_title": "Preparing Invoice", "invoice": invoice},
+            status=202,
+        )
+        response["Retry-After"] = str(PDF_RETRY_AFTER)
+        return response
+
+    filename = f"{invoice.invoice_number}.pdf"
+    if settings.USE_X_ACCEL_REDIRECT:
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Accel-Redirect"] = f"{settings.PROTECTED_MEDIA_URL}{invoice.pdf_path}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    return FileResponse(
+        open(Path(settings.PROTECTED_MEDIA_ROOT) / invoice.pdf_path, "rb"),
+        as_attachment=True,
+        filename=filename,
+        content_type="application/pdf",
+    )
@@ -4,6 +4,7 @@ Django settings for Vintage Shop project.
 Environment-based configuration using python-decouple.
 """
 
+import copy
 import os
 from pathlib import Path
 from decouple import config, Csv
@@ -44,12 +45,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.timing.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.querybudget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # i18n language selection
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.routers.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -58,7 +62,7 @@ ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.timing.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -97,6 +101,83 @@ else:
         }
     }
 
+# Connection reuse (see core/db.py). With DB_POOL and psycopg 3 + psycopg_pool
+# installed, Django's built-in pool hands out connections checked on
+# checkout; this is the mode to use under ASGI. Otherwise each thread keeps
+# a persistent connection for DB_CONN_MAX_AGE seconds, health-checked
+# before reuse.
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+DB_POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", default=2, cast=int)
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=8, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=10.0, cast=float)
+DB_POOL_MAX_IDLE = config("DB_POOL_MAX_IDLE", default=300.0, cast=float)
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=60, cast=int)
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+
+DB_POOL_ACTIVE = (
+    DB_POOL
+    and ConnectionPool is not None
+    and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+)
+if DB_POOL_ACTIVE:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            "max_idle": DB_POOL_MAX_IDLE,
+            "check": ConnectionPool.check_connection,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Read replicas for catalogue pages (see core/routers.py): comma-separated
+# host[:port] list; each becomes a "replicaN" alias. Credentials default to
+# the primary's; connection reuse is set separately, since every worker
+# keeps connections (or a pool) to each replica as well as the primary
+DB_REPLICA_USER = config("DB_REPLICA_USER", default=DATABASES["default"].get("USER", ""))
+DB_REPLICA_PASSWORD = config("DB_REPLICA_PASSWORD", default=DATABASES["default"].get("PASSWORD", ""))
+DB_REPLICA_POOL_MAX_SIZE = config("DB_REPLICA_POOL_MAX_SIZE", default=DB_POOL_MAX_SIZE, cast=int)
+DB_REPLICA_CONN_MAX_AGE = config("DB_REPLICA_CONN_MAX_AGE", default=DB_CONN_MAX_AGE, cast=int)
+REPLICA_DATABASES = []
+for _index, _host in enumerate(config("DB_REPLICA_HOSTS", default="", cast=Csv()), 1):
+    _host, _, _port = _host.partition(":")
+    _replica = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": _host,
+        "PORT": _port or DATABASES["default"].get("PORT", ""),
+        "USER": DB_REPLICA_USER,
+        "PASSWORD": DB_REPLICA_PASSWORD,
+        "TEST": {"MIRROR": "default"},
+    }
+    if "pool" in _replica.get("OPTIONS", {}):
+        _pool = _replica["OPTIONS"]["pool"]
+        _pool["max_size"] = DB_REPLICA_POOL_MAX_SIZE
+        _pool["min_size"] = min(_pool["min_size"], DB_REPLICA_POOL_MAX_SIZE)
+    else:
+        _replica["CONN_MAX_AGE"] = DB_REPLICA_CONN_MAX_AGE
+    DATABASES[f"replica{_index}"] = _replica
+    REPLICA_DATABASES.append(f"replica{_index}")
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+REPLICA_APPS = {"products", "sellers"}
+REPLICA_VIEWS = {
+    "home",
+    "products_browse",
+    "category_products",
+    "product_detail",
+    "shops_browse",
+    "shop_detail",
+}
+# Seconds a session reads from the primary after it writes
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -139,6 +220,64 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Generated placeholder images (products/placeholders.py)
+PRODUCT_IMAGE_WORKERS = config("PRODUCT_IMAGE_WORKERS", default=2, cast=int)
+
+# Protected files (invoice PDFs) - served by nginx via X-Accel-Redirect
+# after a permission check in Django; never exposed under MEDIA_URL
+PROTECTED_MEDIA_ROOT = config("PROTECTED_MEDIA_ROOT", default=str(BASE_DIR / "protected_media"))
+PROTECTED_MEDIA_URL = "/protected/"
+USE_X_ACCEL_REDIRECT = config("USE_X_ACCEL_REDIRECT", default=not DEBUG, cast=bool)
+
+# Caches. Sessions need a cache shared by every worker process; without a
+# cache server a file-based cache on local disk is still far cheaper than
+# a django_session query per request.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config("SESSION_CACHE_DIR", default=str(BASE_DIR / "cache" / "sessions")),
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+    # Visible to every gunicorn worker; "default" is per process
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config("SHARED_CACHE_DIR", default=str(BASE_DIR / "cache" / "shared")),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Rate-limit counters only, so culling other entries never evicts them;
+    # add/incr are locked, so counts are exact across workers
+    "ratelimit": {
+        "BACKEND": "core.filecache.LockingFileBasedCache",
+        "LOCATION": config("RATELIMIT_CACHE_DIR", default=str(BASE_DIR / "cache" / "ratelimit")),
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+# Sessions: cached reads, writes only on real changes (see core/sessions.py)
+SESSION_ENGINE = "core.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_PURGE_BATCH_SIZE = config("SESSION_PURGE_BATCH_SIZE", default=1000, cast=int)
+
+# Query budgets / N+1 detection (see core/querybudget.py): "raise", "log",
+# "sample" or "off"
+QUERY_BUDGET_MODE = config("QUERY_BUDGET_MODE", default="log" if DEBUG else "sample")
+QUERY_BUDGET_SAMPLE_RATE = config("QUERY_BUDGET_SAMPLE_RATE", default=0.01, cast=float)
+QUERY_BUDGET_DEFAULT = config("QUERY_BUDGET_DEFAULT", default=30, cast=int)
+QUERY_REPEAT_LIMIT = config("QUERY_REPEAT_LIMIT", default=5, cast=int)
+QUERY_BUDGET_EXEMPT_NAMESPACES = {"admin"}
+
+# Clients shown the /health/ details (latency, connection metrics, errors)
+# besides staff users; matched against RATELIMIT_IP_META_KEY
+HEALTH_DETAIL_IPS = config("HEALTH_DETAIL_IPS", default="127.0.0.1,::1", cast=Csv())
+
+# Request timing (see core/timing.py): every request is logged as JSON to
+# logs/access.log; the Server-Timing header exposes the breakdown to clients
+SERVER_TIMING_HEADER = config("SERVER_TIMING_HEADER", default=DEBUG, cast=bool)
+ACCESS_LOG_SLOW_MS = config("ACCESS_LOG_SLOW_MS", default=1000, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -170,7 +309,43 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="apikey")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="noreply@vintageshop.local")
 
+# Verification/reset tokens: "db" (VerificationToken rows) or "signed"
+# (stateless HMAC tokens, no table writes); see users/tokens.py
+VERIFICATION_TOKEN_MODE = config("VERIFICATION_TOKEN_MODE", default="db")
+# Unused tokens kept per user and type in db mode; issuing more drops the oldest
+VERIFICATION_TOKEN_MAX_OUTSTANDING = config(
+    "VERIFICATION_TOKEN_MAX_OUTSTANDING", default=3, cast=int
+)
+VERIFICATION_TOKEN_PRUNE_BATCH_SIZE = config(
+    "VERIFICATION_TOKEN_PRUNE_BATCH_SIZE", default=1000, cast=int
+)
+
+# Password hashing pool for the async auth views (see users/hashing.py)
+AUTH_HASHER_THREADS = config("AUTH_HASHER_THREADS", default=2, cast=int)
+AUTH_HASHER_MAX_QUEUE = config("AUTH_HASHER_MAX_QUEUE", default=32, cast=int)
+
+# Rate limits for the auth views (see core/ratelimit.py). Behind nginx the
+# client address arrives in X-Real-IP, so set RATELIMIT_IP_META_KEY=HTTP_X_REAL_IP.
+# RATELIMIT_CACHE must be shared by all workers (core.W002 flags LocMem)
+RATELIMIT_ENABLED = config("RATELIMIT_ENABLED", default=True, cast=bool)
+RATELIMIT_CACHE = config("RATELIMIT_CACHE", default="ratelimit")
+RATELIMIT_IP_META_KEY = config("RATELIMIT_IP_META_KEY", default="REMOTE_ADDR")
+RATELIMIT_RATES = {
+    "login": {"ip": "20/m", "account": "5/m"},
+    "password_reset": {"ip": "10/m", "account": "3/h"},
+    "verify_email_resend": {"ip": "10/m", "account": "3/h"},
+}
+
+# Email outbox (see core/mail.py): one connection per batch, throttled
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=100, cast=int)
+EMAIL_OUTBOX_RATE_LIMIT = config("EMAIL_OUTBOX_RATE_LIMIT", default=10.0, cast=float)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5, cast=int)
+
 # Logging
+# Log files are rotated when they would grow past LOG_MAX_BYTES
+LOG_MAX_BYTES = config("LOG_MAX_BYTES", default=10 * 1024 * 1024, cast=int)
+LOG_BACKUP_COUNT = config("LOG_BACKUP_COUNT", default=5, cast=int)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -179,14 +354,36 @@ LOGGING = {
             "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "core.logformat.JsonFormatter",
+        },
     },
     "handlers": {
+        # Written by a background thread per process (core/logqueue.py)
         "file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
+            "class": "core.logqueue.QueuedRotatingFileHandler",
             "filename": BASE_DIR / "logs" / "debug.log",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
             "formatter": "verbose",
         },
+        "access": {
+            "level": "INFO",
+            "class": "core.logqueue.QueuedRotatingFileHandler",
+            "filename": BASE_DIR / "logs" / "access.log",
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "formatter": "json",
+        },
+    },
+    "loggers": {
+        # One JSON line per request (core/timing.py)
+        "core.access": {
+            "handlers": ["access"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
     "root": {
         "handlers": ["file"],
@@ -197,6 +394,33 @@ LOGGING = {
 # Create logs directory
 os.makedirs(BASE_DIR / "logs", exist_ok=True)
 
+# Billing
+BILLING_INVOICE_DUE_DAYS = config("BILLING_INVOICE_DUE_DAYS", default=14, cast=int)
+BILLING_RUN_BATCH_SIZE = config("BILLING_RUN_BATCH_SIZE", default=500, cast=int)
+BILLING_PDF_WORKERS = config("BILLING_PDF_WORKERS", default=2, cast=int)
+
+# Scheduler - runs in exactly one gunicorn worker (see core/scheduler.py)
+SCHEDULER_ENABLED = config("SCHEDULER_ENABLED", default=False, cast=bool)
+SCHEDULER_LOCK_FILE = config("SCHEDULER_LOCK_FILE", default=str(BASE_DIR / "logs" / "scheduler.lock"))
+SCHEDULER_LOCK_ID = config("SCHEDULER_LOCK_ID", default=72_001, cast=int)
+SCHEDULER_ELECTION_INTERVAL = config("SCHEDULER_ELECTION_INTERVAL", default=30, cast=int)
+
+# Task queue (see core/taskqueue.py; workers run via manage.py run_tasks)
+TASK_WORKER_CONCURRENCY = config("TASK_WORKER_CONCURRENCY", default=2, cast=int)
+TASK_POLL_INTERVAL = config("TASK_POLL_INTERVAL", default=1.0, cast=float)
+TASK_MAX_ATTEMPTS = config("TASK_MAX_ATTEMPTS", default=5, cast=int)
+TASK_RETRY_BACKOFF = config("TASK_RETRY_BACKOFF", default=30, cast=int)
+TASK_RETRY_BACKOFF_MAX = config("TASK_RETRY_BACKOFF_MAX", default=3600, cast=int)
+# A running task whose heartbeat is older than TASK_LOCK_TIMEOUT is requeued
+TASK_HEARTBEAT_INTERVAL = config("TASK_HEARTBEAT_INTERVAL", default=30, cast=int)
+TASK_LOCK_TIMEOUT = config("TASK_LOCK_TIMEOUT", default=600, cast=int)
+TASK_RETENTION_DAYS = config("TASK_RETENTION_DAYS", default=7, cast=int)
+
+# Catalog lookups (categories, conditions) cached for the storefront, in a
+# cache every worker sees so an admin change invalidates it everywhere
+CATALOG_CACHE_ALIAS = config("CATALOG_CACHE_ALIAS", default="shared")
+CATALOG_CACHE_TIMEOUT = config("CATALOG_CACHE_TIMEOUT", default=60 * 60, cast=int)
+
 # Site Configuration
 SITE_DOMAIN = config("SITE_DOMAIN", default="http://localhost:8000")
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="noreply@vintageshop.local")
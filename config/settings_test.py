@@ -23,12 +23,27 @@ PASSWORD_HASHERS = [
 # Disable slow middleware
 MIDDLEWARE = [m for m in MIDDLEWARE if 'LoggingMiddleware' not in m]
 
+# Fail any test request that blows its query budget or repeats a query
+QUERY_BUDGET_MODE = 'raise'
+
 # Use simple in-memory cache for tests
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
+    },
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ratelimit',
+    },
 }
 
 # Disable logging in tests
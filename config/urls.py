@@ -9,6 +9,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
+from core.views import health_view
 from . import views
 
 # Non-i18n patterns (language-independent)
@@ -17,6 +18,8 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     # Language switching
     path("i18n/", include("django.conf.urls.i18n")),
+    # Health check (load balancer / uptime monitoring)
+    path("health/", health_view, name="health"),
 ]
 
 # i18n patterns (language-dependent routes)
@@ -30,6 +33,9 @@ urlpatterns += i18n_patterns(
     # Products
     path("products/", include("products.urls")),
     
+    # Billing
+    path("billing/", include("billing.urls")),
+    
     # Home & Core
     path("", views.home_view, name="home"),
     
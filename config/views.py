@@ -3,16 +3,22 @@ Core views for Vintage Shop.
 """
 
 from django.shortcuts import render
-from products.models import Product, ProductCategory
+from products.catalog import get_categories
+from products.models import Product
 
 
 def home_view(request):
     """Home page view."""
     # Get featured products (latest published products)
-    featured_products = Product.objects.filter(status='published').order_by('-created_at')[:6]
+    featured_products = (
+        Product.objects.filter(status='published')
+        .select_related('category')
+        .prefetch_related('images')
+        .order_by('-created_at')[:6]
+    )
     
     # Get all categories
-    categories = ProductCategory.objects.all()
+    categories = get_categories()
     
     context = {
         'page_title': 'Home',
@@ -20,6 +20,16 @@ def pytest_configure():
         django.setup()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with empty caches so cached lookups never leak between tests."""
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    yield
+
+
 def pytest_collection_modifyitems(config, items):
     """
     Mark slow tests automatically.
@@ -31,3 +41,68 @@ def pytest_collection_modifyitems(config, items):
         # Mark view tests as slow (they're slower than model/form tests)
         if 'test_views' in str(item.fspath):
             item.add_marker(pytest.mark.slow)
+
+
+@pytest.fixture
+def catalogue_dataset(db):
+    """
+    Factory for a marketplace of a given size.
+
+    ``catalogue_dataset(n)`` creates ``n`` shops besides the seller under
+    test, ``n`` published products (each with an image) for that seller,
+    and ``n`` orders for them, and returns the objects views need.
+    """
+    from types import SimpleNamespace
+    from decimal import Decimal
+
+    from orders.models import Order, OrderItem
+    from products.models import Product, ProductCategory, ProductCondition, ProductImage
+    from sellers.models import Seller
+    from users.models import User
+
+    def build(size):
+        category = ProductCategory.objects.create(name='Furniture', slug='furniture')
+        condition = ProductCondition.objects.create(name='Used')
+        seller_user = User.objects.create_user(
+            email='budget-seller@test.com', username='budget-seller@test.com',
+            password='testpass123', is_seller=True, email_verified=True,
+        )
+        seller = Seller.objects.get(user=seller_user)
+        buyer = User.objects.create_user(
+            email='budget-buyer@test.com', username='budget-buyer@test.com',
+            password='testpass123',
+        )
+        for i in range(size):
+            User.objects.create_user(
+                email=f'shop{i}@test.com', username=f'shop{i}@test.com',
+                password='testpass123', is_seller=True,
+            )
+        products = Product.objects.bulk_create(
+            Product(
+                seller=seller, title=f'Chair {i}', description='Oak chair',
+                price=Decimal('20.00'), category=category, condition=condition,
+                stock=2, status='published',
+            )
+            for i in range(size)
+        )
+        ProductImage.objects.bulk_create(
+            ProductImage(product=product, image=f'products/chair{i}.jpg', order=0)
+            for i, product in enumerate(products)
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                buyer=buyer, total_price=Decimal('20.00'),
+                shipping_name='Buyer', shipping_address='1 Test Street',
+            )
+            for _ in range(size)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, price_at_purchase=Decimal('20.00'))
+            for order, product in zip(orders, products)
+        )
+        return SimpleNamespace(
+            seller_user=seller_user, seller=seller, buyer=buyer,
+            category=category, product=products[0],
+        )
+
+    return build
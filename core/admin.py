@@ -1,3 +1,66 @@
+"""Admin configuration for core app."""
+
 from django.contrib import admin
+from django.utils import timezone
+from .models import JobRun, OutboxEmail, Task
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ["job_id", "status", "started_at", "duration", "hostname", "pid"]
+    list_filter = ["status", "job_id"]
+    readonly_fields = [
+        "job_id", "status", "started_at", "finished_at", "duration", "hostname", "pid", "error",
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ["name", "queue", "status", "attempts", "run_at", "finished_at"]
+    list_filter = ["status", "queue"]
+    search_fields = ["name"]
+    readonly_fields = [
+        "name", "args", "kwargs", "queue", "status", "run_at", "attempts", "max_attempts",
+        "last_error", "locked_by", "locked_at", "heartbeat_at", "finished_at", "created_at", "updated_at",
+    ]
+    actions = ["requeue"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def requeue(self, request, queryset):
+        """Admin action to retry dead-lettered tasks."""
+        count = queryset.filter(status="dead").update(
+            status="queued", attempts=0, run_at=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"{count} task(s) requeued.")
+    requeue.short_description = "Requeue selected dead tasks"
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipient", "status", "attempts", "created_at", "sent_at"]
+    list_filter = ["status"]
+    search_fields = ["recipient", "subject"]
+    readonly_fields = [
+        "recipient", "subject", "body", "from_email", "status", "send_after", "attempts",
+        "last_error", "locked_at", "sent_at", "created_at", "updated_at",
+    ]
+    actions = ["requeue"]
+
+    def has_add_permission(self, request):
+        return False
 
-# Register your models here.
+    def requeue(self, request, queryset):
+        """Admin action to retry dead-lettered emails."""
+        count = queryset.filter(status="dead").update(
+            status="queued", attempts=0, send_after=timezone.now()
+        )
+        self.message_user(request, f"{count} email(s) requeued.")
+    requeue.short_description = "Requeue selected dead emails"
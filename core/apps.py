@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        """Register deployment checks and connection tracking signals."""
+        import core.checks  # noqa
+        import core.db  # noqa
+        import core.timing  # noqa
@@ -0,0 +1,242 @@
+"""
+View-level benchmarks against synthetic datasets.
+
+Each size in ``SIZES`` gets its own database (``bench_<size>``, or a
+file in ``benchmarks/`` on SQLite, kept between runs), filled once by
+``core.dataset.generate_dataset``, since a million products take
+minutes to build. A database whose row counts do not match
+``dataset_shape``, such as one left by an interrupted generation, is
+dropped and generated again. ``run_benchmarks`` renders every page in
+``BENCHMARK_PAGES`` through the test client, discarding ``WARMUP``
+requests and timing ``rounds`` more. It records p50/p95 latency, the
+query count and the response size. Timings are for warm caches and
+the whole middleware stack, with query budgets switched off.
+
+Runs are appended to a JSON history file, and ``compare_runs`` flags a
+page as regressed when its median latency grows by more than
+``threshold`` (and ``MIN_REGRESSION_MS``), its response by more than
+``threshold``, when it runs more queries than before, or when its
+status code changes or is not 200 (an error page is small and fast, so
+it would otherwise look like an improvement). p95 is
+recorded but not compared; with a few dozen samples it is mostly noise.
+"""
+
+import json
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from billing.models import Invoice
+from core.dataset import generate_dataset
+from products.models import Product, ProductCategory
+from sellers.models import Seller
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DATASET_SEED = 0
+WARMUP = 2
+MIN_REGRESSION_MS = 2.0
+BENCHMARK_DIR = Path(settings.BASE_DIR) / "benchmarks"
+DEFAULT_HISTORY = BENCHMARK_DIR / "history.json"
+
+# (name, URL name, dataset object passed to reverse(), query string)
+BENCHMARK_PAGES = [
+    ("home", "home", None, ""),
+    ("browse", "products_browse", None, ""),
+    ("browse_search", "products_browse", None, "q=jacket"),
+    ("browse_sorted", "products_browse", None, "sort=price"),
+    ("browse_page_10", "products_browse", None, "page=10"),
+    ("category", "category_products", "category", ""),
+    ("product_detail", "product_detail", "product", ""),
+    ("shops", "shops_browse", None, ""),
+    ("shop_detail", "shop_detail", "shop", ""),
+    ("login", "login", None, ""),
+    ("register", "register", None, ""),
+]
+
+
+def dataset_shape(products):
+    """Sellers, orders and invoices generated alongside ``products``."""
+    sellers = max(products // 100, 1)
+    return {"sellers": sellers, "products": products, "orders": products // 10, "invoices": sellers}
+
+
+def dataset_is_complete(shape):
+    """
+    Whether the database holds every seller, product and invoice of
+    ``shape``. Kinds are generated in order and invoices last, so an
+    interrupted run always falls short here. Orders are not compared:
+    generation skips the odd order whose products were all missing.
+    """
+    return (
+        Seller.objects.count() == shape["sellers"]
+        and Product.objects.count() == shape["products"]
+        and Invoice.objects.count() == shape["invoices"]
+    )
+
+
+@contextmanager
+def benchmark_database(size, workers=1, report=print):
+    """
+    Switch the default connection to the kept database for ``size``,
+    generating its dataset on first use or when it is incomplete.
+    """
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    original_name = connection.settings_dict["NAME"]
+    original_test_name = test_settings.get("NAME")
+    if connection.vendor == "sqlite":
+        BENCHMARK_DIR.mkdir(exist_ok=True)
+        test_settings["NAME"] = str(BENCHMARK_DIR / f"bench_{size}.sqlite3")
+    else:
+        test_settings["NAME"] = f"bench_{size}"
+    shape = dataset_shape(SIZES[size])
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=True)
+    try:
+        if not dataset_is_complete(shape):
+            if Seller.objects.exists():
+                # generate_dataset refuses to add to an existing seed
+                report(f"The {size} dataset is incomplete, recreating its database...")
+                connection.creation.destroy_test_db(original_name, verbosity=0, keepdb=False)
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False, keepdb=True,
+                )
+            report(f"Generating the {size} dataset...")
+            generate_dataset(**shape, seed=DATASET_SEED, workers=workers, report=report)
+        yield
+    finally:
+        connection.creation.destroy_test_db(original_name, verbosity=0, keepdb=True)
+        test_settings["NAME"] = original_test_name
+
+
+def page_arguments():
+    """Objects the parametrised pages are requested for."""
+    return {
+        "category": ProductCategory.objects.order_by("pk").values_list("pk", flat=True).first(),
+        "product": Product.objects.filter(status="published").order_by("pk")
+        .values_list("pk", flat=True).first(),
+        # The largest shop, where per-product costs show most
+        "shop": Seller.objects.annotate(product_count=Count("products"))
+        .order_by("-product_count").values_list("shop_slug", flat=True).first(),
+    }
+
+
+def summarize(timings):
+    """p50/p95 in milliseconds of a list of durations in seconds."""
+    timings = sorted(timings)
+    p95 = statistics.quantiles(timings, n=20, method="inclusive")[18] if len(timings) > 1 else timings[0]
+    return {
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+    }
+
+
+def run_benchmarks(rounds=20, pages=None):
+    """Time each page and return ``{name: {p50_ms, p95_ms, queries, bytes, status}}``."""
+    with override_settings(
+        QUERY_BUDGET_MODE="off", ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+    ):
+        return _run_pages(rounds, pages or BENCHMARK_PAGES)
+
+
+def _run_pages(rounds, pages):
+    client = Client()
+    arguments = page_arguments()
+    results = {}
+    for name, url_name, argument, query in pages:
+        url = reverse(url_name, args=[arguments[argument]] if argument else [])
+        if query:
+            url = f"{url}?{query}"
+
+        for _ in range(WARMUP):
+            client.get(url)
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        # Counted separately: capturing queries slows every query down
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        results[name] = {
+            **summarize(timings),
+            "queries": len(queries),
+            "bytes": len(response.content),
+            "status": response.status_code,
+        }
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_history(path=DEFAULT_HISTORY):
+    """All recorded runs, oldest first."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    return json.loads(path.read_text())
+
+
+def record_run(size, rounds, results, label="", path=DEFAULT_HISTORY):
+    """Append a run to the history file and return it."""
+    run = {
+        "label": label,
+        "revision": _git_revision(),
+        "timestamp": timezone.now().isoformat(),
+        "size": size,
+        "rounds": rounds,
+        "results": results,
+    }
+    path = Path(path)
+    history = load_history(path)
+    history.append(run)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2) + "\n")
+    return run
+
+
+def compare_runs(baseline, current, threshold=0.10):
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        growth = result["p50_ms"] - before["p50_ms"]
+        if growth > MIN_REGRESSION_MS and growth > before["p50_ms"] * threshold:
+            regressions.append(
+                f"{name}: p50 {before['p50_ms']}ms -> {result['p50_ms']}ms "
+                f"(+{growth / before['p50_ms']:.0%})"
+            )
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']} -> {result['queries']}")
+        if result["bytes"] > before["bytes"] * (1 + threshold):
+            regressions.append(f"{name}: bytes {before['bytes']} -> {result['bytes']}")
+        if result["status"] != before["status"] or result["status"] != 200:
+            regressions.append(f"{name}: status {before['status']} -> {result['status']}")
+    return regressions
+
+
+def latest_run(history, size, label=None):
+    """The most recent run of ``size`` (with ``label``, if given) in ``history``."""
+    for run in reversed(history):
+        if run["size"] == size and (label is None or run["label"] == label):
+            return run
+    return None
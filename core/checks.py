@@ -0,0 +1,37 @@
+"""
+System checks for deployment settings.
+"""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register(deploy=True)
+def check_connection_pool(app_configs, **kwargs):
+    """Warn when DB_POOL is requested but the pool cannot be used."""
+    if settings.DB_POOL and not settings.DB_POOL_ACTIVE:
+        return [
+            Warning(
+                "DB_POOL is set but psycopg_pool is not installed or the database is "
+                "not PostgreSQL; falling back to persistent connections.",
+                hint="pip install 'psycopg[binary,pool]'",
+                id="core.W001",
+            )
+        ]
+    return []
+
+
+@register(deploy=True)
+def check_ratelimit_cache(app_configs, **kwargs):
+    """Warn when rate-limit counters live in a per-process cache."""
+    backend = settings.CACHES.get(settings.RATELIMIT_CACHE, {}).get("BACKEND", "")
+    if settings.RATELIMIT_ENABLED and backend.endswith("LocMemCache"):
+        return [
+            Warning(
+                f"RATELIMIT_CACHE '{settings.RATELIMIT_CACHE}' is a per-process cache, so "
+                "every rate limit is multiplied by the number of workers.",
+                hint="Set RATELIMIT_CACHE=ratelimit (or another cache all workers share).",
+                id="core.W002",
+            )
+        ]
+    return []
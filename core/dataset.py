@@ -0,0 +1,332 @@
+"""
+Synthetic marketplace data for benchmarks and load tests.
+
+``generate_dataset`` creates sellers (with users and subscriptions),
+buyers, products, orders with items, and invoices in chunks of
+``chunk_size`` rows written with ``bulk_create``. Each chunk draws from
+its own ``random.Random`` seeded with ``(seed, kind, chunk index)`` and
+returns the primary keys it created, which are collected in chunk order.
+Orders refer to products by their position in that list, never by a
+primary key range, so a given seed produces the same rows, apart from
+primary keys, whether chunks run serially or finish in any order in
+``workers`` processes, and whatever other seeds the database holds.
+
+Distributions aim for the shape of a real catalogue rather than a
+uniform one: seller sizes follow a Zipf law (a few large shops, a long
+tail of small ones), prices are log-normal within each category's range
+(many cheap items, few expensive ones), and most products are published
+and most orders delivered. Placeholder image files are drawn offline by
+``products.placeholders`` when ``images`` is set.
+
+Generated users share the password ``DATASET_PASSWORD`` and have emails
+ending in ``@dataset.example`` tagged with the seed, so several seeds
+can coexist in one database. Worker processes are meant for PostgreSQL;
+SQLite serializes writers and gains nothing from them.
+"""
+
+import logging
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from billing.models import Invoice
+from orders.models import Order, OrderItem
+from products.management.commands.seed_products import CONDITIONS, PRICE_RANGES, PRODUCT_TEMPLATES
+from products.models import Product, ProductCategory, ProductCondition
+from products.placeholders import create_missing_placeholder_images
+from sellers.models import Seller, SellerSubscription
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+DATASET_PASSWORD = "dataset-password"
+EMAIL_DOMAIN = "dataset.example"
+ZIPF_EXPONENT = 1.1
+PRICE_SIGMA = 0.9
+PRODUCT_STATUS_WEIGHTS = {"published": 85, "draft": 8, "sold": 5, "archived": 2}
+ORDER_STATUS_WEIGHTS = {
+    "delivered": 50, "shipped": 15, "processing": 10, "pending": 15, "cancelled": 5,
+    "refunded": 5,
+}
+INVOICE_STATUS_WEIGHTS = {"verified": 80, "pending": 12, "overdue": 6, "cancelled": 2}
+MAX_ITEMS_PER_ORDER = 4
+
+
+class DatasetExists(Exception):
+    """Data for this seed has already been generated."""
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    """Cumulative weights giving rank ``i`` a share proportional to ``1 / i**exponent``."""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def skewed_price(rng, low, high):
+    """Log-normal price clamped to ``[low, high]``, centred near the bottom of the range."""
+    median = low + (high - low) / 5
+    price = min(max(rng.lognormvariate(0, PRICE_SIGMA) * median, low), high)
+    return Decimal(f"{price:.2f}")
+
+
+def _chunks(total, chunk_size):
+    """``(index, start, count)`` for each chunk of ``total`` rows."""
+    return [
+        (index, start, min(chunk_size, total - start))
+        for index, start in enumerate(range(0, total, chunk_size))
+    ]
+
+
+def _rng(seed, kind, index):
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _product_chunk(context, index, start, count):
+    """Create ``count`` products; sellers are drawn by Zipf rank."""
+    rng = _rng(context["seed"], "products", index)
+    seller_ids = context["seller_ids"]
+    categories = context["categories"]
+    products = []
+    for number in range(start, start + count):
+        category_id, category_name = rng.choice(categories)
+        template = rng.choice(PRODUCT_TEMPLATES[category_name])
+        products.append(Product(
+            seller_id=rng.choices(seller_ids, cum_weights=context["seller_weights"])[0],
+            title=f"{template['title']} #{number + 1}",
+            description=template["description"],
+            price=skewed_price(rng, *PRICE_RANGES[category_name]),
+            category_id=category_id,
+            condition_id=rng.choice(context["condition_ids"]),
+            stock=rng.choices((0, 1, 2, 3, 5), weights=(5, 70, 15, 7, 3))[0],
+            status=_weighted(rng, PRODUCT_STATUS_WEIGHTS),
+        ))
+    with transaction.atomic():
+        Product.objects.bulk_create(products)
+    return [product.pk for product in products]
+
+
+def _order_chunk(context, index, start, count):
+    """Create ``count`` orders with their items; popular products sell more."""
+    rng = _rng(context["seed"], "orders", index)
+    # In generation order, so a position names the same product in every run
+    product_ids = context["product_ids"]
+    last = len(product_ids) - 1
+    picks = [
+        [product_ids[int(last * rng.random() ** 2)] for _ in range(rng.randint(1, MAX_ITEMS_PER_ORDER))]
+        for _ in range(count)
+    ]
+    prices = dict(
+        Product.objects.filter(pk__in={pk for pick in picks for pk in pick}).values_list("pk", "price")
+    )
+    buyer_ids = context["buyer_ids"]
+    orders, items = [], []
+    for pick in picks:
+        lines = [(pk, rng.choices((1, 2), weights=(9, 1))[0]) for pk in dict.fromkeys(pick) if pk in prices]
+        if not lines:
+            continue
+        orders.append(Order(
+            buyer_id=rng.choice(buyer_ids),
+            status=_weighted(rng, ORDER_STATUS_WEIGHTS),
+            total_price=sum(prices[pk] * quantity for pk, quantity in lines),
+            shipping_name="Dataset Buyer",
+            shipping_address=f"{rng.randint(1, 200)} Generated Street",
+        ))
+        items.append(lines)
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=pk, quantity=quantity, price_at_purchase=prices[pk])
+            for order, lines in zip(orders, items)
+            for pk, quantity in lines
+        ])
+    return [order.pk for order in orders]
+
+
+def _invoice_chunk(context, index, start, count):
+    """Create invoices, one per seller per month going back from last month."""
+    rng = _rng(context["seed"], "invoices", index)
+    seller_ids = context["seller_ids"]
+    this_month = context["this_month"]
+    invoices = []
+    for number in range(start, start + count):
+        seller_id = seller_ids[number % len(seller_ids)]
+        months_back = number // len(seller_ids) + 1
+        year, month = divmod(this_month.year * 12 + this_month.month - 1 - months_back, 12)
+        period_start = date(year, month + 1, 1)
+        period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        invoices.append(Invoice(
+            seller_id=seller_id,
+            invoice_number=f"GEN-{period_start:%Y%m}-{seller_id}",
+            amount=skewed_price(rng, 9, 400),
+            due_date=period_end + timedelta(days=14),
+            status=_weighted(rng, INVOICE_STATUS_WEIGHTS),
+            period_start=period_start,
+            period_end=period_end,
+        ))
+    with transaction.atomic():
+        Invoice.objects.bulk_create(invoices)
+    return [invoice.pk for invoice in invoices]
+
+
+def _run_chunk(function, context, chunk):
+    return function(context, *chunk)
+
+
+class _Runner:
+    """Runs chunk functions serially or on a process pool."""
+
+    def __init__(self, workers, report):
+        self.workers = workers
+        self.report = report
+        self.pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            # Forked workers must open their own connections
+            connections.close_all()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=django.setup)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def run(self, kind, function, context, total, chunk_size):
+        """Run ``function`` over the chunks of ``total`` rows; return their pks in chunk order."""
+        chunks = _chunks(total, chunk_size)
+        if self.pool is not None:
+            results = self.pool.map(_run_chunk, [function] * len(chunks), [context] * len(chunks), chunks)
+        else:
+            results = (function(context, *chunk) for chunk in chunks)
+        by_index = {}
+        created = 0
+        for (index, _, _), pks in zip(chunks, results):
+            by_index[index] = pks
+            created += len(pks)
+            self.report(f"{kind}: {created}/{total}")
+        return array("q", (pk for index in sorted(by_index) for pk in by_index[index]))
+
+
+def _reference_data():
+    """Categories and conditions, shared with ``seed_products``."""
+    categories = [
+        (ProductCategory.objects.get_or_create(name=name, defaults={"slug": slugify(name)})[0].pk, name)
+        for name in PRODUCT_TEMPLATES
+    ]
+    conditions = [
+        ProductCondition.objects.get_or_create(name=name, defaults={"order": order})[0].pk
+        for order, name in enumerate(CONDITIONS)
+    ]
+    return categories, conditions
+
+
+def _create_users(seed, role, count, chunk_size, password):
+    users = [
+        User(
+            email=f"{role}{number}.s{seed}@{EMAIL_DOMAIN}",
+            username=f"{role}{number}.s{seed}@{EMAIL_DOMAIN}",
+            password=password,
+            is_seller=role == "seller",
+            email_verified=True,
+        )
+        for number in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=chunk_size)
+    return list(
+        User.objects.filter(email__endswith=f".s{seed}@{EMAIL_DOMAIN}", email__startswith=role)
+        .order_by("pk").values_list("pk", flat=True)
+    )
+
+
+def _create_sellers(seed, user_ids, chunk_size):
+    # bulk_create skips the post_save signal that normally creates sellers
+    Seller.objects.bulk_create([
+        Seller(
+            user_id=user_id,
+            shop_name=f"Dataset Shop {number}",
+            shop_slug=f"dataset-{seed}-{number}",
+            location=f"City {number % 50}",
+            status="active",
+            is_verified=True,
+            bank_account_holder=f"Dataset Seller {number}",
+            bank_name="Dataset Bank",
+            bank_account_number=f"IBAN{seed:04d}{number:08d}",
+        )
+        for number, user_id in enumerate(user_ids)
+    ], batch_size=chunk_size)
+    seller_ids = list(
+        Seller.objects.filter(user_id__in=user_ids).order_by("pk").values_list("pk", flat=True)
+    )
+    today = timezone.now().date()
+    SellerSubscription.objects.bulk_create([
+        SellerSubscription(
+            seller_id=seller_id, start_date=today, renewal_date=today + timedelta(days=30),
+            status="active", amount=Decimal("9.99"),
+        )
+        for seller_id in seller_ids
+    ], batch_size=chunk_size)
+    return seller_ids
+
+
+def generate_dataset(sellers, products, orders=0, invoices=0, buyers=None, seed=0,
+                     chunk_size=5000, workers=1, images=False, report=logger.info):
+    """
+    Generate a marketplace and return the number of rows created per kind.
+
+    ``buyers`` defaults to one per seller. With ``images`` every product
+    gets a placeholder image file. Raises ``DatasetExists`` if users for
+    ``seed`` are already present.
+    """
+    if User.objects.filter(email__endswith=f".s{seed}@{EMAIL_DOMAIN}").exists():
+        raise DatasetExists(f"A dataset with seed {seed} already exists")
+    if sellers < 1 or (orders and products < 1):
+        raise ValueError("Need at least one seller, and products to place orders for")
+    buyers = sellers if buyers is None else buyers
+
+    password = make_password(DATASET_PASSWORD)
+    categories, condition_ids = _reference_data()
+    with transaction.atomic():
+        seller_ids = _create_sellers(
+            seed, _create_users(seed, "seller", sellers, chunk_size, password), chunk_size
+        )
+        buyer_ids = _create_users(seed, "buyer", max(buyers, 1), chunk_size, password)
+    report(f"sellers: {len(seller_ids)}, buyers: {len(buyer_ids)}")
+
+    # Shuffle which seller gets which Zipf rank so shop size is unrelated to pk
+    ranked = list(seller_ids)
+    _rng(seed, "sellers", 0).shuffle(ranked)
+    context = {
+        "seed": seed,
+        "seller_ids": ranked,
+        "seller_weights": zipf_weights(len(ranked)),
+        "buyer_ids": buyer_ids,
+        "categories": categories,
+        "condition_ids": condition_ids,
+        "this_month": timezone.now().date().replace(day=1),
+    }
+    counts = {"sellers": len(seller_ids), "buyers": len(buyer_ids)}
+    with _Runner(workers, report) as runner:
+        # Compact, since it is pickled into every order chunk
+        context["product_ids"] = runner.run("products", _product_chunk, context, products, chunk_size)
+        counts["products"] = len(context["product_ids"])
+        if images:
+            counts["images"] = create_missing_placeholder_images(
+                Product.objects.filter(seller_id__in=seller_ids),
+                max_workers=workers, batch_size=chunk_size,
+            )
+            report(f"images: {counts['images']}")
+        counts["orders"] = len(runner.run("orders", _order_chunk, context, orders, chunk_size))
+        counts["invoices"] = len(runner.run("invoices", _invoice_chunk, context, invoices, chunk_size))
+    return counts
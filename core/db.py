@@ -0,0 +1,75 @@
+"""
+Database connection metrics and health checks.
+
+Two connection modes are configured in settings (``DB_POOL``):
+
+* ``pool``: Django's psycopg 3 pool, shared by the threads of a worker.
+  The pool checks each connection when it is handed out, and its own
+  statistics give checked-out, waiting and created counts.
+* ``persistent``: one connection per thread, reused for
+  ``CONN_MAX_AGE`` seconds and checked before reuse
+  (``CONN_HEALTH_CHECKS``). Counts come from ``connection_created``.
+
+``check_database()`` runs a round trip for the health endpoint.
+"""
+
+import threading
+import time
+import weakref
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_created = {}
+_open = weakref.WeakSet()
+
+
+@receiver(connection_created)
+def _track_connection(sender, connection, **kwargs):
+    with _lock:
+        _created[connection.alias] = _created.get(connection.alias, 0) + 1
+        _open.add(connection)
+
+
+def connection_mode(alias="default"):
+    """``"pool"``, ``"persistent"`` or ``"per-request"``."""
+    if getattr(connections[alias], "pool", None) is not None:
+        return "pool"
+    return "persistent" if connections[alias].settings_dict["CONN_MAX_AGE"] else "per-request"
+
+
+def connection_metrics(alias="default"):
+    """Connection counts for this worker process."""
+    mode = connection_mode(alias)
+    if mode == "pool":
+        pool = connections[alias].pool
+        stats = pool.get_stats()
+        return {
+            "mode": mode,
+            "checked_out": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+            "waiting": stats.get("requests_waiting", 0),
+            "created": stats.get("connections_num", 0),
+            "size": stats.get("pool_size", 0),
+            "max_size": pool.max_size,
+            "errors": stats.get("connections_errors", 0) + stats.get("returns_bad", 0),
+        }
+    with _lock:
+        checked_out = sum(
+            1 for wrapper in _open if wrapper.alias == alias and wrapper.connection is not None
+        )
+        created = _created.get(alias, 0)
+    return {"mode": mode, "checked_out": checked_out, "waiting": 0, "created": created}
+
+
+def check_database(alias="default"):
+    """Run ``SELECT 1``; return ``(ok, latency_ms, error)``."""
+    started = time.monotonic()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception as e:
+        return False, round((time.monotonic() - started) * 1000, 1), str(e)
+    return True, round((time.monotonic() - started) * 1000, 1), ""
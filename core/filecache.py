@@ -0,0 +1,63 @@
+"""
+File-based cache safe for counters shared by several processes.
+
+Django's ``FileBasedCache`` implements ``add`` and ``incr`` as a read
+followed by a write, so two gunicorn workers can both "add" the same key
+or lose each other's increments. ``LockingFileBasedCache`` runs them
+under an exclusive ``flock``, striped over a few lock files in the cache
+directory, which makes rate-limit counters exact across workers. Its
+``incr`` also keeps the entry's expiry, where the stock one re-sets the
+value with the default timeout. Other operations are unchanged: ``set``
+already replaces files atomically.
+"""
+
+import fcntl
+import hashlib
+import os
+import pickle
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+LOCK_STRIPES = 64
+
+
+class LockingFileBasedCache(FileBasedCache):
+    """``FileBasedCache`` with ``add``/``incr``/``decr`` atomic across processes."""
+
+    @contextmanager
+    def _locked(self, key, version):
+        key = self.make_and_validate_key(key, version=version)
+        stripe = int(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest(), 16) % LOCK_STRIPES
+        # Not a *.djcache file, so culling and clear() leave it alone
+        lock_dir = os.path.join(self._dir, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{stripe:02d}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked(key, version):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        # BaseCache.decr() calls incr() with a negative delta
+        with self._locked(key, version):
+            try:
+                with open(self._key_to_file(key, version), "rb") as f:
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                raise ValueError(f"Key '{key}' not found") from None
+            if expiry is not None and expiry < time.time():
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            # The remaining lifetime, not DEFAULT_TIMEOUT
+            self.set(key, value, None if expiry is None else expiry - time.time(), version)
+            return value
@@ -0,0 +1,302 @@
+"""
+HTTP load generation against a running server.
+
+``run_load`` starts ``clients`` processes, each replaying scenarios
+picked from ``weights`` back to back for ``duration`` seconds, and
+returns throughput, latency percentiles, a latency histogram and status
+counts overall and per step. Each request uses a new connection, as
+nginx does towards gunicorn by default.
+
+Scenarios mirror what users do: ``browse`` (home, then a few catalogue
+pages), ``search``, ``product`` (a product page), ``shop`` (shop list,
+then a shop), ``login`` (a buyer signs in) and ``seller`` (a seller
+signs in and checks the dashboard and order queue). There is no
+checkout flow in the shop yet, so ``seller`` is the write-heavy scenario.
+
+The URLs and accounts come from the database the server uses, via
+``build_plan``. Logins need users made by ``generate_dataset``, and the
+server should run with ``RATELIMIT_ENABLED=False``, otherwise logins are
+throttled (counted under ``throttled``, not ``errors``). A login only
+counts as ``ok`` when it redirects: a failed one re-renders the form
+with a 200. A redirect back to the login page from any other step means
+the session was lost and counts as an error.
+
+``GunicornServer`` starts a local gunicorn with a given worker class and
+count, so configurations can be compared on the same machine.
+"""
+
+import http.client
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.shortcuts import resolve_url
+from django.urls import reverse
+
+from core.dataset import DATASET_PASSWORD, EMAIL_DOMAIN
+from products.models import Product, ProductCategory
+from sellers.models import Seller
+from users.models import User
+
+DEFAULT_WEIGHTS = {"browse": 35, "search": 20, "product": 25, "shop": 10, "login": 5, "seller": 5}
+SEARCH_TERMS = ["jacket", "chair", "lamp", "vinyl", "camera", "vintage", "table", "watch", "dress", "clock"]
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf")]
+SAMPLE_SIZE = 500
+REQUEST_TIMEOUT = 30
+LOGIN_STEPS = {"login", "seller_login"}
+
+
+def build_plan():
+    """URLs and credentials the scenarios draw from, as plain picklable data."""
+    products = list(
+        Product.objects.filter(status="published").order_by("?").values_list("pk", flat=True)[:SAMPLE_SIZE]
+    )
+    shops = list(Seller.objects.filter(status="active").order_by("?").values_list("shop_slug", flat=True)[:SAMPLE_SIZE])
+    categories = list(ProductCategory.objects.values_list("pk", flat=True))
+    dataset_users = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").order_by("?")
+    return {
+        "home": reverse("home"),
+        "browse": reverse("products_browse"),
+        "categories": [reverse("category_products", args=[pk]) for pk in categories],
+        "products": [reverse("product_detail", args=[pk]) for pk in products],
+        "shops": reverse("shops_browse"),
+        "shop_pages": [reverse("shop_detail", args=[slug]) for slug in shops],
+        "login": reverse("login"),
+        # Where login_required sends a visitor whose session was lost
+        "login_paths": sorted({reverse("login"), urlsplit(resolve_url(settings.LOGIN_URL)).path}),
+        "seller_dashboard": reverse("seller_dashboard"),
+        "seller_orders": reverse("seller_orders"),
+        "buyers": list(dataset_users.filter(is_seller=False).values_list("email", flat=True)[:SAMPLE_SIZE]),
+        "sellers": list(dataset_users.filter(is_seller=True).values_list("email", flat=True)[:SAMPLE_SIZE]),
+        "password": DATASET_PASSWORD,
+    }
+
+
+class HttpClient:
+    """Minimal cookie-keeping HTTP client opening one connection per request."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        """Send a request and return ``(status, body bytes, milliseconds, Location header)``."""
+        headers = {"Host": f"{self.host}:{self.port}"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        started = time.perf_counter()
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            return 0, 0, (time.perf_counter() - started) * 1000, ""
+        finally:
+            connection.close()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, len(content), elapsed, response.getheader("Location", "")
+
+
+def _login(client, plan, email):
+    client.request("GET", plan["login"])
+    return client.request("POST", plan["login"], {
+        "csrfmiddlewaretoken": client.cookies.get(settings.CSRF_COOKIE_NAME, ""),
+        "email": email,
+        "password": plan["password"],
+    })
+
+
+def _scenario_steps(name, client, plan, rng):
+    """Yield ``(step, result)`` for each request of scenario ``name``."""
+    if name == "browse":
+        yield "home", client.request("GET", plan["home"])
+        yield "browse", client.request("GET", plan["browse"])
+        if plan["categories"]:
+            yield "category", client.request("GET", rng.choice(plan["categories"]))
+        yield "browse_page", client.request("GET", f"{plan['browse']}?page={rng.randint(2, 5)}")
+    elif name == "search":
+        yield "search", client.request("GET", f"{plan['browse']}?q={rng.choice(SEARCH_TERMS)}")
+    elif name == "product" and plan["products"]:
+        yield "product_detail", client.request("GET", rng.choice(plan["products"]))
+    elif name == "shop":
+        yield "shops", client.request("GET", plan["shops"])
+        if plan["shop_pages"]:
+            yield "shop_detail", client.request("GET", rng.choice(plan["shop_pages"]))
+    elif name == "login" and plan["buyers"]:
+        yield "login", _login(client, plan, rng.choice(plan["buyers"]))
+    elif name == "seller" and plan["sellers"]:
+        yield "seller_login", _login(client, plan, rng.choice(plan["sellers"]))
+        yield "seller_dashboard", client.request("GET", plan["seller_dashboard"])
+        yield "seller_orders", client.request("GET", plan["seller_orders"])
+
+
+def client_process(base_url, plan, weights, duration, seed):
+    """
+    Replay weighted scenarios for ``duration`` seconds.
+
+    Module-level so it can run in a worker process. Returns a list of
+    ``(scenario, step, status, outcome, milliseconds)`` samples.
+    """
+    rng = random.Random(seed)
+    names, scenario_weights = zip(*weights.items())
+    samples = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights=scenario_weights)[0]
+        # A fresh client per scenario: each one is a new visitor
+        client = HttpClient(base_url)
+        for step, (status, _, elapsed, location) in _scenario_steps(name, client, plan, rng):
+            samples.append((name, step, status, _outcome(step, status, location, plan["login_paths"]), elapsed))
+    return samples
+
+
+def _outcome(step, status, location, login_paths):
+    """Classify a response as ``ok``, ``throttled`` or ``errors``."""
+    if status == 429:
+        return "throttled"
+    if step in LOGIN_STEPS:
+        return "ok" if status == 302 else "errors"
+    if 300 <= status < 400 and urlsplit(location).path in login_paths:
+        return "errors"
+    if 200 <= status < 400:
+        return "ok"
+    return "errors"
+
+
+def _latency_stats(latencies, elapsed):
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def summarize_samples(samples, elapsed):
+    """Aggregate samples from every client into a report."""
+    outcomes = Counter(outcome for _, _, _, outcome, _ in samples)
+    statuses = Counter(str(status) for _, _, status, _, _ in samples)
+    histogram = Counter()
+    for _, _, _, _, ms in samples:
+        histogram[next(bound for bound in HISTOGRAM_BUCKETS if ms <= bound)] += 1
+
+    steps = defaultdict(list)
+    step_errors = Counter()
+    for _, step, _, outcome, ms in samples:
+        steps[step].append(ms)
+        if outcome == "errors":
+            step_errors[step] += 1
+
+    total = len(samples)
+    return {
+        **_latency_stats([ms for _, _, _, _, ms in samples], elapsed),
+        "elapsed_s": round(elapsed, 2),
+        "error_rate": round(outcomes["errors"] / total, 4) if total else 0.0,
+        "outcomes": {name: outcomes[name] for name in ("ok", "throttled", "errors")},
+        "statuses": dict(sorted(statuses.items())),
+        "histogram": [
+            {"le_ms": None if bound == float("inf") else bound, "count": histogram[bound]}
+            for bound in HISTOGRAM_BUCKETS
+        ],
+        "steps": {
+            step: {**_latency_stats(latencies, elapsed), "errors": step_errors[step]}
+            for step, latencies in sorted(steps.items())
+        },
+    }
+
+
+def run_load(base_url, plan, clients=4, duration=30, weights=None, seed=0):
+    """Run ``clients`` processes against ``base_url`` and return the report."""
+    weights = {name: weight for name, weight in (weights or DEFAULT_WEIGHTS).items() if weight > 0}
+    started = time.monotonic()
+    if clients > 1:
+        with ProcessPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(
+                client_process,
+                [base_url] * clients, [plan] * clients, [weights] * clients,
+                [duration] * clients, [seed * 1000 + index for index in range(clients)],
+            ))
+    else:
+        results = [client_process(base_url, plan, weights, duration, seed * 1000)]
+    elapsed = time.monotonic() - started
+    return summarize_samples([sample for samples in results for sample in samples], elapsed)
+
+
+class GunicornServer:
+    """Run gunicorn with ``deploy/gunicorn.conf.py`` on a local port for the duration of a load test."""
+
+    ASGI_WORKERS = {"uvicorn_worker.UvicornWorker"}
+
+    def __init__(self, worker_class, workers, port=8001, threads=1, startup_timeout=30):
+        self.worker_class = worker_class
+        self.workers = workers
+        self.threads = threads
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        app = "config.asgi:application" if self.worker_class in self.ASGI_WORKERS else "config.wsgi:application"
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", app,
+                "--config", str(settings.BASE_DIR / "deploy" / "gunicorn.conf.py"),
+                "--bind", f"127.0.0.1:{self.port}",
+                "--workers", str(self.workers),
+                "--worker-class", self.worker_class,
+                "--threads", str(self.threads),
+                "--access-logfile", os.devnull,
+            ],
+            cwd=settings.BASE_DIR,
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        client = HttpClient(self.base_url)
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {self.process.returncode}")
+            if client.request("GET", reverse("health"))[0] == 200:
+                return self
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("gunicorn did not become healthy in time")
+
+    def __exit__(self, *exc_info):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
@@ -0,0 +1,191 @@
+"""
+Non-blocking file logging.
+
+``QueuedRotatingFileHandler`` is what ``LOGGING`` uses for its files. A
+log call only formats the record and puts the text on an in-memory
+queue. A background thread per process drains the queue and writes
+whatever has accumulated in one write and flush, rotating the file by
+size. Request threads never wait on the disk.
+
+Threads do not survive ``fork``, so the writer thread is per process.
+It is started in gunicorn's ``post_fork`` hook and stopped, after the
+queue is drained, in ``worker_exit`` (see ``deploy/gunicorn.conf.py``).
+A handler also starts its thread on first use in any process that has
+none, such as ``runserver`` or a management command. Anything still
+queued at interpreter exit is written by ``logging.shutdown``.
+
+Several gunicorn workers append to the same files. Each batch is
+written holding an ``flock`` on a sidecar ``<file>.lock``, so only one
+process at a time checks the size, rotates and writes. Under the lock
+the writer reopens the file if another process has rotated it, and
+rotation is decided on the size on disk, so workers do not rotate twice
+or write to a file that is being renamed.
+"""
+
+import fcntl
+import logging
+import os
+import queue
+import threading
+import weakref
+from logging.handlers import QueueHandler, RotatingFileHandler
+
+BATCH_SIZE = 500
+STOP_TIMEOUT = 5
+
+_STOP = object()
+_handlers = weakref.WeakSet()
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """``RotatingFileHandler`` that writes a list of records at once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock_filename = self.baseFilename + ".lock"
+        self._lock_file = None
+        self._lock_pid = None
+
+    def _acquire_file_lock(self):
+        # flock is per open file, and a forked child shares its parent's,
+        # so each process opens the lock file itself
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self.lock_filename, "a")
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release_file_lock(self):
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _reopen_if_moved(self):
+        if self.stream is None:
+            return
+        try:
+            on_disk = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            on_disk = None
+        current = os.fstat(self.stream.fileno())
+        if on_disk is None or (on_disk.st_dev, on_disk.st_ino) != (current.st_dev, current.st_ino):
+            self.stream.close()
+            self.stream = None
+
+    def emit_batch(self, records):
+        """Write ``records`` with one write and flush, rotating first if needed."""
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        text = "".join(lines)
+
+        with self.lock:
+            try:
+                self._acquire_file_lock()
+            except Exception:
+                self.handleError(records[-1])
+                return
+            try:
+                self._reopen_if_moved()
+                if self.stream is None:
+                    self.stream = self._open()
+                size = os.fstat(self.stream.fileno()).st_size
+                if self.maxBytes and size and size + len(text.encode(self.encoding or "utf-8")) > self.maxBytes:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                self.stream.write(text)
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[-1])
+            finally:
+                self._release_file_lock()
+
+    def close(self):
+        with self.lock:
+            if self._lock_file is not None and self._lock_pid == os.getpid():
+                self._lock_file.close()
+            self._lock_file = self._lock_pid = None
+        super().close()
+
+
+class QueuedRotatingFileHandler(QueueHandler):
+    """
+    Queue records for a per-process writer thread.
+
+    Takes the ``RotatingFileHandler`` arguments. The handler's formatter
+    is applied on the calling thread, so the file receives exactly what
+    it produces.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding="utf-8", batch_size=BATCH_SIZE):
+        super().__init__(queue.SimpleQueue())
+        self.target = BatchRotatingFileHandler(
+            filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True,
+        )
+        self.target.setFormatter(logging.Formatter("%(message)s"))
+        self.batch_size = batch_size
+        self._pid = None
+        self._thread = None
+        _handlers.add(self)
+
+    def start(self):
+        """Start this process's writer thread unless it is already running."""
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            # A queue inherited through fork may hold the parent's records
+            # or a lock taken by a thread that no longer exists
+            self.queue = queue.SimpleQueue()
+            self._thread = threading.Thread(
+                target=self._run, args=(self.queue,), name="log-writer", daemon=True,
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        """Write everything queued so far and stop the writer thread."""
+        with self.lock:
+            if self._pid != os.getpid():
+                return
+            thread, self._pid, self._thread = self._thread, None, None
+            self.queue.put(_STOP)
+        thread.join(STOP_TIMEOUT)
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        self.queue.put(record)
+
+    def _run(self, records):
+        while True:
+            batch = [records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(records.get_nowait())
+                except queue.Empty:
+                    break
+            pending = [record for record in batch if record is not _STOP]
+            if pending:
+                self.target.emit_batch(pending)
+            if len(pending) != len(batch):
+                return
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
+
+
+def start():
+    """Start the writer thread of every queued handler in this process."""
+    for handler in list(_handlers):
+        handler.start()
+
+
+def stop():
+    """Drain and stop every queued handler's writer thread in this process."""
+    for handler in list(_handlers):
+        handler.stop()
@@ -0,0 +1,177 @@
+"""
+Transactional email outbox.
+
+``queue_email()`` stores the message in ``OutboxEmail`` inside the
+caller's transaction and, once that commits, queues a drain task.
+``send_outbox()`` claims queued messages in batches and delivers each
+batch over a single backend connection (``get_connection`` +
+``send_messages``), so a burst of registrations costs one SMTP handshake
+instead of one per email. Delivery is throttled to
+``EMAIL_OUTBOX_RATE_LIMIT`` messages per second; failed messages are
+retried with backoff and dead-lettered after
+``EMAIL_OUTBOX_MAX_ATTEMPTS``. The scheduler also drains the outbox
+periodically in case a drain task is lost.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import OutboxEmail, Task
+from .taskqueue import claim_rows, enqueue, retry_delay
+
+logger = logging.getLogger(__name__)
+
+SEND_OUTBOX_TASK = "core.mail.send_outbox"
+
+
+@dataclass
+class OutboxResult:
+    """Outcome of an outbox drain."""
+
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+
+class Throttle:
+    """Spaces calls at least ``1 / rate`` seconds apart (no limit when ``rate`` is 0)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def queue_email(recipient, subject, body, from_email=None):
+    """Add a message to the outbox; it is sent after the current transaction commits."""
+    email = OutboxEmail.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+    transaction.on_commit(schedule_drain)
+    return email
+
+
+def schedule_drain():
+    """Queue a drain task unless one is already waiting."""
+    if not Task.objects.filter(name=SEND_OUTBOX_TASK, status="queued").exists():
+        enqueue(SEND_OUTBOX_TASK)
+
+
+def _release_stale():
+    """Return messages claimed by a sender that died mid-batch to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    return OutboxEmail.objects.filter(status="sending", locked_at__lt=cutoff).update(
+        status="queued", locked_at=None
+    )
+
+
+def _deliver(emails, throttle, result):
+    """Send one claimed batch over a single connection and record the outcome."""
+    now = timezone.now()
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        failures = {email.pk: f"Could not connect: {e}" for email in emails}
+    else:
+        failures = {}
+        try:
+            for email in emails:
+                throttle.wait()
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, [email.recipient],
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    failures[email.pk] = str(e) or e.__class__.__name__
+        finally:
+            connection.close()
+
+    for email in emails:
+        email.locked_at = None
+        if email.pk not in failures:
+            email.status = "sent"
+            email.sent_at = now
+            result.sent += 1
+        elif email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = "dead"
+            email.last_error = failures[email.pk]
+            result.dead += 1
+        else:
+            email.status = "queued"
+            email.last_error = failures[email.pk]
+            email.send_after = now + retry_delay(email.attempts)
+            result.retried += 1
+    OutboxEmail.objects.bulk_update(
+        emails, ["status", "sent_at", "last_error", "send_after", "locked_at", "updated_at"]
+    )
+
+
+def send_outbox(batch_size=None, rate_limit=None):
+    """Deliver every due message in the outbox and return an ``OutboxResult``."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    throttle = Throttle(settings.EMAIL_OUTBOX_RATE_LIMIT if rate_limit is None else rate_limit)
+    result = OutboxResult()
+    _release_stale()
+
+    while True:
+        now = timezone.now()
+        ready = OutboxEmail.objects.filter(status="queued", send_after__lte=now).order_by(
+            "send_after", "pk"
+        )
+        ids = claim_rows(
+            ready, batch_size, status="sending", locked_at=now, attempts=F("attempts") + 1
+        )
+        if not ids:
+            break
+        emails = list(OutboxEmail.objects.filter(pk__in=ids).order_by("pk"))
+        for email in emails:
+            email.updated_at = now
+        _deliver(emails, throttle, result)
+        if len(ids) < batch_size:
+            break
+
+    if result.sent or result.retried or result.dead:
+        logger.info(
+            "Outbox: %d sent, %d retried, %d dead", result.sent, result.retried, result.dead
+        )
+    return result
+
+
+def outbox_metrics():
+    """Queue depth, failures and the age of the oldest waiting message."""
+    since = timezone.now() - timedelta(hours=24)
+    stats = OutboxEmail.objects.aggregate(
+        queued=Count("pk", filter=Q(status="queued")),
+        sending=Count("pk", filter=Q(status="sending")),
+        dead=Count("pk", filter=Q(status="dead")),
+        sent_24h=Count("pk", filter=Q(status="sent", sent_at__gte=since)),
+        retrying=Count("pk", filter=Q(status="queued", attempts__gt=0)),
+        oldest_queued=Min("created_at", filter=Q(status="queued")),
+    )
+    oldest = stats.pop("oldest_queued")
+    stats["oldest_queued_seconds"] = (
+        int((timezone.now() - oldest).total_seconds()) if oldest else 0
+    )
+    return stats
@@ -0,0 +1,69 @@
+"""
+Management command to benchmark public pages against a synthetic dataset.
+Usage: python manage.py benchmark [--size 1k|100k|1m ...] [--rounds N] [--label L]
+       [--history PATH] [--workers N]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import (
+    DEFAULT_HISTORY,
+    SIZES,
+    benchmark_database,
+    compare_runs,
+    latest_run,
+    load_history,
+    record_run,
+    run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = 'Time public pages at several dataset sizes and record the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            action='append',
+            choices=list(SIZES),
+            help='Dataset size to benchmark; repeat for several (default: 1k)',
+        )
+        parser.add_argument('--rounds', type=int, default=20, help='Timed requests per page')
+        parser.add_argument('--label', default='', help='Name for this run in the history')
+        parser.add_argument(
+            '--history',
+            default=str(DEFAULT_HISTORY),
+            help='JSON file runs are appended to',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes used to generate a missing dataset',
+        )
+
+    def handle(self, *args, **options):
+        if options['rounds'] < 2:
+            raise CommandError('--rounds must be at least 2')
+
+        for size in options['size'] or ['1k']:
+            history = load_history(options['history'])
+            with benchmark_database(size, workers=options['workers'], report=self.stdout.write):
+                results = run_benchmarks(rounds=options['rounds'])
+            run = record_run(
+                size, options['rounds'], results, label=options['label'], path=options['history'],
+            )
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{size} products'))
+            self.stdout.write(f"{'page':<16} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'bytes':>9}")
+            for name, result in results.items():
+                self.stdout.write(
+                    f"{name:<16} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                    f"{result['queries']:>8} {result['bytes']:>9}"
+                )
+
+            # Informational; benchmark_compare is the gate
+            baseline = latest_run(history, size)
+            if baseline is not None:
+                for regression in compare_runs(baseline, run):
+                    self.stdout.write(self.style.WARNING(f'Regression: {regression}'))
@@ -0,0 +1,51 @@
+"""
+Management command to compare recorded benchmark runs.
+Usage: python manage.py benchmark_compare --baseline LABEL [--size 1k] [--threshold 0.1]
+       [--history PATH]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import DEFAULT_HISTORY, SIZES, compare_runs, latest_run, load_history
+
+
+class Command(BaseCommand):
+    help = 'Flag pages that got slower, bigger or chattier than a baseline run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            help='Label of the baseline run (default: the run before the latest)',
+        )
+        parser.add_argument('--size', default='1k', choices=list(SIZES), help='Dataset size')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.10,
+            help='Relative growth tolerated before flagging (default: 0.10)',
+        )
+        parser.add_argument('--history', default=str(DEFAULT_HISTORY), help='JSON history file')
+
+    def handle(self, *args, **options):
+        history = load_history(options['history'])
+        current = latest_run(history, options['size'])
+        if current is None:
+            raise CommandError(f"No {options['size']} runs in {options['history']}")
+
+        if options['baseline'] is not None:
+            baseline = latest_run(history, options['size'], label=options['baseline'])
+        else:
+            baseline = latest_run(history[:history.index(current)], options['size'])
+        if baseline is None:
+            raise CommandError('No baseline run to compare with')
+
+        self.stdout.write(
+            f"Comparing {current['revision'] or '?'} ({current['timestamp']}) "
+            f"with {baseline['revision'] or '?'} ({baseline['timestamp']})"
+        )
+        regressions = compare_runs(baseline, current, threshold=options['threshold'])
+        for regression in regressions:
+            self.stdout.write(self.style.WARNING(regression))
+        if regressions:
+            raise CommandError(f'{len(regressions)} regression(s)')
+        self.stdout.write(self.style.SUCCESS('No regressions'))
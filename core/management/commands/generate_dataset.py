@@ -0,0 +1,64 @@
+"""
+Management command to generate a synthetic marketplace for benchmarks.
+Usage: python manage.py generate_dataset --sellers N --products M [--orders K] [--invoices J]
+       [--buyers B] [--seed S] [--chunk-size C] [--workers W] [--images]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dataset import DATASET_PASSWORD, DatasetExists, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create sellers, products, orders and invoices with realistic distributions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sellers', type=int, required=True, help='Number of sellers')
+        parser.add_argument('--products', type=int, required=True, help='Number of products')
+        parser.add_argument('--orders', type=int, default=0, help='Number of orders')
+        parser.add_argument('--invoices', type=int, default=0, help='Number of invoices')
+        parser.add_argument('--buyers', type=int, help='Number of buyers (default: one per seller)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; one dataset per seed')
+        parser.add_argument(
+            '--images',
+            action='store_true',
+            help='Draw a placeholder image file for every product',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows written per bulk_create and per transaction',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes writing chunks in parallel (PostgreSQL only)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            counts = generate_dataset(
+                sellers=options['sellers'],
+                products=options['products'],
+                orders=options['orders'],
+                invoices=options['invoices'],
+                buyers=options['buyers'],
+                seed=options['seed'],
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                images=options['images'],
+                report=self.stdout.write,
+            )
+        except (DatasetExists, ValueError) as e:
+            raise CommandError(str(e))
+
+        summary = ', '.join(f'{count} {kind}' for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {summary} in {time.monotonic() - started:.1f}s '
+            f'(password: {DATASET_PASSWORD})'
+        ))
@@ -0,0 +1,125 @@
+"""
+Management command to load-test a running (or freshly started) server.
+Usage: python manage.py loadtest [--url URL] [--clients N] [--duration S]
+       [--scenario NAME=WEIGHT ...] [--gunicorn --worker-class CLASS --workers N]
+       [--output PATH] [--label L]
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import DEFAULT_WEIGHTS, HISTOGRAM_BUCKETS, GunicornServer, build_plan, run_load
+
+
+class Command(BaseCommand):
+    help = 'Replay a weighted scenario mix from several processes and report throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Server to load (ignored with --gunicorn)',
+        )
+        parser.add_argument('--clients', type=int, default=4, help='Client processes')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            default=[],
+            metavar='NAME=WEIGHT',
+            help=f'Override a scenario weight; defaults: {DEFAULT_WEIGHTS}',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for scenario choices')
+        parser.add_argument(
+            '--gunicorn',
+            action='store_true',
+            help='Start a local gunicorn with deploy/gunicorn.conf.py for the run',
+        )
+        parser.add_argument(
+            '--worker-class',
+            default='uvicorn_worker.UvicornWorker',
+            help='gunicorn worker class with --gunicorn (e.g. sync, gthread)',
+        )
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers with --gunicorn')
+        parser.add_argument('--threads', type=int, default=1, help='Threads per gthread worker')
+        parser.add_argument('--port', type=int, default=8001, help='Port for --gunicorn')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--label', default='', help='Name recorded in the report')
+
+    def handle(self, *args, **options):
+        weights = dict(DEFAULT_WEIGHTS)
+        for override in options['scenario']:
+            name, _, weight = override.partition('=')
+            if name not in DEFAULT_WEIGHTS or not weight.isdigit():
+                raise CommandError(f'Invalid --scenario {override!r}; expected one of {list(DEFAULT_WEIGHTS)}=N')
+            weights[name] = int(weight)
+
+        plan = build_plan()
+        if not plan['products']:
+            raise CommandError('No published products; run generate_dataset first')
+
+        config = {
+            'label': options['label'],
+            'clients': options['clients'],
+            'duration_s': options['duration'],
+            'weights': weights,
+        }
+        if options['gunicorn']:
+            server = GunicornServer(
+                options['worker_class'], options['workers'], port=options['port'],
+                threads=options['threads'],
+            )
+            config.update(worker_class=server.worker_class, workers=server.workers, threads=server.threads)
+            try:
+                with server:
+                    report = self._run(server.base_url, plan, weights, options)
+            except RuntimeError as e:
+                raise CommandError(str(e))
+        else:
+            config['url'] = options['url']
+            report = self._run(options['url'], plan, weights, options)
+        report = {'config': config, **report}
+
+        self._print(report)
+        if options['output']:
+            path = Path(options['output'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(f'Report written to {path}')
+
+    def _run(self, base_url, plan, weights, options):
+        self.stdout.write(
+            f"Loading {base_url} with {options['clients']} client(s) for {options['duration']}s..."
+        )
+        return run_load(
+            base_url, plan, clients=options['clients'], duration=options['duration'],
+            weights=weights, seed=options['seed'],
+        )
+
+    def _print(self, report):
+        outcomes = report['outcomes']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{report['requests']} requests in {report['elapsed_s']}s: "
+            f"{report['throughput_rps']} req/s, error rate {report['error_rate']:.2%} "
+            f"({outcomes['throttled']} throttled)"
+        ))
+        self.stdout.write(
+            f"latency ms: p50 {report['p50_ms']}  p95 {report['p95_ms']}  "
+            f"p99 {report['p99_ms']}  max {report['max_ms']}"
+        )
+
+        self.stdout.write(f"\n{'step':<18} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for step, stats in report['steps'].items():
+            self.stdout.write(
+                f"{step:<18} {stats['requests']:>9} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+                f"{stats['p99_ms']:>8} {stats['errors']:>7}"
+            )
+
+        self.stdout.write('\nlatency histogram')
+        largest = max((bucket['count'] for bucket in report['histogram']), default=0) or 1
+        for bucket in report['histogram']:
+            bound = f"<= {bucket['le_ms']}ms" if bucket['le_ms'] is not None else f'> {HISTOGRAM_BUCKETS[-2]}ms'
+            bar = '#' * round(40 * bucket['count'] / largest)
+            self.stdout.write(f"{bound:>11} {bucket['count']:>8} {bar}")
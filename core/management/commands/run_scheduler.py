@@ -0,0 +1,34 @@
+"""
+Management command to run the job scheduler in the foreground.
+Usage: python manage.py run_scheduler [--list]
+
+Useful outside gunicorn (development, or a dedicated scheduler process).
+Leader election still applies, so it is safe to run next to gunicorn.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Run scheduled jobs in this process while it holds the leader lock'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the scheduled jobs and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for job_id, func_path, trigger in scheduler.JOBS:
+                self.stdout.write(f'{job_id}: {func_path} {trigger}')
+            return
+
+        self.stdout.write(self.style.SUCCESS('Waiting for scheduler leadership (Ctrl+C to stop)'))
+        try:
+            scheduler.run_while_leader()
+        except KeyboardInterrupt:
+            scheduler.stop()
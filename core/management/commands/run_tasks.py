@@ -0,0 +1,55 @@
+"""
+Management command to run background task queue workers.
+Usage: python manage.py run_tasks [--queue NAME ...] [--concurrency N] [--burst]
+"""
+
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.taskqueue import Worker
+
+
+class Command(BaseCommand):
+    help = 'Claim and execute queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help='Queue to consume (repeatable, default: "default")',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Number of worker threads (default: TASK_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds to wait when the queue is empty (default: TASK_POLL_INTERVAL)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options['queues'] or ['default'],
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+        )
+        # Finish in-flight tasks on SIGTERM (systemd stop) or Ctrl+C
+        previous = {
+            signum: signal.signal(signum, lambda *_: worker.stop())
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            processed = worker.run(burst=options['burst'])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'{processed} task(s) processed'))
@@ -0,0 +1,33 @@
+"""
+Management command to deliver queued outbox emails and report outbox metrics.
+Usage: python manage.py send_outbox [--batch-size N] [--stats]
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.mail import outbox_metrics, send_outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox over pooled connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Messages per connection (default: EMAIL_OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Only print outbox metrics',
+        )
+
+    def handle(self, *args, **options):
+        if not options['stats']:
+            result = send_outbox(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{result.sent} sent, {result.retried} to retry, {result.dead} dead'
+            ))
+        for name, value in outbox_metrics().items():
+            self.stdout.write(f'{name}: {value}')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-19 04:17
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_heartbeats(apps, schema_editor):
+    """Tasks running during the upgrade count from when they were claimed."""
+    Task = apps.get_model("core", "Task")
+    Task.objects.filter(status="running").update(heartbeat_at=F("locked_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='core_task_status_103227_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_heartbeats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'heartbeat_at'], name='core_task_status_498128_idx'),
+        ),
+    ]
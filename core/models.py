@@ -1,8 +1,10 @@
 """
-Base abstract models for the Vintage Shop project.
+Base abstract models and shared infrastructure models (job history,
+task queue, email outbox) for the Vintage Shop project.
 """
 
 from django.db import models
+from django.utils import timezone
 
 
 class TimeStampedModel(models.Model):
@@ -43,3 +45,120 @@ class SoftDeleteModel(TimeStampedModel):
         self.is_deleted = False
         self.deleted_at = None
         self.save()
+
+
+class JobRun(models.Model):
+    """History of scheduled job executions, one row per run."""
+
+    STATUS_CHOICES = (
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    )
+
+    job_id = models.CharField(max_length=100)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="running"
+    )
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    hostname = models.CharField(max_length=255, blank=True)
+    pid = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["job_id", "-started_at"]),
+        ]
+        verbose_name = "Job Run"
+        verbose_name_plural = "Job Runs"
+
+    def __str__(self):
+        return f"{self.job_id} @ {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class Task(TimeStampedModel):
+    """
+    A unit of background work in the database-backed task queue.
+
+    ``name`` is the dotted path of a callable; ``args`` and ``kwargs``
+    must be JSON-serialisable. See ``core.taskqueue``.
+    """
+
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("dead", "Dead"),
+    )
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=50, default="default")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="queued"
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the running worker; a stale heartbeat means it died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["queue", "status", "run_at"]),
+            models.Index(fields=["status", "heartbeat_at"]),
+        ]
+        verbose_name = "Task"
+        verbose_name_plural = "Tasks"
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class OutboxEmail(TimeStampedModel):
+    """
+    An email waiting to be delivered by the background sender.
+
+    Rows are written in the same transaction as the change that triggers
+    them, so a rolled-back registration never sends mail. See ``core.mail``.
+    """
+
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("dead", "Dead"),
+    )
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="queued"
+    )
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "send_after"]),
+        ]
+        verbose_name = "Outbox Email"
+        verbose_name_plural = "Outbox Emails"
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
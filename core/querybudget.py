@@ -0,0 +1,125 @@
+"""
+Per-request query budgets and N+1 detection.
+
+``QueryBudgetMiddleware`` wraps every database connection with an
+``execute_wrapper`` for the duration of a request, counts the queries
+and groups them by fingerprint (the SQL with placeholders and literals
+collapsed, so ``WHERE product_id = 1`` and ``= 2`` match). A request
+violates its budget when it runs more than ``QUERY_BUDGET_DEFAULT``
+queries (or the view's ``@query_budget(n)``), or repeats one
+fingerprint more than ``QUERY_REPEAT_LIMIT`` times, the usual sign of a
+per-row lookup from a template loop.
+
+``QUERY_BUDGET_MODE`` decides what happens:
+
+``"raise"``   raise ``QueryBudgetExceeded`` (tests);
+``"log"``     log every violation (development);
+``"sample"``  check ``QUERY_BUDGET_SAMPLE_RATE`` of requests and log
+              violations (production), so the wrapper cost is only paid
+              on sampled requests;
+``"off"``     do nothing.
+
+Only queries on the request thread are seen; queries an async view
+runs through ``sync_to_async`` happen on other threads and are not
+counted.
+"""
+
+import logging
+import random
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_IGNORED = re.compile(r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.I)
+_NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its budget allows."""
+
+
+def query_budget(limit):
+    """Give the decorated view a query budget other than the default."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def fingerprint(sql):
+    """Normalize ``sql`` so queries differing only in values compare equal."""
+    for pattern, replacement in _NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryLog:
+    """Counts queries per fingerprint; used as a connection execute wrapper."""
+
+    def __init__(self):
+        self.total = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not _IGNORED.match(sql):
+            self.total += 1
+            self.fingerprints[fingerprint(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def violations(self, budget, repeat_limit):
+        """Human-readable descriptions of every limit exceeded."""
+        problems = []
+        if budget is not None and self.total > budget:
+            problems.append(f"{self.total} queries (budget {budget})")
+        problems.extend(
+            f"{count}x {sql[:200]}"
+            for sql, count in self.fingerprints.most_common()
+            if count > repeat_limit
+        )
+        return problems
+
+
+class QueryBudgetMiddleware:
+    """Enforce query budgets according to ``QUERY_BUDGET_MODE``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.QUERY_BUDGET_MODE
+        if mode == "off" or (
+            mode == "sample" and random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE
+        ):
+            return self.get_response(request)
+
+        log = QueryLog()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        if match is None or match.namespace in settings.QUERY_BUDGET_EXEMPT_NAMESPACES:
+            return response
+        budget = getattr(match.func, "query_budget", settings.QUERY_BUDGET_DEFAULT)
+        problems = log.violations(budget, settings.QUERY_REPEAT_LIMIT)
+        if problems:
+            message = f"Query budget exceeded by {match.view_name} ({request.path}): " + "; ".join(problems)
+            if mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(
+                message,
+                extra={"view": match.view_name, "queries": log.total, "path": request.path},
+            )
+        return response
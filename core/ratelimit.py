@@ -0,0 +1,143 @@
+"""
+Cache-backed rate limiting for the authentication views.
+
+``@ratelimit(scope)`` counts requests per client IP and per account (the
+submitted ``email``) with a sliding-window counter: hits go to a
+fixed-window cache key with ``cache.add`` + ``cache.incr``, which are
+atomic in ``RATELIMIT_CACHE`` (the ``ratelimit`` alias, whose file
+backend locks them and keeps each counter's expiry; Redis or Memcached
+also qualify), and the previous window's count is weighted by how much
+of it still overlaps the sliding window. A client
+over either limit gets a 429 before the view runs, so no password is
+hashed and no email is queued for throttled requests.
+
+Limits are configured per scope in ``RATELIMIT_RATES`` as
+``"<count>/<period>"`` strings, where the period is ``s``, ``m``, ``h``
+or ``d`` with an optional multiplier (``"5/15m"``). ``RATELIMIT_CACHE``
+must be shared by every worker process: a per-process cache such as
+``default`` keeps separate counters per worker and so multiplies every
+limit by the number of workers.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+
+
+def parse_rate(rate):
+    """Parse ``"<count>/<period>"`` into ``(limit, window_seconds)``."""
+    match = RATE_RE.match(rate.replace(" ", ""))
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_ip(request):
+    """The client address, read from ``RATELIMIT_IP_META_KEY``."""
+    value = request.META.get(settings.RATELIMIT_IP_META_KEY, "")
+    return value.split(",")[0].strip()
+
+
+def hit(key, rate, now=None):
+    """
+    Record a request against ``key`` and return the seconds until it may
+    retry, or ``0`` if it is within ``rate``.
+    """
+    limit, window = parse_rate(rate)
+    cache = caches[settings.RATELIMIT_CACHE]
+    now = time.time() if now is None else now
+    index, offset = divmod(now, window)
+    current_key = f"{key}:{int(index)}"
+
+    # Keep each window long enough to serve as the next one's "previous"
+    cache.add(current_key, 0, timeout=window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(current_key, 1, timeout=window * 2)
+        current = 1
+    previous = cache.get(f"{key}:{int(index) - 1}", 0)
+
+    remaining = 1 - offset / window
+    if previous * remaining + current <= limit:
+        return 0
+    return max(int(window * remaining), 1)
+
+
+def _identities(request):
+    """Yield ``(kind, identity)`` pairs to count a request against."""
+    ip = client_ip(request)
+    if ip:
+        yield "ip", ip
+    account = request.POST.get("email", "").strip().lower()
+    if account:
+        yield "account", account
+
+
+def check(request, scope):
+    """Count ``request`` against every limit of ``scope``; return the longest wait."""
+    rates = settings.RATELIMIT_RATES[scope]
+    retry_after = 0
+    for kind, identity in _identities(request):
+        rate = rates.get(kind)
+        if not rate:
+            continue
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        retry_after = max(retry_after, hit(f"rl:{scope}:{kind}:{digest}", rate))
+    return retry_after
+
+
+def _throttle(request, scope):
+    """Return a 429 response if ``request`` is over the ``scope`` limits, else ``None``."""
+    retry_after = check(request, scope)
+    if not retry_after:
+        return None
+    logger.warning("Rate limit %s exceeded from %s", scope, client_ip(request) or "unknown")
+    response = render(
+        request,
+        "core/rate_limited.html",
+        {"page_title": "Too Many Requests", "retry_after": retry_after},
+        status=429,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, methods=("POST",)):
+    """
+    Reject requests to the decorated view over the ``scope`` limits with 429.
+
+    Only ``methods`` are counted, so rendering the form is never limited.
+    Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                if settings.RATELIMIT_ENABLED and request.method in methods:
+                    response = await sync_to_async(_throttle)(request, scope)
+                    if response is not None:
+                        return response
+                return await view(request, *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                if settings.RATELIMIT_ENABLED and request.method in methods:
+                    response = _throttle(request, scope)
+                    if response is not None:
+                        return response
+                return view(request, *args, **kwargs)
+        return wraps(view)(wrapper)
+    return decorator
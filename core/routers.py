@@ -0,0 +1,109 @@
+"""
+Read-replica routing for catalogue pages.
+
+``ReplicaRoutingMiddleware`` marks GET/HEAD requests to the views in
+``REPLICA_VIEWS`` (home, browse, category, shop and product pages) as
+replica-eligible, and ``ReplicaRouter`` sends their reads of
+``REPLICA_APPS`` models to an alias in ``REPLICA_DATABASES``, picked at
+random once per request so that e.g. a paginator's count and its page
+come from the same replica. Everything else, and every write, goes to
+``default``.
+
+Read-after-write: once a request writes, the rest of it reads from the
+primary, and an unsafe request (POST, ...) that wrote pins the session
+to the primary for ``REPLICA_STICKY_SECONDS`` so e.g. a seller sees the
+product they just published despite replication lag. With no replicas
+configured the router is a no-op.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+STICKY_SESSION_KEY = "_db_primary_until"
+
+
+class RoutingState:
+    """Routing decisions for the current request."""
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+        self.replica = None
+
+
+_state = ContextVar("db_routing_state", default=None)
+
+
+class ReplicaRouter:
+    """Send catalogue reads to replicas when the current request allows it."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is None
+            or not state.use_replica
+            or state.wrote
+            or not settings.REPLICA_DATABASES
+            or model._meta.app_label not in settings.REPLICA_APPS
+        ):
+            return None
+        if state.replica is None:
+            state.replica = random.choice(settings.REPLICA_DATABASES)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {"default", *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Scope routing state to each request and maintain the sticky window."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and request.method not in ("GET", "HEAD", "OPTIONS"):
+            request.session[STICKY_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if (
+            state is None
+            or request.method not in ("GET", "HEAD")
+            or request.resolver_match.url_name not in settings.REPLICA_VIEWS
+            or self._pinned(request)
+        ):
+            return None
+        state.use_replica = True
+        return None
+
+    def _pinned(self, request):
+        # Only sessions that already exist can be pinned; don't create one
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return False
+        return request.session.get(STICKY_SESSION_KEY, 0) > time.time()
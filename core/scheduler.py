@@ -0,0 +1,257 @@
+"""
+In-process job scheduler with cross-worker leader election.
+
+Gunicorn runs several workers from one preloaded app, so starting
+APScheduler in every worker would run each job once per worker. Instead
+every worker starts a small election thread (see ``post_fork`` in
+``deploy/gunicorn.conf.py``) and only the process holding the leader lock
+runs the scheduler:
+
+* on PostgreSQL the lock is a session-level advisory lock held on a
+  dedicated connection;
+* elsewhere it is an exclusive ``flock`` on ``SCHEDULER_LOCK_FILE``.
+
+Both locks are released by the operating system or the database when the
+leader dies, and the remaining workers retry every
+``SCHEDULER_ELECTION_INTERVAL`` seconds, so a recycled or crashed leader
+is replaced automatically. Every job run is recorded as a ``JobRun``.
+"""
+
+import fcntl
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import JobRun
+
+logger = logging.getLogger(__name__)
+
+# (job id, callable path, APScheduler trigger arguments)
+JOBS = (
+    ("sweep_overdue_invoices", "billing.tasks.sweep_overdue_invoices",
+     {"trigger": "cron", "hour": 1, "minute": 0}),
+    ("renew_subscriptions", "billing.tasks.renew_due_subscriptions",
+     {"trigger": "cron", "hour": 1, "minute": 15}),
+    # Queued for run_tasks: the run forks a PDF process pool, too heavy for a web worker
+    ("generate_monthly_invoices", "billing.tasks.queue_monthly_invoices",
+     {"trigger": "cron", "day": 1, "hour": 2, "minute": 0}),
+    ("prune_verification_tokens", "users.tasks.prune_verification_tokens",
+     {"trigger": "cron", "hour": 3, "minute": 30}),
+    ("warm_catalog_cache", "products.catalog.warm_catalog_cache",
+     {"trigger": "interval", "minutes": 15}),
+    ("send_outbox", "core.mail.send_outbox",
+     {"trigger": "interval", "minutes": 5}),
+    ("prune_finished_tasks", "core.taskqueue.prune_finished_tasks",
+     {"trigger": "cron", "hour": 3, "minute": 45}),
+    ("purge_expired_sessions", "core.sessions.purge_expired_sessions",
+     {"trigger": "cron", "hour": 4, "minute": 0}),
+)
+
+_stop = threading.Event()
+_thread = None
+
+
+class FileLock:
+    """Exclusive, non-blocking ``flock`` on a file; released when the process exits."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = None
+
+    def acquire(self):
+        if self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.truncate(0)
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def is_held(self):
+        return self._file is not None
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class AdvisoryLock:
+    """
+    PostgreSQL session-level advisory lock.
+
+    Held on its own connection, outside Django's per-thread connection
+    handling and the connection pool, so request cleanup never drops it
+    by accident.
+    """
+
+    def __init__(self, key, alias="default"):
+        self.key = key
+        self.alias = alias
+        self._conn = None
+        self._held = False
+
+    def _cursor(self):
+        if self._conn is None:
+            wrapper = connections[self.alias]
+            # Connect directly: a pooled connection would be held for the
+            # leader's lifetime and count against the pool
+            self._conn = wrapper.Database.connect(**wrapper.get_connection_params())
+            self._conn.autocommit = True
+        return self._conn.cursor()
+
+    def _reset(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._held = False
+
+    def acquire(self):
+        if self._held:
+            return True
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", [self.key])
+                self._held = bool(cursor.fetchone()[0])
+        except connections[self.alias].Database.Error:
+            logger.warning("Scheduler election query failed", exc_info=True)
+            self._reset()
+        return self._held
+
+    def is_held(self):
+        """Check the lock connection is still alive (the lock dies with it)."""
+        if not self._held:
+            return False
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except connections[self.alias].Database.Error:
+            logger.warning("Scheduler lock connection lost", exc_info=True)
+            self._reset()
+        return self._held
+
+    def release(self):
+        if self._held:
+            try:
+                with self._cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [self.key])
+            except connections[self.alias].Database.Error:
+                pass
+        self._reset()
+
+
+def get_leader_lock():
+    """Advisory lock on PostgreSQL, file lock otherwise."""
+    if connections["default"].vendor == "postgresql":
+        return AdvisoryLock(settings.SCHEDULER_LOCK_ID)
+    return FileLock(settings.SCHEDULER_LOCK_FILE)
+
+
+def run_job(job_id, func_path):
+    """
+    Run one job and record it in ``JobRun``.
+
+    Failures are logged and recorded rather than raised, so one broken
+    job never takes the scheduler down.
+    """
+    close_old_connections()
+    run = JobRun.objects.create(
+        job_id=job_id,
+        started_at=timezone.now(),
+        hostname=socket.gethostname()[:255],
+        pid=os.getpid(),
+    )
+    started = time.monotonic()
+    try:
+        import_string(func_path)()
+    except Exception:
+        logger.exception("Scheduled job %s failed", job_id)
+        run.status = "failed"
+        run.error = traceback.format_exc()
+    else:
+        run.status = "succeeded"
+    run.finished_at = timezone.now()
+    run.duration = timedelta(seconds=time.monotonic() - started)
+    run.save(update_fields=["status", "error", "finished_at", "duration"])
+    close_old_connections()
+    return run
+
+
+def build_scheduler():
+    """Create a (not yet started) APScheduler instance with every job registered."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    scheduler = BackgroundScheduler(
+        timezone=settings.TIME_ZONE,
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+    )
+    for job_id, func_path, trigger in JOBS:
+        scheduler.add_job(run_job, args=[job_id, func_path], id=job_id, **trigger)
+    return scheduler
+
+
+def run_while_leader(lock=None, interval=None):
+    """
+    Elect a leader and run the scheduler in it until ``stop()`` is called.
+
+    Blocks the calling thread. Followers poll the lock every ``interval``
+    seconds; the leader re-checks it at the same rate and steps down if
+    it is lost.
+    """
+    lock = lock or get_leader_lock()
+    interval = interval or settings.SCHEDULER_ELECTION_INTERVAL
+    while not _stop.is_set():
+        if not lock.acquire():
+            _stop.wait(interval)
+            continue
+
+        logger.info("Process %d elected scheduler leader", os.getpid())
+        scheduler = build_scheduler()
+        scheduler.start()
+        try:
+            while lock.is_held() and not _stop.wait(interval):
+                pass
+        finally:
+            scheduler.shutdown(wait=False)
+            lock.release()
+        logger.info("Process %d stepped down as scheduler leader", os.getpid())
+
+
+def start():
+    """Start leader election in a daemon thread. Returns ``False`` if disabled."""
+    global _thread
+    if not settings.SCHEDULER_ENABLED or _thread is not None:
+        return False
+    _stop.clear()
+    _thread = threading.Thread(target=run_while_leader, name="scheduler-election", daemon=True)
+    _thread.start()
+    return True
+
+
+def stop():
+    """Stop the scheduler (if leading) and the election loop."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
@@ -0,0 +1,133 @@
+"""
+Session engine: cached database sessions that only write real changes.
+
+Set ``SESSION_ENGINE = "core.sessions"``. Reads go through
+``SESSION_CACHE_ALIAS`` first (as with Django's ``cached_db``), so a
+logged-in request normally never queries ``django_session``. The cache
+must be shared by every worker; the default is a file-based cache on
+the local disk.
+
+Writes are suppressed unless the data really changed. The session is
+snapshotted when loaded and compared with its contents at save time:
+
+* nothing changed (e.g. a flash message added and consumed in the same
+  request, or a value re-set to what it was): no write at all;
+* only flash messages (``TRANSIENT_KEYS``) changed: the cache entry is
+  updated and the database write skipped, since messages are read back
+  through the cache on the next request and losing one to eviction is
+  harmless;
+* anything else: the normal cache + database write.
+
+Flash messages are never written to the database row, so a session
+reloaded from the database after a cache miss cannot bring back
+messages that were already shown.
+
+``purge_expired_sessions()`` deletes expired rows in small chunks and
+also backs ``manage.py clearsessions``.
+"""
+
+import copy
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_KEYS = ("_messages",)
+
+
+def _split(data):
+    """Return ``(durable, transient)`` deep copies of the session data."""
+    durable, transient = {}, {}
+    for key, value in data.items():
+        (transient if key in TRANSIENT_KEYS else durable)[key] = copy.deepcopy(value)
+    return durable, transient
+
+
+class SessionStore(cached_db.SessionStore):
+    """``cached_db`` session store with write suppression."""
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._snapshot = None
+
+    def load(self):
+        data = super().load()
+        self._snapshot = _split(data)
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._snapshot = _split(data)
+        return data
+
+    def create_model_instance(self, data):
+        return super().create_model_instance(_split(data)[0])
+
+    async def acreate_model_instance(self, data):
+        return await super().acreate_model_instance(_split(data)[0])
+
+    def _pending_write(self, must_create):
+        """``"none"``, ``"cache"`` or ``"full"``: what saving the session needs."""
+        if must_create or self._snapshot is None or self.session_key is None:
+            return "full"
+        durable, transient = _split(self._session)
+        if durable != self._snapshot[0]:
+            return "full"
+        return "cache" if transient != self._snapshot[1] else "none"
+
+    def save(self, must_create=False):
+        write = self._pending_write(must_create)
+        if write == "cache":
+            try:
+                self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+            except Exception:
+                logger.exception("Error saving to cache (%s)", self._cache)
+                write = "full"
+        if write == "full":
+            super().save(must_create)
+        self._snapshot = _split(self._session)
+
+    async def asave(self, must_create=False):
+        write = self._pending_write(must_create)
+        if write == "cache":
+            try:
+                await self._cache.aset(
+                    await self.acache_key(), self._session, await self.aget_expiry_age()
+                )
+            except Exception:
+                logger.exception("Error saving to cache (%s)", self._cache)
+                write = "full"
+        if write == "full":
+            await super().asave(must_create)
+        self._snapshot = _split(self._session)
+
+    @classmethod
+    def clear_expired(cls):
+        purge_expired_sessions()
+
+
+def purge_expired_sessions(batch_size=None):
+    """
+    Delete expired sessions in chunks of ``batch_size`` and return the count.
+
+    Each chunk is a short DELETE by primary key, so a large backlog never
+    locks ``django_session`` for long. Expired entries left in the cache
+    time out on their own.
+    """
+    batch_size = batch_size or settings.SESSION_PURGE_BATCH_SIZE
+    Session = SessionStore.get_model_class()
+    expired = Session.objects.filter(expire_date__lt=timezone.now()).order_by()
+    deleted = 0
+    while True:
+        keys = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not keys:
+            break
+        count, _ = Session.objects.filter(pk__in=keys).delete()
+        deleted += count
+        if len(keys) < batch_size:
+            break
+    logger.info("Purged %d expired session(s)", deleted)
+    return deleted
@@ -0,0 +1,271 @@
+"""
+Durable background task queue on a database table.
+
+Request handlers call ``enqueue()`` and return immediately. Because the
+task row is written in the caller's transaction, work is only queued if
+the triggering change commits. ``manage.py run_tasks`` runs workers that
+claim and execute tasks:
+
+* on PostgreSQL tasks are claimed with ``SELECT ... FOR UPDATE SKIP
+  LOCKED``, so workers never block on or double-claim each other's rows;
+* on databases without row locks (SQLite in development) each candidate
+  is claimed with a guarded ``UPDATE ... WHERE status = 'queued'`` and
+  only the worker whose update matched runs it.
+
+Failed tasks are retried with exponential backoff and jitter until
+``max_attempts`` is reached, then dead-lettered (``status = "dead"``)
+for inspection and manual requeue from the admin. A worker refreshes
+``heartbeat_at`` on its running tasks every ``TASK_HEARTBEAT_INTERVAL``
+seconds; a task whose heartbeat is older than ``TASK_LOCK_TIMEOUT`` was
+left by a dead worker and is requeued, however long a live worker takes
+to run it. A worker only records the outcome of a task it still holds.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def _task_name(func):
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, args=(), kwargs=None, queue="default", delay=None, max_attempts=None):
+    """
+    Queue ``func(*args, **kwargs)`` to run in a worker and return the ``Task``.
+
+    ``func`` is a module-level callable or its dotted path; arguments must
+    be JSON-serialisable (pass primary keys, not model instances).
+    """
+    return Task.objects.create(
+        name=_task_name(func),
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        run_at=timezone.now() + (delay or timedelta(0)),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with +/-20% jitter for the given attempt count."""
+    base = min(
+        settings.TASK_RETRY_BACKOFF * 2 ** max(attempts - 1, 0),
+        settings.TASK_RETRY_BACKOFF_MAX,
+    )
+    return timedelta(seconds=base * random.uniform(0.8, 1.2))
+
+
+def claim_rows(ready, limit, **changes):
+    """
+    Apply ``changes`` to up to ``limit`` rows of the ``ready`` queryset and
+    return their primary keys; no row is ever claimed by two callers.
+
+    Uses ``SKIP LOCKED`` where supported, otherwise a guarded
+    ``UPDATE`` per candidate that only succeeds while the row still
+    matches ``ready``.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                ready.select_for_update(skip_locked=True).values_list("pk", flat=True)[:limit]
+            )
+            ready.model.objects.filter(pk__in=ids).update(**changes)
+        return ids
+    return [
+        pk for pk in list(ready.values_list("pk", flat=True)[:limit])
+        if ready.filter(pk=pk).update(**changes)
+    ]
+
+
+def claim(worker_name, queues=("default",), limit=1):
+    """Claim up to ``limit`` due tasks for ``worker_name`` and return them."""
+    now = timezone.now()
+    ready = Task.objects.filter(queue__in=queues, status="queued", run_at__lte=now).order_by(
+        "run_at", "pk"
+    )
+    ids = claim_rows(
+        ready, limit,
+        status="running", locked_by=worker_name, locked_at=now, heartbeat_at=now,
+        attempts=F("attempts") + 1,
+    )
+    return list(Task.objects.filter(pk__in=ids).order_by("run_at", "pk"))
+
+
+def execute(task):
+    """
+    Run a claimed task and record success, a scheduled retry, or dead-lettering.
+
+    The outcome is only written while ``task.locked_by`` still holds the
+    row, so a task that was requeued and claimed elsewhere is left alone.
+    """
+    owner = task.locked_by
+    try:
+        import_string(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            task.status = "dead"
+            task.finished_at = timezone.now()
+            logger.error("Task %s dead after %d attempt(s)", task, task.attempts)
+        else:
+            task.status = "queued"
+            task.run_at = timezone.now() + retry_delay(task.attempts)
+            logger.warning("Task %s failed, retrying at %s", task, task.run_at)
+    else:
+        task.status = "succeeded"
+        task.finished_at = timezone.now()
+    task.locked_by = ""
+    task.locked_at = None
+    task.heartbeat_at = None
+    recorded = Task.objects.filter(pk=task.pk, status="running", locked_by=owner).update(
+        status=task.status, last_error=task.last_error, run_at=task.run_at,
+        finished_at=task.finished_at, locked_by="", locked_at=None, heartbeat_at=None,
+        updated_at=timezone.now(),
+    )
+    if not recorded:
+        logger.warning("Task %s was released from %s while running; outcome not recorded", task, owner)
+    return task
+
+
+def requeue_stale(timeout=None):
+    """
+    Release tasks held by workers that died mid-run.
+
+    Tasks with attempts left go back to the queue; the rest are
+    dead-lettered. Returns the number of tasks released.
+    """
+    timeout = timeout or settings.TASK_LOCK_TIMEOUT
+    stale = Task.objects.filter(
+        status="running", heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout)
+    )
+    released = stale.filter(attempts__lt=F("max_attempts")).update(
+        status="queued", locked_by="", locked_at=None, heartbeat_at=None,
+        last_error="Worker lost while running task",
+    )
+    released += stale.update(
+        status="dead", locked_by="", locked_at=None, heartbeat_at=None, finished_at=timezone.now(),
+        last_error="Worker lost while running task",
+    )
+    return released
+
+
+def prune_finished_tasks():
+    """Delete succeeded tasks older than ``TASK_RETENTION_DAYS``."""
+    cutoff = timezone.now() - timedelta(days=settings.TASK_RETENTION_DAYS)
+    deleted, _ = Task.objects.filter(status="succeeded", finished_at__lt=cutoff).delete()
+    return deleted
+
+
+class Worker:
+    """
+    Polls the queue and executes tasks in ``concurrency`` threads.
+
+    With ``burst=True`` each thread exits once the queue is empty instead
+    of polling, which is what tests and one-off drains use. A separate
+    thread refreshes the heartbeat of every task the worker is running.
+    """
+
+    def __init__(self, queues=("default",), concurrency=None, poll_interval=None):
+        self.queues = tuple(queues)
+        self.concurrency = concurrency or settings.TASK_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.TASK_POLL_INTERVAL
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+
+    def run(self, burst=False):
+        """Process tasks until stopped (or until idle with ``burst``)."""
+        logger.info(
+            "Task worker %s started: queues=%s concurrency=%d",
+            self.name, ",".join(self.queues), self.concurrency,
+        )
+        self._idle.clear()
+        heartbeat = threading.Thread(target=self._heartbeat, name="task-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            if self.concurrency == 1:
+                self._loop(burst, thread_name=self.name)
+            else:
+                with ThreadPoolExecutor(self.concurrency, thread_name_prefix="task-worker") as pool:
+                    futures = [
+                        pool.submit(self._loop, burst, f"{self.name}/{i}")
+                        for i in range(self.concurrency)
+                    ]
+                    for future in futures:
+                        future.result()
+        finally:
+            self._idle.set()
+            heartbeat.join()
+        return self.processed
+
+    def stop(self):
+        """Finish running tasks, then exit."""
+        self._stop.set()
+
+    def _loop(self, burst, thread_name):
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                tasks = claim(thread_name, self.queues)
+                if not tasks:
+                    requeue_stale()
+                    if burst:
+                        return
+                    self._stop.wait(self.poll_interval)
+                    continue
+                for task in tasks:
+                    with self._lock:
+                        self._running[task.pk] = task.locked_by
+                    try:
+                        execute(task)
+                    finally:
+                        with self._lock:
+                            del self._running[task.pk]
+                            self.processed += 1
+        finally:
+            if self.concurrency > 1:
+                connection.close()
+
+    def _heartbeat(self):
+        """Refresh ``heartbeat_at`` of running tasks until the worker stops."""
+        try:
+            while not self._idle.wait(settings.TASK_HEARTBEAT_INTERVAL):
+                try:
+                    self.beat()
+                except DatabaseError:
+                    logger.warning("Task heartbeat failed", exc_info=True)
+                    close_old_connections()
+        finally:
+            connection.close()
+
+    def beat(self):
+        """Refresh the heartbeat of tasks this worker still holds; returns how many."""
+        with self._lock:
+            running = list(self._running.items())
+        if not running:
+            return 0
+        held = Q()
+        for pk, owner in running:
+            held |= Q(pk=pk, locked_by=owner)
+        return Task.objects.filter(held, status="running").update(heartbeat_at=timezone.now())
@@ -0,0 +1,107 @@
+"""
+Tests for the view benchmark harness.
+"""
+
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from billing.models import Invoice
+from core.benchmark import (
+    BENCHMARK_PAGES, compare_runs, dataset_is_complete, dataset_shape, latest_run, load_history,
+    record_run, run_benchmarks, summarize,
+)
+from core.dataset import generate_dataset
+
+
+def _run(p50=10.0, queries=3, size='1k', label='', status=200):
+    return {
+        'size': size, 'label': label, 'revision': '', 'timestamp': '',
+        'results': {'browse': {
+            'p50_ms': p50, 'p95_ms': p50 * 2, 'queries': queries, 'bytes': 1000, 'status': status,
+        }},
+    }
+
+
+class CompareRunsTests(SimpleTestCase):
+    """Tests for regression detection."""
+
+    def test_slower_page_is_flagged(self):
+        regressions = compare_runs(_run(p50=10.0), _run(p50=13.0))
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('browse: p50', regressions[0])
+
+    def test_noise_is_ignored(self):
+        self.assertEqual(compare_runs(_run(p50=10.0), _run(p50=10.5)), [])
+        # Large relative growth but below MIN_REGRESSION_MS
+        self.assertEqual(compare_runs(_run(p50=1.0), _run(p50=2.0)), [])
+
+    def test_extra_queries_are_flagged(self):
+        self.assertEqual(compare_runs(_run(queries=3), _run(queries=4)), ['browse: queries 3 -> 4'])
+
+    def test_status_changes_are_flagged(self):
+        # An error page is usually faster and smaller than the real one
+        self.assertEqual(
+            compare_runs(_run(p50=10.0), _run(p50=2.0, status=500)), ['browse: status 200 -> 500'],
+        )
+        self.assertEqual(compare_runs(_run(status=404), _run(status=404)), ['browse: status 404 -> 404'])
+
+    def test_summarize(self):
+        summary = summarize([0.001 * i for i in range(1, 21)])
+        self.assertEqual(summary['p50_ms'], 10.5)
+        self.assertEqual(summary['p95_ms'], 19.05)
+
+
+class HistoryTests(SimpleTestCase):
+    """Tests for the JSON history file and the compare command."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = Path(directory) / 'history.json'
+
+    def _record(self, run):
+        record_run(run['size'], 20, run['results'], label=run['label'], path=self.path)
+
+    def test_latest_run(self):
+        self._record(_run(p50=10.0, label='base'))
+        self._record(_run(p50=11.0, size='100k'))
+        self._record(_run(p50=12.0))
+        history = load_history(self.path)
+        self.assertEqual(latest_run(history, '1k')['results']['browse']['p50_ms'], 12.0)
+        self.assertEqual(latest_run(history, '1k', label='base')['results']['browse']['p50_ms'], 10.0)
+        self.assertIsNone(latest_run(history, '1m'))
+
+    def test_compare_command(self):
+        self._record(_run(p50=10.0, label='base'))
+        self._record(_run(p50=10.0))
+        call_command('benchmark_compare', history=str(self.path), stdout=StringIO())
+
+        self._record(_run(p50=20.0))
+        with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+            call_command('benchmark_compare', baseline='base', history=str(self.path), stdout=StringIO())
+
+
+class RunBenchmarksTests(TestCase):
+    """Every benchmarked page renders against a generated dataset."""
+
+    def test_pages(self):
+        generate_dataset(sellers=3, products=30, orders=5, seed=7, report=lambda message: None)
+        results = run_benchmarks(rounds=2)
+        self.assertEqual(set(results), {page[0] for page in BENCHMARK_PAGES})
+        for name, result in results.items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertGreater(result['bytes'], 0)
+
+    def test_dataset_is_complete(self):
+        shape = dataset_shape(300)
+        self.assertFalse(dataset_is_complete(shape))
+        generate_dataset(**shape, seed=7, report=lambda message: None)
+        self.assertTrue(dataset_is_complete(shape))
+        # An interrupted run stops short of the last invoices
+        Invoice.objects.filter(pk=Invoice.objects.order_by('-pk').values('pk')[:1]).delete()
+        self.assertFalse(dataset_is_complete(shape))
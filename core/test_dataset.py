@@ -0,0 +1,90 @@
+"""
+Tests for the synthetic dataset generator.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from billing.models import Invoice
+from core import dataset
+from core.dataset import EMAIL_DOMAIN, generate_dataset, zipf_weights
+from orders.models import Order, OrderItem
+from products.models import Product
+from sellers.models import Seller
+from users.models import User
+
+
+class GenerateDatasetTests(TestCase):
+    """Tests for generate_dataset."""
+
+    def _generate(self, seed=1):
+        return generate_dataset(
+            sellers=6, products=120, orders=30, invoices=15, seed=seed, chunk_size=40,
+            report=lambda message: None,
+        )
+
+    def test_counts(self):
+        counts = self._generate()
+        self.assertEqual(counts, {
+            'sellers': 6, 'buyers': 6, 'products': 120, 'orders': 30, 'invoices': 15,
+        })
+        self.assertEqual(Product.objects.count(), 120)
+        self.assertEqual(Seller.objects.filter(subscriptions__status='active').count(), 6)
+        for order in Order.objects.prefetch_related('items')[:5]:
+            self.assertEqual(
+                order.total_price,
+                sum(item.subtotal for item in order.items.all()),
+            )
+        # Second round of invoices covers the month before
+        self.assertEqual(Invoice.objects.values('period_start').distinct().count(), 3)
+
+    def test_same_seed_same_rows(self):
+        def rows():
+            return list(Product.objects.order_by('pk').values_list('title', 'price', 'status'))
+
+        self._generate(seed=1)
+        first = rows()
+        User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        self._generate(seed=1)
+        self.assertEqual(rows(), first)
+
+    def test_chunk_completion_order_does_not_change_rows(self):
+        """Workers finish chunks in any order; the rows must not depend on it."""
+        def rows():
+            return (
+                sorted(Product.objects.values_list('title', 'seller__shop_slug', 'price', 'status')),
+                sorted(Order.objects.values_list('buyer__email', 'status', 'total_price', 'shipping_address')),
+                sorted(OrderItem.objects.values_list(
+                    'order__buyer__email', 'order__total_price', 'product__title', 'quantity',
+                )),
+            )
+
+        # Another seed's rows come first, so this seed's pks do not start at 1
+        generate_dataset(sellers=1, products=10, seed=9, report=lambda message: None)
+        self._generate(seed=1)
+        serial = rows()
+        User.objects.filter(email__endswith=f'.s1@{EMAIL_DOMAIN}').delete()
+
+        chunks = dataset._chunks
+        with mock.patch.object(dataset, '_chunks', lambda *args: chunks(*args)[::-1]):
+            self._generate(seed=1)
+        self.assertEqual(rows(), serial)
+
+    def test_seed_cannot_be_reused(self):
+        self._generate()
+        with self.assertRaises(CommandError):
+            call_command(
+                'generate_dataset', sellers=1, products=1, seed=1, stdout=StringIO()
+            )
+
+
+class DistributionTests(SimpleTestCase):
+    """Tests for the distribution helpers."""
+
+    def test_zipf_weights_favour_top_ranks(self):
+        weights = zipf_weights(100)
+        self.assertGreater(weights[0], weights[-1] - weights[-2])
+        self.assertGreater(weights[9] / weights[-1], 0.5)
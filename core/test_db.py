@@ -0,0 +1,89 @@
+"""
+Tests for connection metrics and the health endpoint.
+"""
+
+from unittest.mock import Mock, patch
+
+from django.core.checks import run_checks
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import db
+from users.models import User
+
+
+class ConnectionMetricsTests(TestCase):
+    """Tests for connection metrics in both modes."""
+
+    def test_thread_connections_are_counted(self):
+        connection.ensure_connection()
+        metrics = db.connection_metrics()
+        self.assertIn(metrics['mode'], ('persistent', 'per-request'))
+        self.assertGreaterEqual(metrics['checked_out'], 1)
+        self.assertEqual(metrics['waiting'], 0)
+
+    def test_pool_statistics(self):
+        pool = Mock(max_size=8)
+        pool.get_stats.return_value = {
+            'pool_size': 5, 'pool_available': 2, 'requests_waiting': 3,
+            'connections_num': 7, 'returns_bad': 1,
+        }
+        with patch.object(connection, 'pool', pool, create=True):
+            metrics = db.connection_metrics()
+        self.assertEqual(metrics, {
+            'mode': 'pool', 'checked_out': 3, 'waiting': 3, 'created': 7,
+            'size': 5, 'max_size': 8, 'errors': 1,
+        })
+
+    def test_check_database(self):
+        ok, latency_ms, error = db.check_database()
+        self.assertTrue(ok)
+        self.assertGreaterEqual(latency_ms, 0)
+        self.assertEqual(error, '')
+
+
+class HealthViewTests(TestCase):
+    """Tests for the health endpoint."""
+
+    def test_healthy(self):
+        response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertIn('checked_out', response.json()['database'])
+
+    def test_database_down(self):
+        with patch('core.views.check_database', return_value=(False, 1.0, 'refused')):
+            with self.assertLogs('core.views', 'ERROR'):
+                response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['database']['error'], 'refused')
+
+    def test_public_clients_only_get_status(self):
+        with patch('core.views.check_database', return_value=(False, 1.0, 'refused')):
+            with self.assertLogs('core.views', 'ERROR'):
+                response = self.client.get(reverse('health'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'error'})
+
+    def test_staff_get_details_from_anywhere(self):
+        staff = User.objects.create_user(
+            email='staff@test.com', username='staff@test.com', password='testpass123', is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get(reverse('health'), REMOTE_ADDR='203.0.113.9')
+        self.assertIn('latency_ms', response.json()['database'])
+
+
+class PoolCheckTests(TestCase):
+    """Tests for the DB_POOL deployment check."""
+
+    @override_settings(DB_POOL=True, DB_POOL_ACTIVE=False)
+    def test_warns_when_pool_unavailable(self):
+        ids = [message.id for message in run_checks(include_deployment_checks=True)]
+        self.assertIn('core.W001', ids)
+
+    @override_settings(DB_POOL=False, DB_POOL_ACTIVE=False)
+    def test_silent_when_pool_not_requested(self):
+        ids = [message.id for message in run_checks(include_deployment_checks=True)]
+        self.assertNotIn('core.W001', ids)
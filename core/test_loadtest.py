@@ -0,0 +1,68 @@
+"""
+Tests for the load generator.
+"""
+
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.dataset import generate_dataset
+from core.loadtest import DEFAULT_WEIGHTS, _outcome, build_plan, client_process, summarize_samples
+
+
+class SummarizeSamplesTests(SimpleTestCase):
+    """Tests for aggregating client samples."""
+
+    def test_report(self):
+        samples = [
+            ('browse', 'home', 200, 'ok', 4.0),
+            ('browse', 'home', 200, 'ok', 30.0),
+            ('login', 'login', 302, 'ok', 60.0),
+            ('login', 'login', 429, 'throttled', 2.0),
+            ('product', 'product_detail', 500, 'errors', 7000.0),
+        ]
+        report = summarize_samples(samples, elapsed=2.0)
+        self.assertEqual(report['requests'], 5)
+        self.assertEqual(report['throughput_rps'], 2.5)
+        self.assertEqual(report['outcomes'], {'ok': 3, 'throttled': 1, 'errors': 1})
+        self.assertEqual(report['error_rate'], 0.2)
+        self.assertEqual(report['statuses'], {'200': 2, '302': 1, '429': 1, '500': 1})
+        self.assertEqual(report['steps']['home']['requests'], 2)
+        self.assertEqual(report['steps']['product_detail']['errors'], 1)
+        histogram = {bucket['le_ms']: bucket['count'] for bucket in report['histogram']}
+        self.assertEqual(histogram[5], 2)
+        self.assertEqual(histogram[None], 1)
+
+    def test_outcomes(self):
+        login = ['/accounts/login/', '/auth/login/']
+        self.assertEqual(_outcome('login', 302, '/', login), 'ok')
+        # A failed login re-renders the form
+        self.assertEqual(_outcome('seller_login', 200, '', login), 'errors')
+        self.assertEqual(_outcome('seller_login', 429, '', login), 'throttled')
+        # The session was not kept
+        self.assertEqual(_outcome('seller_dashboard', 302, '/accounts/login/?next=/seller/', login), 'errors')
+        self.assertEqual(_outcome('seller_orders', 302, '/seller/orders/?page=1', login), 'ok')
+        self.assertEqual(_outcome('home', 200, '', login), 'ok')
+        self.assertEqual(_outcome('home', 0, '', login), 'errors')
+
+    def test_no_samples(self):
+        report = summarize_samples([], elapsed=1.0)
+        self.assertEqual(report['requests'], 0)
+        self.assertEqual(report['error_rate'], 0.0)
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class ClientProcessTests(LiveServerTestCase):
+    """Every scenario runs cleanly against a live server."""
+
+    def test_scenarios(self):
+        generate_dataset(sellers=2, products=10, orders=2, seed=5, report=lambda message: None)
+        plan = build_plan()
+        self.assertIn(reverse('login'), plan['login_paths'])
+        for scenario in DEFAULT_WEIGHTS:
+            samples = client_process(self.live_server_url, plan, {scenario: 1}, duration=0.1, seed=1)
+            self.assertTrue(samples, scenario)
+            for _, step, status, outcome, _ in samples:
+                # Logins redirect on success and re-render the form on failure
+                expected = 302 if step.endswith('login') else 200
+                self.assertEqual(status, expected, f'{scenario}/{step}')
+                self.assertEqual(outcome, 'ok', f'{scenario}/{step}')
@@ -0,0 +1,107 @@
+"""
+Tests for the queued, rotating log file handler.
+"""
+
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.logformat import JsonFormatter
+from core.logqueue import _STOP, QueuedRotatingFileHandler
+
+
+class QueuedRotatingFileHandlerTests(SimpleTestCase):
+    """Tests for ``QueuedRotatingFileHandler``."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = self.tmp / "app.log"
+        self.logger = logging.getLogger("core.test_logqueue")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.addCleanup(setattr, self.logger, "propagate", True)
+
+    def make_handler(self, **kwargs):
+        handler = QueuedRotatingFileHandler(self.path, **kwargs)
+        self.logger.addHandler(handler)
+        self.addCleanup(handler.close)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def test_records_are_written_in_order_after_stop(self):
+        handler = self.make_handler()
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        for number in range(100):
+            self.logger.info("line %d", number)
+        handler.stop()
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(lines, [f"INFO line {number}" for number in range(100)])
+
+    def test_formatter_output_is_written_as_is(self):
+        handler = self.make_handler()
+        handler.setFormatter(JsonFormatter())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("failed", extra={"status": 500})
+        handler.stop()
+        text = self.path.read_text()
+        self.assertIn('"status": 500', text)
+        self.assertIn("ValueError: boom", text)
+
+    def test_files_rotate_by_size(self):
+        handler = self.make_handler(maxBytes=1000, backupCount=2)
+        for _ in range(40):
+            self.logger.info("x" * 99)
+            # One batch per record, so each one can trigger a rotation
+            handler.stop()
+        self.assertTrue(self.path.exists())
+        self.assertTrue(Path(f"{self.path}.1").exists())
+        self.assertTrue(Path(f"{self.path}.2").exists())
+        self.assertFalse(Path(f"{self.path}.3").exists())
+        self.assertLessEqual(self.path.stat().st_size, 1000)
+
+    def test_reopens_file_rotated_by_another_process(self):
+        handler = self.make_handler()
+        self.logger.info("before")
+        handler.stop()
+        os.rename(self.path, f"{self.path}.1")
+        self.logger.info("after")
+        handler.stop()
+        self.assertEqual(self.path.read_text(), "after\n")
+
+    def test_writes_wait_for_the_file_lock(self):
+        handler = self.make_handler()
+        record = self.logger.makeRecord(self.logger.name, logging.INFO, __file__, 1, "locked", (), None)
+        # Another process rotating or writing holds the lock
+        with open(f"{self.path}.lock", "a") as other:
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+            writer = threading.Thread(target=handler.target.emit_batch, args=([record],))
+            writer.start()
+            writer.join(0.2)
+            self.assertTrue(writer.is_alive())
+            self.assertFalse(self.path.exists())
+            fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+        writer.join(5)
+        self.assertEqual(self.path.read_text(), "locked\n")
+
+    def test_writer_restarts_in_a_forked_process(self):
+        handler = self.make_handler()
+        self.logger.info("parent")
+        parent_queue, parent_thread = handler.queue, handler._thread
+        # As if this process were a fresh fork of the one that started it
+        handler._pid = -1
+        self.logger.info("child")
+        self.assertIsNot(handler.queue, parent_queue)
+        self.assertIsNot(handler._thread, parent_thread)
+        handler.stop()
+        parent_queue.put(_STOP)
+        parent_thread.join(1)
+        self.assertEqual(sorted(self.path.read_text().splitlines()), ["child", "parent"])
@@ -0,0 +1,102 @@
+"""
+Tests for the transactional email outbox.
+"""
+
+from io import StringIO
+from smtplib import SMTPException
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from core import mail as outbox
+from core.models import OutboxEmail, Task
+
+
+class FlakyBackend(EmailBackend):
+    """Rejects recipients at example.invalid."""
+
+    def send_messages(self, messages):
+        if any(address.endswith('@example.invalid') for m in messages for address in m.to):
+            raise SMTPException('Mailbox unavailable')
+        return super().send_messages(messages)
+
+
+class QueueEmailTests(TestCase):
+    """Tests for writing to the outbox."""
+
+    def test_drain_task_queued_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            outbox.queue_email('a@test.com', 'Hi', 'Body')
+            outbox.queue_email('b@test.com', 'Hi', 'Body')
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+        self.assertEqual(Task.objects.filter(name=outbox.SEND_OUTBOX_TASK).count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_rolled_back_email_is_never_queued(self):
+        try:
+            with transaction.atomic():
+                outbox.queue_email('a@test.com', 'Hi', 'Body')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(OutboxEmail.objects.exists())
+
+
+class SendOutboxTests(TestCase):
+    """Tests for batched delivery."""
+
+    def _queue(self, *recipients):
+        for recipient in recipients:
+            outbox.queue_email(recipient, f'To {recipient}', 'Body')
+
+    def test_batch_uses_one_connection(self):
+        self._queue('a@test.com', 'b@test.com', 'c@test.com')
+        with patch.object(outbox, 'get_connection', wraps=outbox.get_connection) as get_conn:
+            result = outbox.send_outbox(rate_limit=0)
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(get_conn.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboxEmail.objects.filter(status='sent').count(), 3)
+
+    def test_batches_split_by_size(self):
+        self._queue('a@test.com', 'b@test.com', 'c@test.com')
+        with patch.object(outbox, 'get_connection', wraps=outbox.get_connection) as get_conn:
+            outbox.send_outbox(batch_size=2, rate_limit=0)
+        self.assertEqual(get_conn.call_count, 2)
+
+    @override_settings(EMAIL_BACKEND='core.test_mail.FlakyBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_retried_then_dead_lettered(self):
+        self._queue('ok@test.com', 'bad@example.invalid')
+        result = outbox.send_outbox(rate_limit=0)
+        self.assertEqual((result.sent, result.retried, result.dead), (1, 1, 0))
+
+        bad = OutboxEmail.objects.get(recipient='bad@example.invalid')
+        self.assertEqual(bad.status, 'queued')
+        self.assertIn('Mailbox unavailable', bad.last_error)
+
+        OutboxEmail.objects.filter(pk=bad.pk).update(send_after=bad.created_at)
+        result = outbox.send_outbox(rate_limit=0)
+        self.assertEqual(result.dead, 1)
+
+    def test_rate_limit_throttles_sends(self):
+        self._queue('a@test.com', 'b@test.com', 'c@test.com')
+        with patch.object(outbox.time, 'sleep') as sleep:
+            outbox.send_outbox(rate_limit=1)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_metrics(self):
+        self._queue('a@test.com', 'b@test.com')
+        self.assertEqual(outbox.outbox_metrics()['queued'], 2)
+        outbox.send_outbox(rate_limit=0)
+        metrics = outbox.outbox_metrics()
+        self.assertEqual(metrics['queued'], 0)
+        self.assertEqual(metrics['sent_24h'], 2)
+
+    def test_command(self):
+        self._queue('a@test.com')
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
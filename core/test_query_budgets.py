@@ -0,0 +1,56 @@
+"""
+Query-count regression tests.
+
+Every GET page is requested against a small and a large dataset and
+must stay within the budgets in ``query_budgets.toml``, so a template
+loop that starts querying per row fails here before it reaches
+production.
+"""
+
+import tomllib
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+BUDGET_FILE = Path(__file__).with_name('query_budgets.toml')
+DATASET_SIZES = {'small': 1, 'large': 25}
+
+with BUDGET_FILE.open('rb') as f:
+    BUDGETS = tomllib.load(f)
+EXEMPT = set(BUDGETS.pop('exempt'))
+
+
+@pytest.mark.parametrize('size', DATASET_SIZES)
+@pytest.mark.parametrize('url_name', sorted(BUDGETS))
+def test_query_budget(client, catalogue_dataset, settings, url_name, size):
+    # Count every query here; the middleware's own limits would mask the budget
+    settings.QUERY_BUDGET_MODE = 'off'
+    budget = BUDGETS[url_name]
+    dataset = catalogue_dataset(DATASET_SIZES[size])
+    args = {
+        'category': dataset.category.id,
+        'product': dataset.product.id,
+        'shop': dataset.seller.shop_slug,
+    }
+    if budget.get('user') == 'seller':
+        client.force_login(dataset.seller_user)
+    url = reverse(url_name, args=[args[name] for name in budget.get('args', [])])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert len(queries) <= budget[size], (
+        f'{url_name} ran {len(queries)} queries with the {size} dataset '
+        f'(budget {budget[size]}):\n' + '\n'.join(q['sql'] for q in queries.captured_queries)
+    )
+
+
+def test_every_page_has_a_budget():
+    names = {name for name in get_resolver().reverse_dict if isinstance(name, str)}
+    missing = names - set(BUDGETS) - EXEMPT
+    assert not missing, f'Add these URL names to {BUDGET_FILE.name}: {sorted(missing)}'
+    assert not (set(BUDGETS) | EXEMPT) - names, 'query_budgets.toml lists unknown URL names'
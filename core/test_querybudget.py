@@ -0,0 +1,126 @@
+"""
+Tests for query budgets and N+1 detection.
+"""
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import ResolverMatch, reverse
+
+from core.querybudget import QueryBudgetExceeded, QueryBudgetMiddleware, fingerprint, query_budget
+from products.models import Product, ProductCategory, ProductCondition, ProductImage
+from sellers.models import Seller
+
+User = get_user_model()
+
+
+class FingerprintTests(SimpleTestCase):
+    """Tests for SQL normalization."""
+
+    def test_values_are_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t1" WHERE "id" = 42 AND "name" = \'it\'\'s\''),
+            fingerprint('SELECT * FROM "t1" WHERE "id" = 7 AND "name" = \'x\''),
+        )
+        self.assertIn('"t1"', fingerprint('SELECT * FROM "t1" WHERE "id" = %s'))
+
+    def test_in_lists_of_any_length_match(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (%s)'),
+        )
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    """Tests for the middleware in each mode."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='budget@test.com', username='budget@test.com', password='testpass123'
+        )
+
+    def _run(self, queries, view=None):
+        def view_func(request):
+            return HttpResponse()
+        view = view or view_func
+
+        def get_response(request):
+            request.resolver_match = ResolverMatch(view, (), {}, url_name='budget_test')
+            for i in range(queries):
+                User.objects.filter(pk=self.user.pk + i).exists()
+            return HttpResponse()
+
+        return QueryBudgetMiddleware(get_response)(RequestFactory().get('/budget/'))
+
+    @override_settings(QUERY_BUDGET_MODE='raise', QUERY_REPEAT_LIMIT=5)
+    def test_repeated_query_raises(self):
+        self._run(5)
+        with self.assertRaisesMessage(QueryBudgetExceeded, '6x SELECT'):
+            self._run(6)
+
+    @override_settings(QUERY_BUDGET_MODE='raise', QUERY_BUDGET_DEFAULT=3, QUERY_REPEAT_LIMIT=100)
+    def test_total_budget(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, '4 queries (budget 3)'):
+            self._run(4)
+
+    @override_settings(QUERY_BUDGET_MODE='raise', QUERY_BUDGET_DEFAULT=3, QUERY_REPEAT_LIMIT=100)
+    def test_per_view_budget(self):
+        @query_budget(10)
+        def generous(request):
+            return HttpResponse()
+
+        self.assertEqual(self._run(8, view=generous).status_code, 200)
+
+    @override_settings(QUERY_BUDGET_MODE='log', QUERY_REPEAT_LIMIT=2)
+    def test_log_mode_reports(self):
+        with self.assertLogs('core.querybudget', 'WARNING') as logs:
+            response = self._run(3)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('budget_test', logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGET_MODE='sample', QUERY_BUDGET_SAMPLE_RATE=0.0, QUERY_REPEAT_LIMIT=2
+    )
+    def test_unsampled_requests_are_not_checked(self):
+        with self.assertNoLogs('core.querybudget'):
+            self._run(3)
+
+
+@override_settings(QUERY_BUDGET_MODE='raise')
+class CatalogueQueryTests(TestCase):
+    """Product cards must not query per product."""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='cards@test.com', username='cards@test.com', password='testpass123',
+            is_seller=True,
+        )
+        seller = Seller.objects.get(user=user)
+        category = ProductCategory.objects.create(name='Clocks', slug='clocks')
+        condition = ProductCondition.objects.create(name='Fair')
+        products = Product.objects.bulk_create(
+            Product(
+                seller=seller, title=f'Clock {i}', description='Old', price=5,
+                category=category, condition=condition, stock=1, status='published',
+            )
+            for i in range(12)
+        )
+        ProductImage.objects.bulk_create(
+            ProductImage(product=product, image=f'products/clock{i}.jpg')
+            for i, product in enumerate(products)
+        )
+        self.seller = seller
+        self.category = category
+
+    def test_browse(self):
+        response = self.client.get(reverse('products_browse'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'clock11.jpg')
+
+    def test_category(self):
+        response = self.client.get(reverse('category_products', args=[self.category.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_shop(self):
+        response = self.client.get(reverse('shop_detail', args=[self.seller.shop_slug]))
+        self.assertEqual(response.status_code, 200)
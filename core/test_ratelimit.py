@@ -0,0 +1,193 @@
+"""
+Tests for the auth view rate limiter.
+"""
+
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import ratelimit
+from core.checks import check_ratelimit_cache
+from core.filecache import LockingFileBasedCache
+from core.models import OutboxEmail
+
+User = get_user_model()
+
+RATES = {
+    'login': {'ip': '10/m', 'account': '2/m'},
+    'password_reset': {'ip': '10/m', 'account': '1/h'},
+    'verify_email_resend': {'ip': '3/m', 'account': '10/m'},
+}
+
+
+def _count_hits(location, hits):
+    cache = LockingFileBasedCache(location, {})
+    for _ in range(hits):
+        cache.add('counter', 0)
+        cache.incr('counter')
+
+
+def _expiry(cache, key):
+    with open(cache._key_to_file(key), 'rb') as f:
+        return pickle.load(f)
+
+
+class SharedCounterTests(SimpleTestCase):
+    """Tests for counters shared by several worker processes."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+
+    def test_file_cache_increments_are_atomic_across_processes(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_count_hits, [self.location] * 4, [50] * 4))
+        self.assertEqual(LockingFileBasedCache(self.location, {}).get('counter'), 200)
+
+    def test_incr_keeps_the_expiry(self):
+        cache = LockingFileBasedCache(self.location, {})
+        cache.set('counter', 0, timeout=7200)
+        expiry = _expiry(cache, 'counter')
+        self.assertEqual(cache.incr('counter'), 1)
+        self.assertEqual(cache.decr('counter', 2), -1)
+        self.assertAlmostEqual(_expiry(cache, 'counter'), expiry, delta=1)
+        cache.set('forever', 1, timeout=None)
+        cache.incr('forever')
+        self.assertIsNone(_expiry(cache, 'forever'))
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+    def test_counters_outlive_the_default_timeout(self):
+        caches_setting = {
+            **settings.CACHES,
+            'ratelimit': {'BACKEND': 'core.filecache.LockingFileBasedCache', 'LOCATION': self.location},
+        }
+        with override_settings(CACHES=caches_setting, RATELIMIT_CACHE='ratelimit'):
+            for _ in range(2):
+                ratelimit.hit('rl:test:ttl', '3/h', now=3600)
+            cache = caches['ratelimit']
+            self.assertEqual(cache.get('rl:test:ttl:1'), 2)
+            # Two windows, not the 300 s cache default
+            self.assertGreater(_expiry(cache, 'rl:test:ttl:1'), time.time() + 7000)
+
+    def test_per_process_cache_is_flagged(self):
+        with override_settings(RATELIMIT_CACHE='default'):
+            self.assertEqual([w.id for w in check_ratelimit_cache(None)], ['core.W002'])
+        with override_settings(
+            RATELIMIT_CACHE='ratelimit',
+            CACHES={'ratelimit': {'BACKEND': 'core.filecache.LockingFileBasedCache', 'LOCATION': '/tmp'}},
+        ):
+            self.assertEqual(check_ratelimit_cache(None), [])
+
+
+class SlidingWindowTests(SimpleTestCase):
+    """Tests for the window arithmetic."""
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate('5/m'), (5, 60))
+        self.assertEqual(ratelimit.parse_rate('3/15m'), (3, 900))
+        self.assertEqual(ratelimit.parse_rate('100/d'), (100, 86400))
+        with self.assertRaises(ValueError):
+            ratelimit.parse_rate('5 per minute')
+
+    def test_allows_up_to_limit_then_blocks(self):
+        results = [ratelimit.hit('rl:test:a', '3/m', now=600) for _ in range(4)]
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertEqual(results[3], 60)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            ratelimit.hit('rl:test:b', '4/m', now=600)
+        # Halfway into the next window half of the old hits still count
+        self.assertEqual(ratelimit.hit('rl:test:b', '4/m', now=690), 0)
+        self.assertEqual(ratelimit.hit('rl:test:b', '4/m', now=690), 0)
+        self.assertEqual(ratelimit.hit('rl:test:b', '4/m', now=690), 30)
+        # A window later the old hits have aged out
+        self.assertEqual(ratelimit.hit('rl:test:b', '4/m', now=721), 0)
+
+
+@override_settings(RATELIMIT_RATES=RATES, RATELIMIT_ENABLED=True)
+class AuthViewRateLimitTests(TestCase):
+    """Tests for the decorated authentication views."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='limited@example.com', username='limited@example.com', password='TestPass123!'
+        )
+
+    def test_login_blocked_per_account_before_hashing(self):
+        data = {'email': 'limited@example.com', 'password': 'wrong'}
+        for _ in range(2):
+            self.client.post(reverse('login'), data)
+        with patch('django.contrib.auth.backends.ModelBackend.authenticate') as authenticate:
+            response = self.client.post(reverse('login'), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
+        authenticate.assert_not_called()
+
+    def test_account_limit_ignores_case(self):
+        self.client.post(reverse('login'), {'email': 'limited@example.com', 'password': 'x'})
+        self.client.post(reverse('login'), {'email': 'LIMITED@example.com', 'password': 'x'})
+        response = self.client.post(
+            reverse('login'), {'email': 'Limited@Example.com', 'password': 'x'}
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_other_accounts_are_not_affected(self):
+        for _ in range(3):
+            self.client.post(reverse('login'), {'email': 'limited@example.com', 'password': 'x'})
+        response = self.client.post(
+            reverse('login'), {'email': 'other@example.com', 'password': 'x'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_is_never_limited(self):
+        for _ in range(5):
+            self.client.post(reverse('login'), {'email': 'limited@example.com', 'password': 'x'})
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+
+    def test_password_reset_queues_no_email_when_limited(self):
+        data = {'email': 'limited@example.com'}
+        self.client.post(reverse('password-reset-request'), data)
+        response = self.client.post(reverse('password-reset-request'), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_resend_limited_per_ip(self):
+        for i in range(3):
+            self.client.post(reverse('verify-email-resend'), {'email': f'nobody{i}@example.com'})
+        response = self.client.post(
+            reverse('verify-email-resend'), {'email': 'limited@example.com'}
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    @override_settings(RATELIMIT_IP_META_KEY='HTTP_X_REAL_IP')
+    def test_ip_read_from_proxy_header(self):
+        for _ in range(3):
+            self.client.post(
+                reverse('verify-email-resend'), {'email': 'a@example.com'},
+                HTTP_X_REAL_IP='203.0.113.7',
+            )
+        response = self.client.post(
+            reverse('verify-email-resend'), {'email': 'b@example.com'},
+            HTTP_X_REAL_IP='203.0.113.8',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(5):
+            response = self.client.post(
+                reverse('login'), {'email': 'limited@example.com', 'password': 'x'}
+            )
+        self.assertEqual(response.status_code, 200)
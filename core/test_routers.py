@@ -0,0 +1,105 @@
+"""
+Tests for read-replica routing.
+"""
+
+from unittest.mock import patch
+
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.routers import STICKY_SESSION_KEY, ReplicaRouter, RoutingState, _state
+from orders.models import Order
+from products.models import Product, ProductCategory, ProductCondition
+from sellers.models import Seller
+from users.models import User
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRoutingTests(TestCase):
+    """Catalogue pages read from the replica; writes pin the session to the primary."""
+
+    def setUp(self):
+        # Point the replica alias at the test database connection
+        connections['replica1'] = connections['default']
+        self.addCleanup(connections.__delitem__, 'replica1')
+
+        self.user = User.objects.create_user(
+            email='replica@test.com', username='replica@test.com',
+            password='testpass123', is_seller=True,
+        )
+        self.seller = Seller.objects.get(user=self.user)
+        category = ProductCategory.objects.create(name='Lamps', slug='lamps')
+        condition = ProductCondition.objects.create(name='Good')
+        self.product, self.other = [
+            Product.objects.create(
+                seller=self.seller, title=title, description='Vintage', price=10,
+                category=category, condition=condition, stock=1, status='published',
+            )
+            for title in ('Lamp', 'Shade')
+        ]
+
+    def test_catalogue_page_reads_from_replica(self):
+        response = self.client.get(reverse('product_detail', args=[self.product.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['product']._state.db, 'replica1')
+
+    def test_other_pages_read_from_primary(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('seller_products_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(STICKY_SESSION_KEY, self.client.session)
+        self.assertTrue(all(p._state.db == 'default' for p in response.context['products']))
+
+    def test_write_pins_session_to_primary(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('product_unpublish', args=[self.product.id]))
+        self.assertIn(STICKY_SESSION_KEY, self.client.session)
+
+        response = self.client.get(reverse('product_detail', args=[self.other.id]))
+        self.assertEqual(response.context['product']._state.db, 'default')
+
+        with patch('core.routers.time.time', return_value=self.client.session[STICKY_SESSION_KEY] + 1):
+            response = self.client.get(reverse('product_detail', args=[self.other.id]))
+        self.assertEqual(response.context['product']._state.db, 'replica1')
+
+    def test_anonymous_request_creates_no_session(self):
+        self.client.get(reverse('products_browse'))
+        self.assertNotIn('sessionid', self.client.cookies)
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReplicaRouterTests(TestCase):
+    """Tests for the router's decisions."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.state = RoutingState()
+        token = _state.set(self.state)
+        self.addCleanup(_state.reset, token)
+
+    def test_only_catalogue_models_use_replicas(self):
+        self.state.use_replica = True
+        self.assertEqual(self.router.db_for_read(Product), 'replica1')
+        self.assertIsNone(self.router.db_for_read(Order))
+
+    @override_settings(REPLICA_DATABASES=['replica1', 'replica2', 'replica3'])
+    def test_one_replica_per_request(self):
+        """Test every read of a request (e.g. a page and its count) hits the same replica."""
+        self.state.use_replica = True
+        chosen = {self.router.db_for_read(Product) for _ in range(20)}
+        self.assertEqual(len(chosen), 1)
+        self.assertEqual(self.router.db_for_read(Seller), chosen.pop())
+
+    def test_reads_after_a_write_use_primary(self):
+        self.state.use_replica = True
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_outside_requests_use_primary(self):
+        _state.set(None)
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_never_migrates_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'products'))
+        self.assertIsNone(self.router.allow_migrate('default', 'products'))
@@ -0,0 +1,135 @@
+"""
+Tests for the leader-elected job scheduler.
+"""
+
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils.module_loading import import_string
+
+from core import scheduler
+from core.models import JobRun
+
+
+def succeeding_job():
+    return 'ok'
+
+
+def failing_job():
+    raise RuntimeError('boom')
+
+
+class RunJobTests(TestCase):
+    """Tests for job run history."""
+
+    def test_success_is_recorded_with_duration(self):
+        run = scheduler.run_job('ok', 'core.test_scheduler.succeeding_job')
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'succeeded')
+        self.assertIsNotNone(run.finished_at)
+        self.assertIsNotNone(run.duration)
+        self.assertEqual(run.pid, os.getpid())
+
+    def test_failure_is_recorded_not_raised(self):
+        run = scheduler.run_job('broken', 'core.test_scheduler.failing_job')
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'failed')
+        self.assertIn('RuntimeError: boom', run.error)
+        self.assertEqual(JobRun.objects.count(), 1)
+
+    def test_registered_jobs_are_importable(self):
+        for job_id, func_path, trigger in scheduler.JOBS:
+            with self.subTest(job_id=job_id):
+                self.assertTrue(callable(import_string(func_path)))
+                self.assertIn(trigger['trigger'], ('cron', 'interval'))
+
+
+class FileLockTests(TestCase):
+    """Tests for the file-based leader lock."""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'scheduler.lock')
+
+    def test_only_one_holder(self):
+        leader = scheduler.FileLock(self.path)
+        follower = scheduler.FileLock(self.path)
+        self.assertTrue(leader.acquire())
+        self.assertFalse(follower.acquire())
+
+        leader.release()
+        self.assertTrue(follower.acquire())
+        follower.release()
+
+    def test_acquire_is_reentrant(self):
+        lock = scheduler.FileLock(self.path)
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.is_held())
+        lock.release()
+        self.assertFalse(lock.is_held())
+
+
+class ElectionTests(TestCase):
+    """Tests for the election loop."""
+
+    def tearDown(self):
+        scheduler._stop.clear()
+
+    def test_leader_runs_scheduler_until_stopped(self):
+        lock = MagicMock()
+        lock.acquire.return_value = True
+        lock.is_held.return_value = True
+        fake_scheduler = MagicMock()
+
+        with patch.object(scheduler, 'build_scheduler', return_value=fake_scheduler):
+            thread = threading.Thread(
+                target=scheduler.run_while_leader, args=(lock, 0.01)
+            )
+            thread.start()
+            scheduler._stop.wait(0.05)
+            scheduler._stop.set()
+            thread.join(timeout=5)
+
+        fake_scheduler.start.assert_called_once()
+        fake_scheduler.shutdown.assert_called_once()
+        lock.release.assert_called_once()
+
+    def test_leader_steps_down_when_lock_lost(self):
+        lock = MagicMock()
+        lock.is_held.return_value = False
+        attempts = iter([True, False])
+
+        def acquire():
+            result = next(attempts, None)
+            if result is None:
+                scheduler._stop.set()
+                return False
+            return result
+
+        lock.acquire.side_effect = acquire
+        fake_scheduler = MagicMock()
+        with patch.object(scheduler, 'build_scheduler', return_value=fake_scheduler):
+            scheduler.run_while_leader(lock, 0.01)
+
+        fake_scheduler.start.assert_called_once()
+        fake_scheduler.shutdown.assert_called_once()
+        lock.release.assert_called_once()
+
+    def test_follower_never_starts_scheduler(self):
+        lock = MagicMock()
+
+        def acquire():
+            scheduler._stop.set()
+            return False
+
+        lock.acquire.side_effect = acquire
+        with patch.object(scheduler, 'build_scheduler') as build:
+            scheduler.run_while_leader(lock, 0.01)
+        build.assert_not_called()
+
+    def test_start_disabled_by_setting(self):
+        with self.settings(SCHEDULER_ENABLED=False):
+            self.assertFalse(scheduler.start())
@@ -0,0 +1,120 @@
+"""
+Tests for the cached, write-suppressing session engine.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.sessions import SessionStore, purge_expired_sessions
+
+User = get_user_model()
+
+
+class SessionStoreTests(TestCase):
+    """Tests for read caching and write suppression."""
+
+    def setUp(self):
+        caches['sessions'].clear()
+        store = SessionStore()
+        store['cart'] = [1, 2]
+        store.create()
+        self.key = store.session_key
+
+    def test_reads_hit_the_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)['cart'], [1, 2])
+
+    def test_cache_miss_falls_back_to_database(self):
+        caches['sessions'].clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(SessionStore(self.key)['cart'], [1, 2])
+
+    def test_unchanged_session_is_not_written(self):
+        store = SessionStore(self.key)
+        store['cart'] = [1, 2]
+        store['_messages'] = 'flash'
+        del store['_messages']
+        self.assertTrue(store.modified)
+        with patch.object(DBStore, 'save') as db_save, CaptureQueriesContext(connection) as ctx:
+            store.save()
+        db_save.assert_not_called()
+        self.assertEqual(len(ctx), 0)
+
+    def test_message_only_change_stays_in_cache(self):
+        store = SessionStore(self.key)
+        store['_messages'] = 'flash'
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertEqual(SessionStore(self.key)['_messages'], 'flash')
+        self.assertNotIn('_messages', DBStore(self.key).load())
+
+    def test_seen_messages_do_not_come_back_after_cache_miss(self):
+        """Test flash messages saved alongside a real change stay out of the database."""
+        store = SessionStore(self.key)
+        store['cart'] = [1, 2, 3]
+        store['_messages'] = 'flash'
+        store.save()
+        self.assertEqual(SessionStore(self.key)['_messages'], 'flash')
+        self.assertNotIn('_messages', DBStore(self.key).load())
+
+        # Messages consumed: cache-only write; then the cache entry is lost
+        store = SessionStore(self.key)
+        del store['_messages']
+        store.save()
+        caches['sessions'].clear()
+        self.assertNotIn('_messages', SessionStore(self.key).load())
+
+    def test_real_change_is_written_through(self):
+        store = SessionStore(self.key)
+        store['cart'].append(3)
+        store.modified = True
+        store.save()
+        self.assertEqual(DBStore(self.key).load()['cart'], [1, 2, 3])
+        self.assertEqual(SessionStore(self.key)['cart'], [1, 2, 3])
+
+    def test_login_and_logout_through_views(self):
+        User.objects.create_user(
+            email='session@example.com', username='session@example.com',
+            password='TestPass123!', email_verified=True,
+        )
+        self.client.post(reverse('login'), {
+            'email': 'session@example.com', 'password': 'TestPass123!',
+        })
+        key = self.client.cookies['sessionid'].value
+        self.assertIn('_auth_user_id', SessionStore(key).load())
+        self.client.get(reverse('logout'))
+        self.assertFalse(Session.objects.filter(pk=key).exists())
+        self.assertNotIn('_auth_user_id', SessionStore(key).load())
+
+
+class PurgeExpiredSessionsTests(TestCase):
+    """Tests for the chunked purge job."""
+
+    def setUp(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1))
+             for i in range(5)]
+            + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+        )
+
+    def test_purges_in_chunks(self):
+        # Per chunk: one SELECT of keys plus the DELETE
+        with self.assertNumQueries(6):
+            self.assertEqual(purge_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), ['live'])
+
+    def test_clearsessions_uses_purge(self):
+        call_command('clearsessions')
+        self.assertEqual(Session.objects.count(), 1)
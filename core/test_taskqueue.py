@@ -0,0 +1,153 @@
+"""
+Tests for the database-backed task queue.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import taskqueue
+from core.models import Task
+from core.taskqueue import Worker, claim, enqueue, execute, requeue_stale, retry_delay
+
+calls = []
+
+
+def record(value, suffix=''):
+    calls.append(f'{value}{suffix}')
+
+
+def explode():
+    raise ValueError('nope')
+
+
+class EnqueueTests(TestCase):
+    """Tests for queuing work."""
+
+    def test_enqueue_by_callable_and_path(self):
+        task = enqueue(record, args=[1], kwargs={'suffix': '!'})
+        self.assertEqual(task.name, 'core.test_taskqueue.record')
+        self.assertEqual(task.status, 'queued')
+        self.assertEqual(enqueue('core.test_taskqueue.record').name, task.name)
+
+    def test_delay_defers_claim(self):
+        enqueue(record, args=[1], delay=timedelta(minutes=5))
+        self.assertEqual(claim('worker'), [])
+
+
+class ClaimAndExecuteTests(TestCase):
+    """Tests for claiming, retries and dead-lettering."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claimed_task_is_not_claimed_again(self):
+        enqueue(record, args=[1])
+        first = claim('worker-a')
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first[0].status, 'running')
+        self.assertEqual(first[0].attempts, 1)
+        self.assertEqual(claim('worker-b'), [])
+
+    def test_only_requested_queues_are_claimed(self):
+        enqueue(record, args=[1], queue='billing')
+        self.assertEqual(claim('worker', queues=['default']), [])
+        self.assertEqual(len(claim('worker', queues=['billing'])), 1)
+
+    def test_success(self):
+        enqueue(record, args=[1], kwargs={'suffix': '!'})
+        task = execute(claim('worker')[0])
+        self.assertEqual(task.status, 'succeeded')
+        self.assertEqual(calls, ['1!'])
+
+    def test_failure_is_retried_with_backoff(self):
+        enqueue(explode, max_attempts=3)
+        before = timezone.now()
+        task = execute(claim('worker')[0])
+        self.assertEqual(task.status, 'queued')
+        self.assertIn('ValueError: nope', task.last_error)
+        self.assertGreater(task.run_at, before + timedelta(seconds=20))
+
+    def test_dead_lettered_after_max_attempts(self):
+        enqueue(explode, max_attempts=1)
+        task = execute(claim('worker')[0])
+        self.assertEqual(task.status, 'dead')
+        self.assertIsNotNone(task.finished_at)
+
+    @override_settings(TASK_RETRY_BACKOFF=10, TASK_RETRY_BACKOFF_MAX=60)
+    def test_backoff_grows_and_is_capped(self):
+        with patch.object(taskqueue.random, 'uniform', return_value=1.0):
+            self.assertEqual(retry_delay(1), timedelta(seconds=10))
+            self.assertEqual(retry_delay(3), timedelta(seconds=40))
+            self.assertEqual(retry_delay(10), timedelta(seconds=60))
+
+    def test_stale_running_tasks_are_released(self):
+        retry = enqueue(record, args=[1])
+        dead = enqueue(record, args=[2], max_attempts=1)
+        claim('worker', limit=2)
+        Task.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(timeout=60), 2)
+        retry.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual(retry.status, 'queued')
+        self.assertEqual(dead.status, 'dead')
+
+
+    def test_long_running_task_with_heartbeat_is_kept(self):
+        """Test a task claimed long ago is not requeued while its worker beats."""
+        enqueue(record, args=[1])
+        claim('worker')
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(timeout=60), 0)
+
+    def test_outcome_not_recorded_after_losing_the_claim(self):
+        """Test a worker released as stale does not overwrite the new claim."""
+        enqueue(record, args=[1])
+        task = claim('worker-a')[0]
+        Task.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale(timeout=60)
+        claim('worker-b')
+
+        with self.assertLogs('core.taskqueue', 'WARNING'):
+            execute(task)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'running')
+        self.assertEqual(task.locked_by, 'worker-b')
+
+
+class WorkerTests(TestCase):
+    """Tests for the worker loop and management command."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_drains_queue(self):
+        for i in range(3):
+            enqueue(record, args=[i])
+        processed = Worker(concurrency=1).run(burst=True)
+        self.assertEqual(processed, 3)
+        self.assertEqual(calls, ['0', '1', '2'])
+        self.assertFalse(Task.objects.exclude(status='succeeded').exists())
+
+    def test_run_tasks_command(self):
+        enqueue(record, args=['cmd'])
+        call_command('run_tasks', '--burst', '--concurrency', '1', verbosity=0)
+        self.assertEqual(calls, ['cmd'])
+
+    def test_beat_refreshes_only_held_tasks(self):
+        enqueue(record, args=[1])
+        enqueue(record, args=[2])
+        mine, theirs = claim('worker', limit=2)
+        Task.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        Task.objects.filter(pk=theirs.pk).update(locked_by='other')
+
+        worker = Worker(concurrency=1)
+        worker._running = {mine.pk: 'worker', theirs.pk: 'worker'}
+        self.assertEqual(worker.beat(), 1)
+        self.assertEqual(requeue_stale(timeout=60), 1)
+        mine.refresh_from_db()
+        self.assertEqual(mine.status, 'running')
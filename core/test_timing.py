@@ -0,0 +1,135 @@
+"""
+Tests for request timing, the Server-Timing header and the JSON access log.
+"""
+
+import json
+import logging
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.logformat import JsonFormatter
+from core.timing import RequestTimings, _current, _instrument_cache, _timed
+from products.models import Product, ProductCategory, ProductCondition
+from sellers.models import Seller
+from users.models import User
+
+
+def _slow_query(execute, sql, params, many, context):
+    time.sleep(0.005)
+    return execute(sql, params, many, context)
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    """Tests for the per-request breakdown."""
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('products_browse'))
+        header = response['Server-Timing']
+        for name in ('db;dur=', 'tpl;dur=', 'cache;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(name, header)
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        response = self.client.get(reverse('products_browse'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_access_log_entry(self):
+        user = User.objects.create_user(
+            email='timing@test.com', username='timing@test.com', password='testpass123',
+        )
+        self.client.force_login(user)
+        with self.assertLogs('core.access', 'INFO') as logs:
+            self.client.get(reverse('account-settings'), HTTP_X_REQUEST_ID='abc123')
+        record = logs.records[-1]
+        self.assertEqual(record.view, 'account-settings')
+        self.assertEqual(record.status, 200)
+        self.assertEqual(record.user_id, user.pk)
+        self.assertEqual(record.request_id, 'abc123')
+        self.assertGreater(record.db_queries, 0)
+        self.assertGreater(record.template_ms, 0)
+        self.assertGreaterEqual(record.duration_ms, record.db_ms + record.template_ms)
+
+    def test_components_add_up_to_total(self):
+        user = User.objects.create_user(
+            email='seller@test.com', username='seller@test.com', password='testpass123', is_seller=True,
+        )
+        category = ProductCategory.objects.create(name='Clothing', slug='clothing')
+        condition = ProductCondition.objects.create(name='Good')
+        Product.objects.bulk_create(
+            Product(
+                seller=Seller.objects.get(user=user), title=f'Jacket {i}', description='Leather',
+                price=40, category=category, condition=condition, status='published',
+            )
+            for i in range(5)
+        )
+        # The page's products are a lazy queryset evaluated while rendering;
+        # slow queries make any overlap with the template time show
+        with connection.execute_wrapper(_slow_query), self.assertLogs('core.access', 'INFO') as logs:
+            self.client.get(reverse('products_browse'))
+        record = logs.records[-1]
+        self.assertGreater(record.template_ms, 0)
+        parts = record.db_ms + record.template_ms + record.cache_ms + record.app_ms
+        self.assertAlmostEqual(parts, record.duration_ms, delta=0.05)
+
+    def test_anonymous_user_is_not_loaded(self):
+        with self.assertLogs('core.access', 'INFO') as logs:
+            self.client.get(reverse('login'))
+        self.assertIsNone(logs.records[-1].user_id)
+
+    @override_settings(ACCESS_LOG_SLOW_MS=0)
+    def test_slow_requests_warn(self):
+        with self.assertLogs('core.access', 'WARNING'):
+            self.client.get(reverse('login'))
+
+
+class CacheTimingTests(SimpleTestCase):
+    """Tests for cache call instrumentation."""
+
+    def test_outermost_calls_are_counted(self):
+        cache = caches['default']
+        _instrument_cache(cache)
+        _instrument_cache(cache)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            cache.set('timing-key', 1)
+            # get_or_set calls get() internally; counted once
+            cache.get_or_set('timing-key', 2)
+        finally:
+            _current.reset(token)
+        self.assertEqual(timings.cache_calls, 2)
+        self.assertGreater(timings.cache, 0)
+
+    def test_nested_components_are_not_counted_twice(self):
+        timings = RequestTimings()
+
+        def render():
+            # A query and a cache call made while rendering
+            for component in ('db', 'cache'):
+                started = time.perf_counter()
+                time.sleep(0.02)
+                setattr(timings, component, getattr(timings, component) + time.perf_counter() - started)
+            return ''
+
+        _timed(timings, 'template', render)
+        self.assertLess(timings.template, 0.01)
+        self.assertGreaterEqual(timings.db + timings.cache, 0.04)
+
+
+class JsonFormatterTests(SimpleTestCase):
+    """Tests for the JSON log formatter."""
+
+    def test_extra_fields_are_included(self):
+        record = logging.LogRecord('core.access', logging.INFO, __file__, 1, 'GET %s', ('/',), None)
+        record.status = 200
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry['message'], 'GET /')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['status'], 200)
+        self.assertNotIn('lineno', entry)
@@ -0,0 +1,220 @@
+"""
+Per-request timing breakdown: Server-Timing header and JSON access log.
+
+``RequestTimingMiddleware`` (outermost in ``MIDDLEWARE``) starts a
+``RequestTimings`` for each request and, once the response is ready,
+splits the total into components that do not overlap:
+
+``db``     time in database queries, from an execute wrapper that
+           ``connection_created`` installs on every connection, so queries
+           run by ``sync_to_async`` threads are counted too;
+``tpl``    time rendering templates, via the ``TimedDjangoTemplates``
+           backend (top-level renders only, so includes and nested
+           ``render_to_string`` calls are not counted twice), less the
+           queries and cache calls made while rendering, such as lazy
+           querysets evaluated by a ``{% for %}`` loop;
+``cache``  time in cache calls made on the request thread, less any
+           queries they run;
+``app``    everything else: view and middleware code.
+
+The breakdown is sent as a ``Server-Timing`` header when
+``SERVER_TIMING_HEADER`` is set (browser dev tools show it), and always
+written as one JSON line to the ``core.access`` logger. Requests slower
+than ``ACCESS_LOG_SLOW_MS`` are logged at WARNING.
+"""
+
+import functools
+import logging
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.functional import empty
+
+from core.ratelimit import client_ip
+
+logger = logging.getLogger("core.access")
+
+CACHE_METHODS = (
+    "get", "set", "add", "delete", "get_many", "set_many", "delete_many",
+    "incr", "decr", "touch", "has_key", "get_or_set",
+)
+
+
+class RequestTimings:
+    """Time accumulated by each component during one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.cache = 0.0
+        self.cache_calls = 0
+        # Nesting depth per component, so only outermost calls are timed
+        self.depth = {"template": 0, "cache": 0}
+
+    def breakdown(self):
+        """Milliseconds per component, with ``app`` as the remainder."""
+        total = (time.perf_counter() - self.started) * 1000
+        db, template, cache = self.db * 1000, self.template * 1000, self.cache * 1000
+        return {
+            "total": total, "db": db, "tpl": template, "cache": cache,
+            "app": max(total - db - template - cache, 0.0),
+        }
+
+
+_current = ContextVar("request_timings", default=None)
+
+
+def _timed(timings, component, function, *args, **kwargs):
+    """
+    Call ``function``, adding its duration to ``component`` unless nested.
+    Time spent in other components during the call is left to them.
+    """
+    if timings.depth[component]:
+        return function(*args, **kwargs)
+    timings.depth[component] += 1
+    db_before, cache_before = timings.db, timings.cache
+    started = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started - (timings.db - db_before)
+        timings.depth[component] -= 1
+        if component == "template":
+            timings.template += max(elapsed - (timings.cache - cache_before), 0.0)
+        else:
+            timings.cache += max(elapsed, 0.0)
+            timings.cache_calls += 1
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def _install_query_timer(sender, connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+class TimedTemplate(Template):
+    """Django template that records its render time."""
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        return _timed(timings, "template", super().render, context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` backend returning ``TimedTemplate`` objects."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _instrument_cache(cache):
+    """Wrap ``cache``'s methods (once per instance) to record their time."""
+    if getattr(cache, "_timed", False):
+        return
+
+    def wrap(method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return method(*args, **kwargs)
+            return _timed(timings, "cache", method, *args, **kwargs)
+        return timed
+
+    for name in CACHE_METHODS:
+        setattr(cache, name, wrap(getattr(cache, name)))
+    cache._timed = True
+
+
+def server_timing(breakdown, timings):
+    """``Server-Timing`` header value for a breakdown."""
+    descriptions = {
+        "db": f"{timings.queries} queries",
+        "cache": f"{timings.cache_calls} calls",
+    }
+    parts = []
+    for name in ("db", "tpl", "cache", "app", "total"):
+        part = f"{name};dur={breakdown[name]:.1f}"
+        if name in descriptions:
+            part += f';desc="{descriptions[name]}"'
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def _user_id(request):
+    # Never load the user just for the log line
+    user = getattr(request, "user", None)
+    if user is None or getattr(user, "_wrapped", None) is empty:
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+class RequestTimingMiddleware:
+    """Measure each request and report it in a header and the access log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for cache in caches.all():
+            _instrument_cache(cache)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        breakdown = timings.breakdown()
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = server_timing(breakdown, timings)
+        self._log(request, response, breakdown, timings)
+        return response
+
+    def _log(self, request, response, breakdown, timings):
+        match = request.resolver_match
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "bytes": None if response.streaming else len(response.content),
+            "user_id": _user_id(request),
+            "ip": client_ip(request),
+            "request_id": request.headers.get("X-Request-ID"),
+            "duration_ms": round(breakdown["total"], 2),
+            "db_ms": round(breakdown["db"], 2),
+            "db_queries": timings.queries,
+            "template_ms": round(breakdown["tpl"], 2),
+            "cache_ms": round(breakdown["cache"], 2),
+            "cache_calls": timings.cache_calls,
+            "app_ms": round(breakdown["app"], 2),
+        }
+        level = logging.WARNING if breakdown["total"] >= settings.ACCESS_LOG_SLOW_MS else logging.INFO
+        logger.log(level, "%s %s %s", request.method, request.path, response.status_code, extra=entry)
@@ -1,3 +1,44 @@
-from django.shortcuts import render
+"""
+Operational endpoints.
+"""
 
-# Create your views here.
+import logging
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .db import check_database, connection_metrics
+from .ratelimit import client_ip
+
+logger = logging.getLogger(__name__)
+
+
+def _may_see_details(request):
+    """Staff users and monitoring hosts in ``HEALTH_DETAIL_IPS``."""
+    if client_ip(request) in settings.HEALTH_DETAIL_IPS:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+@never_cache
+@require_GET
+def health_view(request):
+    """
+    Health check: a database round trip.
+
+    Anyone gets the status; the latency, this worker's connection metrics
+    and any error are only shown to staff and ``HEALTH_DETAIL_IPS``.
+    Errors are always logged.
+    """
+    ok, latency_ms, error = check_database()
+    if error:
+        logger.error("Health check failed: database error: %s", error)
+    payload = {'status': 'ok' if ok else 'error'}
+    if _may_see_details(request):
+        payload['database'] = {'latency_ms': latency_ms, **connection_metrics()}
+        if error:
+            payload['database']['error'] = error
+    return JsonResponse(payload, status=200 if ok else 503)
@@ -28,6 +28,9 @@ echo "==> Collecting static files..."
 echo "==> Restarting Gunicorn..."
 sudo systemctl restart vintage_shop
 
+echo "==> Restarting task worker..."
+sudo systemctl restart vintage_shop-tasks
+
 echo "==> Verifying service..."
 sleep 2
 if systemctl is-active --quiet vintage_shop; then
@@ -9,9 +9,15 @@ import multiprocessing
 bind = "unix:/run/vintage_shop/gunicorn.sock"
 
 # 2 workers — saves ~150MB vs the default (2*CPU+1=3) formula,
-# important when PostgreSQL runs on the same 1GB box.
+# important when PostgreSQL runs on the same 1GB box. Re-check with
+# `manage.py loadtest --gunicorn --workers N --worker-class CLASS`
+# before changing this or worker_class.
 workers = 2
 
+# ASGI workers: async views (login, registration) hash passwords in a
+# thread pool while the event loop keeps serving other requests
+worker_class = "uvicorn_worker.UvicornWorker"
+
 # Preload for memory savings via copy-on-write on fork
 preload_app = True
 
@@ -35,3 +41,25 @@ proc_name = "vintage_shop"
 
 # Security — strip proxy headers
 forwarded_allow_ips = "127.0.0.1"
+
+
+def post_fork(server, worker):
+    """
+    Start this worker's log writer thread, then join scheduler leader
+    election; only one worker ends up running jobs.
+    """
+    from core import logqueue, scheduler
+
+    logqueue.start()
+    scheduler.start()
+
+
+def worker_exit(server, worker):
+    """
+    Step down as scheduler leader so another worker takes over promptly,
+    then write out any queued log records.
+    """
+    from core import logqueue, scheduler
+
+    scheduler.stop()
+    logqueue.stop()
@@ -113,7 +113,7 @@ fi
 # --- 8. Required directories ---------------------------------------------
 
 echo "==> Creating application directories..."
-sudo -u "${APP_USER}" mkdir -p "${APP_DIR}/logs" "${APP_DIR}/media" "${APP_DIR}/staticfiles"
+sudo -u "${APP_USER}" mkdir -p "${APP_DIR}/logs" "${APP_DIR}/media" "${APP_DIR}/protected_media" "${APP_DIR}/staticfiles" "${APP_DIR}/cache"
 
 # --- 9. Django migrate + collectstatic ------------------------------------
 
@@ -123,11 +123,12 @@ sudo -u "${APP_USER}" "${APP_DIR}/venv/bin/python" "${APP_DIR}/manage.py" collec
 
 # --- 10. Systemd service --------------------------------------------------
 
-echo "==> Installing systemd service..."
+echo "==> Installing systemd services..."
 cp "${APP_DIR}/deploy/vintage_shop.service" /etc/systemd/system/vintage_shop.service
+cp "${APP_DIR}/deploy/vintage_shop-tasks.service" /etc/systemd/system/vintage_shop-tasks.service
 systemctl daemon-reload
-systemctl enable vintage_shop
-systemctl start vintage_shop
+systemctl enable vintage_shop vintage_shop-tasks
+systemctl start vintage_shop vintage_shop-tasks
 
 # --- 11. Sudoers for deploy user ------------------------------------------
 
@@ -135,6 +136,7 @@ echo "==> Configuring sudoers for deploys..."
 cat > /etc/sudoers.d/vintage_shop <<SUDOEOF
 ${APP_USER} ALL=(ALL) NOPASSWD: /bin/systemctl restart vintage_shop
 ${APP_USER} ALL=(ALL) NOPASSWD: /bin/systemctl status vintage_shop
+${APP_USER} ALL=(ALL) NOPASSWD: /bin/systemctl restart vintage_shop-tasks
 SUDOEOF
 chmod 440 /etc/sudoers.d/vintage_shop
 
@@ -0,0 +1,81 @@
+"""
+Bulk fulfilment helpers for sellers.
+"""
+
+import codecs
+import csv
+from dataclasses import dataclass, field
+
+from .models import Order
+
+TRACKING_IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class TrackingImportResult:
+    """Outcome of a tracking number import."""
+
+    updated: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+
+def import_tracking_csv(seller, csv_file, batch_size=TRACKING_IMPORT_BATCH_SIZE):
+    """
+    Stream a CSV of ``order_id,tracking_number`` rows and ship the orders.
+
+    The file is decoded line by line and applied in batches of
+    ``batch_size`` rows, each batch costing a single UPDATE, so memory use
+    stays flat regardless of the upload size. Orders that do not belong to
+    ``seller`` or cannot be shipped are counted as skipped. An order id
+    repeated within a batch takes its last row. Only the current batch is
+    kept, so a repeat in a later batch is applied again: the same tracking
+    number is a no-op and counted as skipped, and a different one corrects
+    the earlier row, as within a batch.
+    """
+    result = TrackingImportResult()
+    orders = Order.objects.for_seller(seller)
+    reader = csv.DictReader(codecs.iterdecode(csv_file, "utf-8-sig"))
+
+    missing = {"order_id", "tracking_number"} - set(reader.fieldnames or ())
+    if missing:
+        result.errors.append(
+            f"Missing column(s): {', '.join(sorted(missing))}"
+        )
+        return result
+
+    batch = {}
+    for line_number, row in enumerate(reader, start=2):
+        try:
+            order_id = int(row["order_id"])
+        except (TypeError, ValueError):
+            result.errors.append(f"Line {line_number}: invalid order id")
+            result.skipped += 1
+            continue
+
+        tracking_number = (row["tracking_number"] or "").strip()
+        if not tracking_number or len(tracking_number) > 100:
+            result.errors.append(f"Line {line_number}: invalid tracking number")
+            result.skipped += 1
+            continue
+
+        if order_id in batch:
+            # Last row wins, the earlier one is not applied
+            result.skipped += 1
+        batch[order_id] = tracking_number
+
+        if len(batch) >= batch_size:
+            _apply_tracking_batch(orders, batch, result)
+            batch = {}
+
+    _apply_tracking_batch(orders, batch, result)
+    return result
+
+
+def _apply_tracking_batch(orders, batch, result):
+    """Apply one batch of tracking numbers and update the counters."""
+    if not batch:
+        return
+    updated = orders.set_tracking_numbers(batch)
+    result.updated += updated
+    result.skipped += len(batch) - updated
@@ -4,9 +4,66 @@ Orders and order items models.
 
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from core.models import TimeStampedModel
 
 
+class OrderQuerySet(models.QuerySet):
+    """Set-based helpers for order fulfilment."""
+
+    def for_seller(self, seller):
+        """Orders containing at least one item sold by ``seller``."""
+        return self.filter(
+            models.Exists(
+                OrderItem.objects.filter(
+                    order=models.OuterRef("pk"), product__seller=seller
+                )
+            )
+        )
+
+    def transition(self, status):
+        """
+        Move every order in the queryset to ``status`` with a single UPDATE.
+
+        The allowed source statuses are part of the WHERE clause, so orders
+        that are not eligible for the transition are left untouched.
+        Returns the number of orders updated.
+        """
+        sources = self.model.ALLOWED_TRANSITIONS.get(status)
+        if sources is None:
+            raise ValueError(f"Unsupported order transition: {status}")
+        return self.filter(status__in=sources).update(
+            status=status, updated_at=timezone.now()
+        )
+
+    def set_tracking_numbers(self, tracking):
+        """
+        Assign tracking numbers and mark orders shipped in a single UPDATE.
+
+        ``tracking`` maps order pk to tracking number. Orders outside the
+        queryset or not eligible for shipping are skipped, as are orders
+        already shipped with the same number, so applying a row twice is a
+        no-op. Returns the number of orders updated.
+        """
+        if not tracking:
+            return 0
+        numbers = models.Case(
+            *[
+                models.When(pk=pk, then=models.Value(number))
+                for pk, number in tracking.items()
+            ],
+            output_field=models.CharField(),
+        )
+        return self.filter(
+            pk__in=list(tracking),
+            status__in=self.model.ALLOWED_TRANSITIONS["shipped"] + ("shipped",),
+        ).exclude(status="shipped", tracking_number=numbers).update(
+            tracking_number=numbers,
+            status="shipped",
+            updated_at=timezone.now(),
+        )
+
+
 class Order(TimeStampedModel):
     """Buyer orders."""
 
@@ -19,6 +76,14 @@ class Order(TimeStampedModel):
         ("refunded", "Refunded"),
     )
 
+    # Target status -> statuses an order may be moved from.
+    ALLOWED_TRANSITIONS = {
+        "processing": ("pending",),
+        "shipped": ("pending", "processing"),
+        "delivered": ("shipped",),
+        "cancelled": ("pending", "processing"),
+    }
+
     buyer = models.ForeignKey(
         "users.User",
         on_delete=models.CASCADE,
@@ -37,6 +102,8 @@ class Order(TimeStampedModel):
     # Tracking
     tracking_number = models.CharField(max_length=100, blank=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
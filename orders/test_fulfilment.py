@@ -0,0 +1,224 @@
+"""
+Tests for bulk order fulfilment.
+"""
+
+from django.test import TestCase, Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import User
+from sellers.models import Seller
+from products.models import Product
+from orders.models import Order, OrderItem
+from orders.fulfilment import import_tracking_csv
+
+
+class FulfilmentTestMixin:
+    """Shared fixtures for fulfilment tests."""
+
+    def setUp(self):
+        """Set up a seller, a buyer and a few orders."""
+        self.seller_user = User.objects.create_user(
+            email='seller@test.com',
+            username='seller@test.com',
+            password='testpass123',
+            is_seller=True
+        )
+        self.seller = Seller.objects.get(user=self.seller_user)
+
+        other_user = User.objects.create_user(
+            email='other@test.com',
+            username='other@test.com',
+            password='testpass123',
+            is_seller=True
+        )
+        self.other_seller = Seller.objects.get(user=other_user)
+
+        self.buyer = User.objects.create_user(
+            email='buyer@test.com',
+            username='buyer@test.com',
+            password='testpass123'
+        )
+
+        self.product = Product.objects.create(
+            seller=self.seller,
+            title='Vintage Lamp',
+            description='Brass lamp',
+            price=25,
+            status='published'
+        )
+        self.other_product = Product.objects.create(
+            seller=self.other_seller,
+            title='Old Radio',
+            description='Works',
+            price=40,
+            status='published'
+        )
+
+        self.orders = [self._create_order(self.product) for _ in range(3)]
+        self.other_order = self._create_order(self.other_product)
+
+    def _create_order(self, product, status='pending'):
+        order = Order.objects.create(
+            buyer=self.buyer,
+            status=status,
+            total_price=product.price,
+            shipping_name='Buyer',
+            shipping_address='Street 1',
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=product,
+            quantity=1,
+            price_at_purchase=product.price,
+        )
+        return order
+
+
+class OrderQuerySetTests(FulfilmentTestMixin, TestCase):
+    """Tests for the set-based order transitions."""
+
+    def test_for_seller_only_returns_own_orders(self):
+        """Test that for_seller excludes other sellers' orders."""
+        orders = Order.objects.for_seller(self.seller)
+        self.assertEqual(
+            set(orders.values_list('pk', flat=True)),
+            {order.pk for order in self.orders}
+        )
+
+    def test_transition_uses_single_update(self):
+        """Test that a bulk transition issues one query."""
+        queryset = Order.objects.filter(pk__in=[o.pk for o in self.orders])
+        with CaptureQueriesContext(connection) as ctx:
+            updated = queryset.transition('shipped')
+        self.assertEqual(updated, 3)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_transition_skips_ineligible_orders(self):
+        """Test that orders in a disallowed source status are untouched."""
+        Order.objects.filter(pk=self.orders[0].pk).update(status='cancelled')
+        updated = Order.objects.for_seller(self.seller).transition('shipped')
+        self.assertEqual(updated, 2)
+        self.orders[0].refresh_from_db()
+        self.assertEqual(self.orders[0].status, 'cancelled')
+
+    def test_transition_rejects_unknown_status(self):
+        """Test that unsupported target statuses raise."""
+        with self.assertRaises(ValueError):
+            Order.objects.all().transition('refunded')
+
+    def test_set_tracking_numbers(self):
+        """Test tracking numbers are assigned per order in one update."""
+        tracking = {self.orders[0].pk: 'TRK1', self.orders[1].pk: 'TRK2'}
+        updated = Order.objects.for_seller(self.seller).set_tracking_numbers(tracking)
+        self.assertEqual(updated, 2)
+        self.orders[0].refresh_from_db()
+        self.orders[1].refresh_from_db()
+        self.assertEqual(self.orders[0].tracking_number, 'TRK1')
+        self.assertEqual(self.orders[1].tracking_number, 'TRK2')
+        self.assertEqual(self.orders[0].status, 'shipped')
+
+
+class TrackingImportTests(FulfilmentTestMixin, TestCase):
+    """Tests for the streaming tracking number import."""
+
+    def _csv(self, content):
+        return SimpleUploadedFile('tracking.csv', content.encode(), content_type='text/csv')
+
+    def test_import_updates_own_orders_in_batches(self):
+        """Test that rows are applied and foreign orders skipped."""
+        rows = ['order_id,tracking_number']
+        rows += [f'{order.pk},TRK{order.pk}' for order in self.orders]
+        rows.append(f'{self.other_order.pk},TRKX')
+        result = import_tracking_csv(self.seller, self._csv('\n'.join(rows)), batch_size=2)
+
+        self.assertEqual(result.updated, 3)
+        self.assertEqual(result.skipped, 1)
+        self.other_order.refresh_from_db()
+        self.assertEqual(self.other_order.status, 'pending')
+        self.assertEqual(self.other_order.tracking_number, '')
+
+    def test_import_applies_repeated_orders_once(self):
+        """Test that an identical row in a later batch is a no-op and a changed one corrects."""
+        first, second = self.orders[0].pk, self.orders[1].pk
+        content = (
+            f'order_id,tracking_number\n{first},TRK1\n{second},TRK2\n'
+            f'{first},TRK1\n{second},TRK9\n'
+        )
+        result = import_tracking_csv(self.seller, self._csv(content), batch_size=2)
+
+        self.assertEqual(result.updated, 3)
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(result.errors, [])
+        self.orders[0].refresh_from_db()
+        self.orders[1].refresh_from_db()
+        self.assertEqual(self.orders[0].tracking_number, 'TRK1')
+        self.assertEqual(self.orders[1].tracking_number, 'TRK9')
+
+    def test_import_reports_invalid_rows(self):
+        """Test that malformed rows are skipped with an error."""
+        content = f'order_id,tracking_number\nabc,TRK1\n{self.orders[0].pk},\n'
+        result = import_tracking_csv(self.seller, self._csv(content))
+        self.assertEqual(result.updated, 0)
+        self.assertEqual(result.skipped, 2)
+        self.assertEqual(len(result.errors), 2)
+
+    def test_import_requires_columns(self):
+        """Test that a file without the expected header is rejected."""
+        result = import_tracking_csv(self.seller, self._csv('id,code\n1,TRK1\n'))
+        self.assertEqual(result.updated, 0)
+        self.assertTrue(result.errors)
+
+
+class SellerOrdersViewTests(FulfilmentTestMixin, TestCase):
+    """Tests for the seller fulfilment views."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.seller_user)
+
+    def test_orders_view_lists_own_orders(self):
+        """Test that the queue shows only the seller's orders."""
+        response = self.client.get(reverse('seller_orders'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['orders']), 3)
+        self.assertEqual(response.context['status_counts']['pending'], 3)
+
+    def test_bulk_status_ajax(self):
+        """Test bulk transition endpoint returns counts for AJAX requests."""
+        response = self.client.post(
+            reverse('seller_orders_bulk_status'),
+            {
+                'order_ids': [self.orders[0].pk, self.orders[1].pk, self.other_order.pk],
+                'status': 'shipped',
+            },
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(response.json()['skipped'], 1)
+        self.other_order.refresh_from_db()
+        self.assertEqual(self.other_order.status, 'pending')
+
+    def test_bulk_status_requires_selection(self):
+        """Test that submitting without orders redirects with an error."""
+        response = self.client.post(
+            reverse('seller_orders_bulk_status'), {'status': 'shipped'}
+        )
+        self.assertRedirects(response, reverse('seller_orders'), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.filter(status='shipped').exists())
+
+    def test_tracking_import_view(self):
+        """Test uploading a tracking CSV ships the orders."""
+        content = f'order_id,tracking_number\n{self.orders[0].pk},TRK1\n'
+        response = self.client.post(
+            reverse('seller_orders_tracking_import'),
+            {'tracking_file': SimpleUploadedFile('t.csv', content.encode(), content_type='text/csv')}
+        )
+        self.assertRedirects(response, reverse('seller_orders'), fetch_redirect_response=False)
+        self.orders[0].refresh_from_db()
+        self.assertEqual(self.orders[0].status, 'shipped')
+        self.assertEqual(self.orders[0].tracking_number, 'TRK1')
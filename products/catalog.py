@@ -0,0 +1,59 @@
+"""
+Cached catalog lookups shared by the storefront pages.
+
+Categories and conditions are read on every browse page but change only
+through the admin. They are cached as lists in ``CATALOG_CACHE_ALIAS``,
+a cache every worker process shares, so invalidating on save or delete
+and the scheduler's warm-up job reach all workers, and visitors rarely
+pay for the queries.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ProductCategory, ProductCondition
+
+CATEGORIES_CACHE_KEY = "catalog:categories"
+CONDITIONS_CACHE_KEY = "catalog:conditions"
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_categories():
+    """All product categories, from the cache when possible."""
+    return _cache().get_or_set(
+        CATEGORIES_CACHE_KEY,
+        lambda: list(ProductCategory.objects.all()),
+        settings.CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def get_conditions():
+    """All product conditions, from the cache when possible."""
+    return _cache().get_or_set(
+        CONDITIONS_CACHE_KEY,
+        lambda: list(ProductCondition.objects.all()),
+        settings.CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def warm_catalog_cache():
+    """Re-fill the catalog cache; returns ``(categories, conditions)`` counts."""
+    categories = list(ProductCategory.objects.all())
+    conditions = list(ProductCondition.objects.all())
+    _cache().set_many(
+        {CATEGORIES_CACHE_KEY: categories, CONDITIONS_CACHE_KEY: conditions},
+        settings.CATALOG_CACHE_TIMEOUT,
+    )
+    return len(categories), len(conditions)
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=ProductCondition)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Drop cached lookups when categories or conditions change."""
+    _cache().delete_many([CATEGORIES_CACHE_KEY, CONDITIONS_CACHE_KEY])
@@ -0,0 +1,166 @@
+"""
+Offline placeholder images for products.
+
+Images are drawn with Pillow from the product's title, price and
+category, so generating them needs no network access. Each product's
+file has a fixed path under ``MEDIA_ROOT``, so a file that already
+exists is not drawn again unless ``overwrite`` is set. Batches are
+rendered in one process pool shared by the whole run and recorded with
+one ``bulk_create`` per batch. This is what lets the
+benchmark datasets from ``generate_dataset`` have real image files.
+"""
+
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Product, ProductImage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUBDIR = "products/generated"
+IMAGE_SIZE = (400, 400)
+
+# Background and accent colour per category
+PALETTES = {
+    "Clothing": ((139, 69, 19), (255, 255, 255)),
+    "Furniture": ((101, 67, 33), (240, 230, 200)),
+    "Collectibles": ((212, 175, 55), (30, 30, 30)),
+    "Electronics": ((47, 79, 79), (200, 200, 200)),
+    "Home Décor": ((105, 105, 105), (220, 220, 220)),
+}
+DEFAULT_PALETTE = ((100, 100, 100), (255, 255, 255))
+
+
+def image_payload(product):
+    """Plain, picklable data needed to draw a product's image."""
+    return {
+        "product_id": product.pk,
+        "title": product.title,
+        "price": str(product.price),
+        "category": product.category.name if product.category_id else "",
+    }
+
+
+def payload_path(payload):
+    """Relative path of the image for ``payload``, sharded by product id."""
+    product_id = payload["product_id"]
+    return f"{IMAGE_SUBDIR}/{product_id // 1000:04d}/product_{product_id}.jpg"
+
+
+def _draw_placeholder(payload):
+    from PIL import Image, ImageDraw, ImageFont
+
+    background, accent = PALETTES.get(payload["category"], DEFAULT_PALETTE)
+    width, height = IMAGE_SIZE
+    image = Image.new("RGB", IMAGE_SIZE, background)
+    draw = ImageDraw.Draw(image)
+
+    # Vary the shape by product so a grid of cards is not uniform
+    inset = 90 + payload["product_id"] % 5 * 12
+    draw.rectangle((40, 40, width - 40, height - 40), outline=accent, width=3)
+    if payload["product_id"] % 2:
+        draw.ellipse((inset, inset, width - inset, height - inset), fill=accent)
+    else:
+        draw.rounded_rectangle((inset, inset, width - inset, height - inset), radius=24, fill=accent)
+
+    draw.text((20, 12), payload["title"][:30], fill=accent, font=ImageFont.load_default(size=20))
+    draw.text((20, height - 44), f"${payload['price']}", fill=accent, font=ImageFont.load_default(size=26))
+    return image
+
+
+def render_placeholder(payload, root, overwrite=False):
+    """
+    Draw one product image to ``root`` unless its file already exists
+    and ``overwrite`` is false.
+
+    Module-level so it can run in a worker process. Returns the relative
+    path. The file is written to a temporary name and moved into place,
+    so a partial image is never served.
+    """
+    relative = payload_path(payload)
+    target = Path(root) / relative
+    if target.exists() and not overwrite:
+        return relative
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            _draw_placeholder(payload).save(tmp, "JPEG", quality=85)
+        os.replace(tmp_name, target)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return relative
+
+
+def _render_all(pool, payloads, root, overwrite):
+    count = len(payloads)
+    return list(pool.map(
+        render_placeholder, payloads, [root] * count, [overwrite] * count, chunksize=32,
+    ))
+
+
+def create_placeholder_images(products, max_workers=None, pool=None, overwrite=False):
+    """
+    Draw images for ``products`` and create a ``ProductImage`` for each.
+
+    Rendering uses ``pool`` when given, otherwise a pool of
+    ``max_workers`` processes; with ``max_workers`` of 1 or less
+    everything runs in this process. ``overwrite`` redraws files that
+    already exist. Returns the number of images created.
+    """
+    if max_workers is None:
+        max_workers = settings.PRODUCT_IMAGE_WORKERS
+    root = settings.MEDIA_ROOT
+    payloads = [image_payload(product) for product in products]
+
+    if len(payloads) > 1 and pool is not None:
+        paths = _render_all(pool, payloads, root, overwrite)
+    elif len(payloads) > 1 and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as own_pool:
+            paths = _render_all(own_pool, payloads, root, overwrite)
+    else:
+        paths = [render_placeholder(payload, root, overwrite) for payload in payloads]
+
+    ProductImage.objects.bulk_create([
+        ProductImage(product_id=payload["product_id"], image=path, alt_text=payload["title"], order=0)
+        for payload, path in zip(payloads, paths)
+    ])
+    return len(paths)
+
+
+def create_missing_placeholder_images(products=None, max_workers=None, batch_size=1000, overwrite=False):
+    """
+    Give every product in ``products`` (default: all) without an image a
+    placeholder, in batches of ``batch_size``. One process pool renders
+    every batch. ``overwrite`` redraws files left on disk, e.g. after the
+    image rows were deleted. Returns the number created.
+    """
+    if max_workers is None:
+        max_workers = settings.PRODUCT_IMAGE_WORKERS
+    products = products if products is not None else Product.objects.all()
+    products = products.filter(images__isnull=True).select_related("category").order_by("pk")
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    created = 0
+    last_pk = 0
+    try:
+        while True:
+            batch = list(products.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            created += create_placeholder_images(
+                batch, max_workers=max_workers, pool=pool, overwrite=overwrite,
+            )
+            last_pk = batch[-1].pk
+            logger.info("Created %d placeholder image(s)", created)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return created
@@ -0,0 +1,39 @@
+"""
+Tests for cached catalog lookups.
+"""
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from products.catalog import CATEGORIES_CACHE_KEY, get_categories, warm_catalog_cache
+from products.models import ProductCategory, ProductCondition
+
+
+class CatalogCacheTests(TestCase):
+    """Tests for category/condition caching."""
+
+    def setUp(self):
+        ProductCategory.objects.create(name='Clothing', slug='clothing')
+        ProductCondition.objects.create(name='Good', order=1)
+
+    def test_categories_cached_after_first_read(self):
+        get_categories()
+        with self.assertNumQueries(0):
+            self.assertEqual([c.name for c in get_categories()], ['Clothing'])
+
+    def test_saving_category_invalidates_cache(self):
+        get_categories()
+        ProductCategory.objects.create(name='Books', slug='books')
+        self.assertEqual([c.name for c in get_categories()], ['Books', 'Clothing'])
+
+    def test_warm_fills_cache(self):
+        self.assertEqual(warm_catalog_cache(), (1, 1))
+        with self.assertNumQueries(0):
+            get_categories()
+
+    @override_settings(CATALOG_CACHE_ALIAS='shared')
+    def test_lookups_use_shared_cache(self):
+        """Test lookups live in the cross-process cache, not per-process memory."""
+        get_categories()
+        self.assertIsNotNone(caches['shared'].get(CATEGORIES_CACHE_KEY))
+        self.assertIsNone(caches['default'].get(CATEGORIES_CACHE_KEY))
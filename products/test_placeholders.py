@@ -0,0 +1,81 @@
+"""
+Tests for offline placeholder images.
+"""
+
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from products.models import Product, ProductCategory, ProductCondition, ProductImage
+from products import placeholders
+from products.placeholders import create_missing_placeholder_images
+from sellers.models import Seller
+from users.models import User
+
+
+class PlaceholderImageTests(TestCase):
+    """Tests for drawing placeholder images and recording them."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = User.objects.create_user(
+            email='seller@test.com', username='seller@test.com',
+            password='testpass123', is_seller=True,
+        )
+        seller = Seller.objects.get(user=user)
+        category = ProductCategory.objects.create(name='Clothing', slug='clothing')
+        condition = ProductCondition.objects.create(name='Good')
+        self.products = Product.objects.bulk_create(
+            Product(
+                seller=seller, title=f'Jacket {i}', description='Leather', price=40,
+                category=category, condition=condition,
+            )
+            for i in range(3)
+        )
+
+    def test_images_are_drawn_and_recorded(self):
+        self.assertEqual(create_missing_placeholder_images(max_workers=1), 3)
+        image = ProductImage.objects.get(product=self.products[0])
+        path = Path(self.media_root) / image.image.name
+        self.assertTrue(path.read_bytes().startswith(b'\xff\xd8'))
+        self.assertEqual(image.alt_text, 'Jacket 0')
+
+    def test_products_with_images_are_skipped(self):
+        create_missing_placeholder_images(max_workers=1)
+        self.assertEqual(create_missing_placeholder_images(max_workers=1), 0)
+        self.assertEqual(ProductImage.objects.count(), 3)
+
+    def test_process_pool_rendering(self):
+        self.assertEqual(create_missing_placeholder_images(max_workers=2, batch_size=2), 3)
+        for image in ProductImage.objects.all():
+            self.assertTrue((Path(self.media_root) / image.image.name).exists())
+
+    def test_one_pool_for_all_batches(self):
+        first = self.products[0]
+        Product.objects.create(
+            seller=first.seller, title='Jacket 3', description='Leather', price=40,
+            category=first.category, condition=first.condition,
+        )
+        with mock.patch.object(
+            placeholders, 'ProcessPoolExecutor', wraps=placeholders.ProcessPoolExecutor,
+        ) as pool_class:
+            self.assertEqual(create_missing_placeholder_images(max_workers=2, batch_size=2), 4)
+        pool_class.assert_called_once_with(max_workers=2)
+
+    def test_command_replaces_images(self):
+        create_missing_placeholder_images(max_workers=1)
+        path = Path(self.media_root) / ProductImage.objects.get(product=self.products[0]).image.name
+        path.write_bytes(b'stale')
+        call_command('create_better_product_images', '--replace', '--workers=1', stdout=StringIO())
+        self.assertEqual(ProductImage.objects.count(), 3)
+        self.assertTrue(path.read_bytes().startswith(b'\xff\xd8'))
@@ -11,6 +11,7 @@ from django.http import JsonResponse, HttpResponseForbidden
 from django.core.paginator import Paginator
 from django.db.models import Q
 
+from .catalog import get_categories, get_conditions
 from .models import Product, ProductImage
 from .forms import ProductForm, ProductImageForm, BulkProductImageForm
 from sellers.models import Seller
@@ -286,7 +287,11 @@ def product_public_detail_view(request, product_id):
     Public product detail page (for buyers).
     Shows product images, description, price, seller info, and related products.
     """
-    product = get_object_or_404(Product, id=product_id, status='published')
+    product = get_object_or_404(
+        Product.objects.select_related('seller', 'category', 'condition'),
+        id=product_id,
+        status='published',
+    )
     
     # Get product images
     images = product.images.all().order_by('order')
@@ -296,6 +301,8 @@ def product_public_detail_view(request, product_id):
         product.seller.products
         .filter(status='published')
         .exclude(id=product.id)
+        .select_related('category', 'condition')
+        .prefetch_related('images')
         .order_by('-created_at')[:6]
     )
     
@@ -324,7 +331,11 @@ def category_products_view(request, category_id):
     sort_by = request.GET.get('sort', '-created_at')
     
     # Start with published products in this category
-    products = Product.objects.filter(status='published', category=category)
+    products = (
+        Product.objects.filter(status='published', category=category)
+        .select_related('seller', 'condition')
+        .prefetch_related('images')
+    )
     
     # Apply search
     if search_query:
@@ -349,8 +360,7 @@ def category_products_view(request, category_id):
     page_obj = paginator.get_page(page_number)
     
     # Get conditions for filter
-    from .models import ProductCondition
-    conditions = ProductCondition.objects.all()
+    conditions = get_conditions()
     
     context = {
         'category': category,
@@ -377,8 +387,12 @@ def products_browse_view(request):
     condition_filter = request.GET.get('condition')
     sort_by = request.GET.get('sort', '-created_at')
     
-    # Start with published products
-    products = Product.objects.filter(status='published')
+    # Start with published products (with everything the cards render)
+    products = (
+        Product.objects.filter(status='published')
+        .select_related('seller', 'category', 'condition')
+        .prefetch_related('images')
+    )
     
     # Apply search
     if search_query:
@@ -407,9 +421,8 @@ def products_browse_view(request):
     page_obj = paginator.get_page(page_number)
     
     # Get unique categories and conditions for filters
-    from .models import ProductCategory, ProductCondition
-    categories = ProductCategory.objects.all()
-    conditions = ProductCondition.objects.all()
+    categories = get_categories()
+    conditions = get_conditions()
     
     context = {
         'page_obj': page_obj,
@@ -192,3 +192,56 @@ class SellerAccountSettingsForm(forms.ModelForm):
         if commit:
             seller.save()
         return seller
+
+
+class OrderBulkStatusForm(forms.Form):
+    """Form for applying a status transition to many orders at once."""
+
+    STATUS_CHOICES = [
+        ('processing', 'Processing'),
+        ('shipped', 'Shipped'),
+        ('delivered', 'Delivered'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    order_ids = forms.Field(widget=forms.MultipleHiddenInput)
+    status = forms.ChoiceField(
+        choices=STATUS_CHOICES,
+        widget=forms.Select(attrs={
+            'class': 'px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500'
+        })
+    )
+
+    def clean_order_ids(self):
+        """Validate that at least one numeric order id was selected."""
+        order_ids = self.cleaned_data.get('order_ids') or []
+        try:
+            order_ids = {int(order_id) for order_id in order_ids}
+        except (TypeError, ValueError):
+            raise ValidationError('Invalid order selection.')
+        if not order_ids:
+            raise ValidationError('Select at least one order.')
+        return sorted(order_ids)
+
+
+class TrackingImportForm(forms.Form):
+    """Form for uploading a CSV of tracking numbers."""
+
+    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+
+    tracking_file = forms.FileField(
+        widget=forms.FileInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg',
+            'accept': '.csv,text/csv'
+        })
+    )
+
+    def clean_tracking_file(self):
+        """Validate file extension and size."""
+        tracking_file = self.cleaned_data.get('tracking_file')
+        if tracking_file:
+            if not tracking_file.name.lower().endswith('.csv'):
+                raise ValidationError('Please upload a CSV file.')
+            if tracking_file.size > self.MAX_FILE_SIZE:
+                raise ValidationError('File size must be less than 5MB.')
+        return tracking_file
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-19 03:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0003_invoicerun_invoicesequence_and_more'),
+        ('sellers', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sellersubscription',
+            name='billing_plan',
+            field=models.ForeignKey(blank=True, help_text='Plan used for invoicing; falls back to a flat monthly amount', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subscriptions', to='billing.billingplan'),
+        ),
+    ]
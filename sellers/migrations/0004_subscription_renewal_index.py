@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-19 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0003_sellersubscription_billing_plan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sellersubscription',
+            index=models.Index(fields=['status', 'renewal_date'], name='sellers_sel_status_ee1ffb_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@
 Seller profiles and subscription models.
 """
 
+from datetime import timedelta
+
 from django.db import models
 from django.utils import timezone
 from core.models import TimeStampedModel
@@ -65,9 +67,20 @@ class Seller(TimeStampedModel):
         self.save()
 
 
+class SellerSubscriptionQuerySet(models.QuerySet):
+    """Lookups used by the renewal engine."""
+
+    def due(self, today):
+        """Active subscriptions whose renewal date has been reached."""
+        return self.filter(status="active", renewal_date__lte=today)
+
+
 class SellerSubscription(TimeStampedModel):
     """Monthly subscription for sellers."""
 
+    # Length of one billing cycle; renewal_date advances by this much
+    BILLING_CYCLE = timedelta(days=30)
+
     STATUS_CHOICES = (
         ("active", "Active"),
         ("inactive", "Inactive"),
@@ -87,15 +100,41 @@ class SellerSubscription(TimeStampedModel):
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2, default=9.99)
     renewal_date = models.DateField()
+    billing_plan = models.ForeignKey(
+        "billing.BillingPlan",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="subscriptions",
+        help_text="Plan used for invoicing; falls back to a flat monthly amount",
+    )
+
+    objects = SellerSubscriptionQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "renewal_date"]),
+        ]
         verbose_name = "Seller Subscription"
         verbose_name_plural = "Seller Subscriptions"
 
     def __str__(self):
         return f"{self.seller.shop_name} - {self.plan_type} (${self.amount})"
 
+    @classmethod
+    def start(cls, seller, start_date=None):
+        """Create the default monthly subscription for a new seller."""
+        start_date = start_date or timezone.now().date()
+        return cls.objects.create(
+            seller=seller,
+            plan_type="monthly",
+            start_date=start_date,
+            renewal_date=start_date + cls.BILLING_CYCLE,
+            status="active",
+            amount=9.99,
+        )
+
     @property
     def is_active(self):
         """Check if subscription is currently active."""
@@ -5,8 +5,6 @@ Auto-creates Seller profile when a User is created with is_seller=True.
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.utils.timezone import now
-from datetime import timedelta
 from users.models import User
 from .models import Seller, SellerSubscription
 
@@ -26,13 +24,4 @@ def create_seller_profile(sender, instance, created, **kwargs):
             )
             
             # Create initial subscription
-            start_date = now().date()
-            renewal_date = start_date + timedelta(days=30)
-            SellerSubscription.objects.create(
-                seller=seller,
-                plan_type='monthly',
-                start_date=start_date,
-                renewal_date=renewal_date,
-                status='active',
-                amount=9.99
-            )
+            SellerSubscription.start(seller)
@@ -8,7 +8,6 @@ from . import views
 urlpatterns = [
     # Browse shops (public)
     path('', views.shops_browse_view, name='shops_browse'),
-    path('<slug:shop_slug>/', views.shop_detail_view, name='shop_detail'),
     
     # Onboarding
     path('register/', views.seller_register_view, name='seller_register'),
@@ -21,4 +20,12 @@ urlpatterns = [
     
     # Products
     path('products/', views.seller_products_list_view, name='seller_products_list'),
+    
+    # Order fulfilment
+    path('orders/queue/', views.seller_orders_view, name='seller_orders'),
+    path('orders/bulk-status/', views.seller_orders_bulk_status_view, name='seller_orders_bulk_status'),
+    path('orders/import-tracking/', views.seller_orders_tracking_import_view, name='seller_orders_tracking_import'),
+    
+    # Shop pages last so the slug never shadows the paths above
+    path('<slug:shop_slug>/', views.shop_detail_view, name='shop_detail'),
 ]
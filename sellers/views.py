@@ -2,57 +2,69 @@
 Views for seller onboarding, dashboard, and account management.
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import alogin
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
+from django.http import JsonResponse
 from django.db import transaction, models
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
-from datetime import date, timedelta
-from django.utils.timezone import now
 
+from users.hashing import HASHER_BUSY_MESSAGE, HasherBusy, amake_password
 from users.models import User
 from .models import Seller, SellerSubscription
 from .forms import (
     SellerRegistrationForm,
     ShopSetupForm,
     BankDetailsForm,
-    SellerAccountSettingsForm
+    SellerAccountSettingsForm,
+    OrderBulkStatusForm,
+    TrackingImportForm,
 )
 from products.models import Product, ProductCondition
+from orders.models import Order
+from orders.fulfilment import import_tracking_csv
 
 
 @require_http_methods(["GET", "POST"])
-def seller_register_view(request):
+async def seller_register_view(request):
     """
     Step 1: Seller registration.
     Creates user account and redirects to shop setup.
     """
+    status = 200
     if request.method == "POST":
         form = SellerRegistrationForm(request.POST)
-        if form.is_valid():
-            # Create user
-            user = User.objects.create_user(
-                email=form.cleaned_data['email'],
-                username=form.cleaned_data['email'],
-                password=form.cleaned_data['password1'],
-                is_seller=True,
-                is_buyer=False,
-            )
-            
-            # Authenticate and log in
-            user = authenticate(username=form.cleaned_data['email'], password=form.cleaned_data['password1'])
-            login(request, user)
-            
-            # Redirect to shop setup
-            messages.success(request, 'Account created! Now set up your shop.')
-            return redirect('seller_shop_setup')
+        # clean_email queries the database
+        if await sync_to_async(form.is_valid)():
+            try:
+                password = await amake_password(form.cleaned_data['password1'])
+            except HasherBusy:
+                messages.error(request, HASHER_BUSY_MESSAGE)
+                status = 503
+            else:
+                # Create user
+                user = await User.objects.acreate(
+                    email=form.cleaned_data['email'],
+                    username=form.cleaned_data['email'],
+                    password=password,
+                    is_seller=True,
+                    is_buyer=False,
+                )
+                
+                # Log in directly; authenticate() would hash the password again
+                await alogin(request, user, backend='django.contrib.auth.backends.ModelBackend')
+                
+                # Redirect to shop setup
+                messages.success(request, 'Account created! Now set up your shop.')
+                return redirect('seller_shop_setup')
     else:
         form = SellerRegistrationForm()
     
-    return render(request, 'sellers/register.html', {'form': form})
+    return await sync_to_async(render)(request, 'sellers/register.html', {'form': form}, status=status)
 
 
 @login_required
@@ -113,16 +125,7 @@ def seller_bank_details_view(request):
                 
                 # Create initial subscription if doesn't exist
                 if not seller.active_subscription:
-                    start_date = now().date()
-                    renewal_date = start_date + timedelta(days=30)
-                    SellerSubscription.objects.create(
-                        seller=seller,
-                        plan_type='monthly',
-                        start_date=start_date,
-                        renewal_date=renewal_date,
-                        status='active',
-                        amount=9.99
-                    )
+                    SellerSubscription.start(seller)
                 
                 messages.success(request, 'Bank details saved! Your seller account is ready.')
                 return redirect('seller_dashboard')
@@ -153,16 +156,7 @@ def seller_dashboard_view(request):
     
     # If newly created, also create subscription
     if created and not seller.active_subscription:
-        start_date = now().date()
-        renewal_date = start_date + timedelta(days=30)
-        SellerSubscription.objects.create(
-            seller=seller,
-            plan_type='monthly',
-            start_date=start_date,
-            renewal_date=renewal_date,
-            status='active',
-            amount=9.99
-        )
+        SellerSubscription.start(seller)
     
     # Get seller statistics
     total_products = seller.products.count()
@@ -250,7 +244,7 @@ def seller_products_list_view(request):
     # Get filter parameters
     status_filter = request.GET.get('status')
     
-    products = seller.products.all()
+    products = seller.products.prefetch_related('images')
     
     if status_filter and status_filter in ['draft', 'published', 'sold', 'archived']:
         products = products.filter(status=status_filter)
@@ -273,6 +267,120 @@ def seller_products_list_view(request):
     return render(request, 'sellers/products_list.html', context)
 
 
+@login_required
+@require_http_methods(["GET"])
+def seller_orders_view(request):
+    """
+    Fulfilment queue listing orders that contain the seller's products.
+    """
+    if not request.user.is_seller:
+        messages.error(request, 'You are not authorized to access this page.')
+        return redirect('home')
+    
+    seller = get_object_or_404(Seller, user=request.user)
+    
+    orders = Order.objects.for_seller(seller).select_related('buyer')
+    
+    # Count by status in a single aggregate query
+    status_counts = orders.aggregate(
+        all=Count('pk'),
+        **{
+            status: Count('pk', filter=Q(status=status))
+            for status, _ in Order.STATUS_CHOICES
+        }
+    )
+    
+    status_filter = request.GET.get('status')
+    if status_filter in dict(Order.STATUS_CHOICES):
+        orders = orders.filter(status=status_filter)
+    
+    # Pagination
+    paginator = Paginator(orders, 25)
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+    
+    context = {
+        'page_obj': page_obj,
+        'orders': page_obj.object_list,
+        'status_counts': status_counts,
+        'current_status': status_filter or 'all',
+        'bulk_form': OrderBulkStatusForm(),
+        'import_form': TrackingImportForm(),
+        'page_title': 'Orders',
+    }
+    
+    return render(request, 'sellers/orders.html', context)
+
+
+@login_required
+@require_http_methods(["POST"])
+def seller_orders_bulk_status_view(request):
+    """
+    Apply a status transition to the selected orders with a single UPDATE.
+    """
+    if not request.user.is_seller:
+        return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
+    
+    seller = get_object_or_404(Seller, user=request.user)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    form = OrderBulkStatusForm(request.POST)
+    if not form.is_valid():
+        if is_ajax:
+            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect('seller_orders')
+    
+    order_ids = form.cleaned_data['order_ids']
+    new_status = form.cleaned_data['status']
+    updated = (
+        Order.objects.for_seller(seller)
+        .filter(pk__in=order_ids)
+        .transition(new_status)
+    )
+    skipped = len(order_ids) - updated
+    
+    if is_ajax:
+        return JsonResponse({'status': 'success', 'updated': updated, 'skipped': skipped})
+    
+    messages.success(request, f'{updated} order(s) marked as {new_status}.')
+    if skipped:
+        messages.warning(request, f'{skipped} order(s) could not be moved to {new_status}.')
+    return redirect('seller_orders')
+
+
+@login_required
+@require_http_methods(["POST"])
+def seller_orders_tracking_import_view(request):
+    """
+    Import tracking numbers from an uploaded CSV and mark the orders shipped.
+    """
+    if not request.user.is_seller:
+        messages.error(request, 'You are not authorized to access this page.')
+        return redirect('home')
+    
+    seller = get_object_or_404(Seller, user=request.user)
+    
+    form = TrackingImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect('seller_orders')
+    
+    result = import_tracking_csv(seller, form.cleaned_data['tracking_file'])
+    
+    messages.success(request, f'{result.updated} order(s) marked as shipped.')
+    if result.skipped:
+        messages.warning(request, f'{result.skipped} row(s) skipped.')
+    for error in result.errors[:10]:
+        messages.error(request, error)
+    
+    return redirect('seller_orders')
+
+
 @require_http_methods(["GET"])
 def shops_browse_view(request):
     """
@@ -336,7 +444,12 @@ def shop_detail_view(request, shop_slug):
     )
     
     # Get published products for this shop
-    products = seller.products.filter(status='published').order_by('-created_at')
+    products = (
+        seller.products.filter(status='published')
+        .select_related('category', 'condition')
+        .prefetch_related('images')
+        .order_by('-created_at')
+    )
     
     # Pagination
     paginator = Paginator(products, 12)  # 12 products per page
@@ -6,6 +6,7 @@ from django import forms
 from django.contrib.auth import authenticate
 from django.contrib.auth.forms import UserCreationForm, SetPasswordForm
 from django.core.exceptions import ValidationError
+from .hashing import aauthenticate
 from .models import User
 
 
@@ -145,6 +146,28 @@ class UserLoginForm(forms.Form):
         return getattr(self, 'user', None)
 
 
+class AsyncUserLoginForm(UserLoginForm):
+    """
+    Login form for the async login view.
+
+    ``clean()`` only validates the fields; ``aauthenticate()`` checks the
+    password in the hashing pool instead of on the event loop.
+    """
+
+    def clean(self):
+        return self.cleaned_data
+
+    async def aauthenticate(self, request):
+        """Authenticate the cleaned credentials; returns ``True`` on success."""
+        self.user = await aauthenticate(
+            request, self.cleaned_data['email'], self.cleaned_data['password']
+        )
+        if self.user is None:
+            self.add_error(None, 'Invalid email or password.')
+            return False
+        return True
+
+
 class UserPasswordResetForm(forms.Form):
     """Form to request password reset via email."""
 
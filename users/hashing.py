@@ -0,0 +1,117 @@
+"""
+Password hashing off the event loop for the async auth views.
+
+PBKDF2 takes ~100ms of CPU per hash. Django's async auth helpers
+(``acheck_password``, ``aauthenticate``) still hash on the calling
+thread, which under ASGI is the event loop, so one login would stall
+every other request in the worker. Here hashing runs in a small
+per-process ``ThreadPoolExecutor`` (``hashlib`` releases the GIL while
+it hashes), so the loop keeps serving catalogue pages meanwhile.
+
+The pool is bounded: at most ``AUTH_HASHER_THREADS`` hashes run at once
+and at most ``AUTH_HASHER_MAX_QUEUE`` wait behind them. Beyond that
+``HasherBusy`` is raised and the views answer 503 instead of queueing
+work they cannot finish before the client gives up. Only hashing runs in
+the pool; database access stays on Django's own threads.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+from django.contrib.auth.signals import user_login_failed
+
+logger = logging.getLogger(__name__)
+
+HASHER_BUSY_MESSAGE = "We are handling a lot of sign-ins right now. Please try again in a moment."
+
+_executor = None
+_lock = threading.Lock()
+_stats = {"pending": 0, "peak": 0, "completed": 0, "rejected": 0}
+
+
+class HasherBusy(Exception):
+    """The hashing pool and its queue are full."""
+
+
+def _get_executor():
+    # Created lazily so each forked worker builds its own threads
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.AUTH_HASHER_THREADS, thread_name_prefix="password-hasher"
+            )
+        return _executor
+
+
+async def run_hasher(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` in the hashing pool and return its result."""
+    executor = _get_executor()
+    with _lock:
+        if _stats["pending"] >= settings.AUTH_HASHER_THREADS + settings.AUTH_HASHER_MAX_QUEUE:
+            _stats["rejected"] += 1
+            logger.warning("Password hasher queue full (%d pending)", _stats["pending"])
+            raise HasherBusy
+        _stats["pending"] += 1
+        _stats["peak"] = max(_stats["peak"], _stats["pending"])
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+    finally:
+        with _lock:
+            _stats["pending"] -= 1
+            _stats["completed"] += 1
+
+
+def hasher_metrics():
+    """Current queue depth and counters for this process's hashing pool."""
+    with _lock:
+        pending = _stats["pending"]
+        return {
+            "threads": settings.AUTH_HASHER_THREADS,
+            "in_flight": min(pending, settings.AUTH_HASHER_THREADS),
+            "queue_depth": max(pending - settings.AUTH_HASHER_THREADS, 0),
+            "peak_pending": _stats["peak"],
+            "completed": _stats["completed"],
+            "rejected": _stats["rejected"],
+        }
+
+
+async def amake_password(raw_password):
+    """``make_password`` in the hashing pool."""
+    return await run_hasher(make_password, raw_password)
+
+
+async def acheck_password(user, raw_password):
+    """``user.check_password`` with verification (and any rehash) in the pool."""
+    is_correct, must_update = await run_hasher(verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.password = await amake_password(raw_password)
+        await user.asave(update_fields=["password"])
+    return is_correct
+
+
+async def aauthenticate(request, email, password):
+    """
+    Async equivalent of ``authenticate(username=email, password=password)``
+    for ``ModelBackend``, the only backend this project uses.
+    """
+    User = get_user_model()
+    try:
+        user = await User._default_manager.aget_by_natural_key(email)
+    except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        await amake_password(password)
+    else:
+        if await acheck_password(user, password) and user.is_active:
+            return user
+    await user_login_failed.asend(
+        sender=__name__, credentials={"username": email}, request=request
+    )
+    return None
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_verificationtoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='verificationtoken',
+            name='token',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='verificationtoken',
+            index=models.Index(fields=['user', 'token_type', '-created_at'], name='users_verif_user_id_f522db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationtoken',
+            index=models.Index(fields=['expires_at'], name='users_verif_expires_fe97fb_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='verificationtoken',
+            constraint=models.UniqueConstraint(fields=('token', 'token_type'), name='unique_verification_token'),
+        ),
+    ]
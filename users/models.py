@@ -50,7 +50,7 @@ class VerificationToken(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='verification_tokens')
-    token = models.CharField(max_length=100, unique=True)
+    token = models.CharField(max_length=100)
     token_type = models.CharField(max_length=20, choices=TOKEN_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
@@ -59,6 +59,16 @@ class VerificationToken(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        constraints = [
+            # Also the index behind the (token, token_type) lookups in the views
+            models.UniqueConstraint(
+                fields=['token', 'token_type'], name='unique_verification_token'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'token_type', '-created_at']),
+            models.Index(fields=['expires_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.token_type}"
@@ -75,4 +85,4 @@ class VerificationToken(models.Model):
         """Mark token as used."""
         self.is_used = True
         self.used_at = timezone.now()
-        self.save()
+        self.save(update_fields=["is_used", "used_at"])
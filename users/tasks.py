@@ -0,0 +1,38 @@
+"""
+Scheduled maintenance jobs for users.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import VerificationToken
+
+logger = logging.getLogger(__name__)
+
+
+def prune_verification_tokens(batch_size=None):
+    """
+    Delete verification tokens that are expired or already used.
+
+    Rows are deleted in primary-key chunks of ``batch_size``, each in its
+    own short transaction, so pruning a large backlog never holds locks
+    on the table for long.
+    """
+    batch_size = batch_size or settings.VERIFICATION_TOKEN_PRUNE_BATCH_SIZE
+    prunable = VerificationToken.objects.filter(
+        Q(expires_at__lt=timezone.now()) | Q(is_used=True)
+    ).order_by()
+    deleted = 0
+    while True:
+        ids = list(prunable.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            break
+        count, _ = VerificationToken.objects.filter(pk__in=ids).delete()
+        deleted += count
+        if len(ids) < batch_size:
+            break
+    logger.info("Pruned %d verification token(s)", deleted)
+    return deleted
@@ -0,0 +1,119 @@
+"""
+Tests for password hashing in the async auth views.
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from sellers.models import Seller
+from . import hashing
+
+User = get_user_model()
+
+
+class HashingPoolTests(TestCase):
+    """Tests for the bounded hashing pool."""
+
+    def test_hashes_off_the_calling_thread(self):
+        caller = threading.current_thread().name
+        worker = async_to_sync(hashing.run_hasher)(lambda: threading.current_thread().name)
+        self.assertNotEqual(worker, caller)
+        self.assertTrue(worker.startswith('password-hasher'))
+
+    @override_settings(AUTH_HASHER_THREADS=1, AUTH_HASHER_MAX_QUEUE=1)
+    def test_rejects_when_queue_is_full(self):
+        release = threading.Event()
+
+        async def scenario():
+            first = asyncio.ensure_future(hashing.run_hasher(release.wait))
+            second = asyncio.ensure_future(hashing.run_hasher(release.wait))
+            await asyncio.sleep(0)
+            metrics = hashing.hasher_metrics()
+            try:
+                with self.assertRaises(hashing.HasherBusy):
+                    await hashing.run_hasher(release.wait)
+            finally:
+                release.set()
+                await asyncio.gather(first, second)
+            return metrics
+
+        rejected = hashing.hasher_metrics()['rejected']
+        metrics = async_to_sync(scenario)()
+        self.assertEqual(metrics['in_flight'], 1)
+        self.assertEqual(metrics['queue_depth'], 1)
+        self.assertEqual(hashing.hasher_metrics()['rejected'], rejected + 1)
+        self.assertEqual(hashing.hasher_metrics()['queue_depth'], 0)
+
+    def test_aauthenticate(self):
+        user = User.objects.create_user(
+            email='async@example.com', username='async@example.com', password='TestPass123!'
+        )
+        authenticate = async_to_sync(hashing.aauthenticate)
+        self.assertEqual(authenticate(None, 'async@example.com', 'TestPass123!'), user)
+        self.assertIsNone(authenticate(None, 'async@example.com', 'wrong'))
+        self.assertIsNone(authenticate(None, 'missing@example.com', 'TestPass123!'))
+
+        user.is_active = False
+        user.save()
+        self.assertIsNone(authenticate(None, 'async@example.com', 'TestPass123!'))
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_outdated_hash_is_upgraded(self):
+        user = User.objects.create_user(
+            email='upgrade@example.com', username='upgrade@example.com'
+        )
+        user.password = make_password('TestPass123!', hasher='pbkdf2_sha256')
+        user.save()
+        self.assertTrue(async_to_sync(hashing.acheck_password)(user, 'TestPass123!'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('md5$'))
+
+
+class AsyncAuthViewTests(TestCase):
+    """Tests for the async login and registration views."""
+
+    def test_login(self):
+        User.objects.create_user(
+            email='login@example.com', username='login@example.com',
+            password='TestPass123!', email_verified=True,
+        )
+        response = self.client.post(
+            reverse('login'), {'email': 'login@example.com', 'password': 'TestPass123!'}
+        )
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+        self.assertIn('_auth_user_id', self.client.session)
+
+    def test_login_busy_returns_503(self):
+        User.objects.create_user(
+            email='busy@example.com', username='busy@example.com', password='TestPass123!'
+        )
+        with patch('users.hashing.run_hasher', side_effect=hashing.HasherBusy):
+            response = self.client.post(
+                reverse('login'), {'email': 'busy@example.com', 'password': 'TestPass123!'}
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_seller_registration_hashes_once(self):
+        with patch('users.hashing.make_password', wraps=make_password) as hasher:
+            response = self.client.post(reverse('seller_register'), {
+                'email': 'seller@example.com',
+                'password1': 'TestPass123!',
+                'password2': 'TestPass123!',
+            })
+        self.assertRedirects(response, reverse('seller_shop_setup'), fetch_redirect_response=False)
+        self.assertEqual(hasher.call_count, 1)
+        user = User.objects.get(email='seller@example.com')
+        self.assertTrue(user.check_password('TestPass123!'))
+        self.assertTrue(Seller.objects.filter(user=user).exists())
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
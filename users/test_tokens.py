@@ -4,13 +4,14 @@ Tests for email verification and password reset token flows.
 
 import pytest
 from unittest.mock import patch
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
 
 from .models import VerificationToken
+from .tokens import GENERATORS, check_token, issue_token
 
 User = get_user_model()
 
@@ -116,8 +117,7 @@ class TestEmailVerificationFlow(TestCase):
         self.verify_url_name = 'verify-email'
         self.resend_url = reverse('verify-email-resend')
 
-    @patch('users.views.send_mail')
-    def test_registration_creates_verification_token(self, mock_send_mail):
+    def test_registration_creates_verification_token(self):
         """Test registration creates a verification token."""
         response = self.client.post(reverse('register'), {
             'email': 'newuser@example.com',
@@ -136,6 +136,20 @@ class TestEmailVerificationFlow(TestCase):
         self.assertTrue(token.is_valid())
         self.assertFalse(user.email_verified)
 
+    def test_registration_queues_verification_email(self):
+        """Test the verification email goes to the outbox, not SMTP."""
+        from core.models import OutboxEmail
+
+        self.client.post(reverse('register'), {
+            'email': 'newuser@example.com',
+            'password1': 'SecurePass123!',
+            'password2': 'SecurePass123!',
+            'user_type': 'buyer',
+        })
+        email = OutboxEmail.objects.get(recipient='newuser@example.com')
+        token = VerificationToken.objects.get(user__email='newuser@example.com')
+        self.assertIn(token.token, email.body)
+
     def test_verify_email_with_valid_token(self):
         """Test email verification with valid token."""
         user = User.objects.create_user(
@@ -241,8 +255,7 @@ class TestEmailVerificationFlow(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'users/verify_email_resend.html')
 
-    @patch('users.views.send_mail')
-    def test_resend_verification_email_creates_new_token(self, mock_send_mail):
+    def test_resend_verification_email_creates_new_token(self):
         """Test resending verification email creates a new token."""
         user = User.objects.create_user(
             email='test@example.com',
@@ -262,8 +275,7 @@ class TestEmailVerificationFlow(TestCase):
         self.assertEqual(tokens.count(), 1)
         self.assertTrue(tokens.first().is_valid())
 
-    @patch('users.views.send_mail')
-    def test_resend_verification_email_for_verified_user(self, mock_send_mail):
+    def test_resend_verification_email_for_verified_user(self):
         """Test resending verification email for already verified user."""
         user = User.objects.create_user(
             email='test@example.com',
@@ -322,8 +334,7 @@ class TestPasswordResetFlow(TestCase):
         self.reset_request_url = reverse('password-reset-request')
         self.reset_confirm_url_name = 'password-reset-confirm'
 
-    @patch('users.views.send_mail')
-    def test_password_reset_creates_token(self, mock_send_mail):
+    def test_password_reset_creates_token(self):
         """Test password reset creates a token."""
         response = self.client.post(self.reset_request_url, {
             'email': 'test@example.com'
@@ -416,8 +427,7 @@ class TestPasswordResetFlow(TestCase):
         # Should still be the first password
         self.assertTrue(self.user.check_password('FirstNewPass123!'))
 
-    @patch('users.views.send_mail')
-    def test_password_reset_flow_end_to_end(self, mock_send_mail):
+    def test_password_reset_flow_end_to_end(self):
         """Test complete password reset flow."""
         # 1. Request password reset
         response = self.client.post(self.reset_request_url, {
@@ -495,3 +505,145 @@ class TestTokenExpiration(TestCase):
         )
         
         self.assertTrue(token.is_valid())
+
+
+class PruneVerificationTokensTests(TestCase):
+    """Test the scheduled token cleanup job."""
+
+    def test_removes_expired_and_used_tokens(self):
+        from .tasks import prune_verification_tokens
+
+        user = User.objects.create_user(
+            email='prune@example.com', username='prune@example.com', password='TestPass123!'
+        )
+        now = timezone.now()
+        VerificationToken.objects.create(
+            user=user, token='expired', token_type=VerificationToken.TOKEN_TYPE_EMAIL,
+            expires_at=now - timedelta(hours=1),
+        )
+        VerificationToken.objects.create(
+            user=user, token='used', token_type=VerificationToken.TOKEN_TYPE_EMAIL,
+            expires_at=now + timedelta(hours=1), is_used=True,
+        )
+        VerificationToken.objects.create(
+            user=user, token='live', token_type=VerificationToken.TOKEN_TYPE_EMAIL,
+            expires_at=now + timedelta(hours=1),
+        )
+        self.assertEqual(prune_verification_tokens(), 2)
+        self.assertEqual(list(VerificationToken.objects.values_list('token', flat=True)), ['live'])
+
+    def test_deletes_in_chunks(self):
+        from .tasks import prune_verification_tokens
+
+        user = User.objects.create_user(
+            email='chunks@example.com', username='chunks@example.com', password='TestPass123!'
+        )
+        VerificationToken.objects.bulk_create(
+            VerificationToken(
+                user=user, token=f'old-{i}', token_type=VerificationToken.TOKEN_TYPE_EMAIL,
+                expires_at=timezone.now() - timedelta(hours=1),
+            )
+            for i in range(5)
+        )
+        # Per chunk: one SELECT of ids plus the DELETE
+        with self.assertNumQueries(6):
+            self.assertEqual(prune_verification_tokens(batch_size=2), 5)
+        self.assertFalse(VerificationToken.objects.exists())
+
+
+class OutstandingTokenCapTests(TestCase):
+    """Test the per-user cap on unused database tokens."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            email='cap@example.com', username='cap@example.com', password='TestPass123!'
+        )
+
+    @override_settings(VERIFICATION_TOKEN_MAX_OUTSTANDING=3)
+    def test_resend_keeps_only_newest_tokens(self):
+        for _ in range(10):
+            self.client.post(reverse('verify-email-resend'), {'email': self.user.email})
+        tokens = VerificationToken.objects.filter(
+            user=self.user, token_type=VerificationToken.TOKEN_TYPE_EMAIL
+        )
+        self.assertEqual(tokens.count(), 3)
+
+    @override_settings(VERIFICATION_TOKEN_MAX_OUTSTANDING=2)
+    def test_oldest_token_is_invalidated(self):
+        first = issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        second = issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        third = issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        self.assertEqual(check_token(first, VerificationToken.TOKEN_TYPE_PASSWORD), (None, None))
+        self.assertEqual(check_token(second, VerificationToken.TOKEN_TYPE_PASSWORD)[0], self.user)
+        self.assertEqual(check_token(third, VerificationToken.TOKEN_TYPE_PASSWORD)[0], self.user)
+
+    @override_settings(VERIFICATION_TOKEN_MAX_OUTSTANDING=1)
+    def test_cap_is_per_token_type(self):
+        issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        self.assertEqual(VerificationToken.objects.filter(user=self.user).count(), 2)
+
+
+@override_settings(VERIFICATION_TOKEN_MODE='signed')
+class SignedTokenTests(TestCase):
+    """Test stateless signed tokens."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            email='signed@example.com', username='signed@example.com', password='OldPass123!'
+        )
+
+    def test_issue_writes_no_rows(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        self.assertIn('.', token)
+        self.assertFalse(VerificationToken.objects.exists())
+
+    def test_check_reads_only_user_row(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        with self.assertNumQueries(1):
+            user, record = check_token(token, VerificationToken.TOKEN_TYPE_EMAIL)
+        self.assertEqual(user, self.user)
+        self.assertIsNone(record)
+
+    def test_token_types_are_not_interchangeable(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        user, _ = check_token(token, VerificationToken.TOKEN_TYPE_PASSWORD)
+        self.assertIsNone(user)
+
+    def test_verification_link_is_single_use(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        self.client.get(reverse('verify-email', args=[token]))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.email_verified)
+
+        user, _ = check_token(token, VerificationToken.TOKEN_TYPE_EMAIL)
+        self.assertIsNone(user)
+
+    def test_reset_link_dies_with_password_change(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        response = self.client.post(reverse('password-reset-confirm', args=[token]), {
+            'new_password1': 'NewSecure123!',
+            'new_password2': 'NewSecure123!',
+        })
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('NewSecure123!'))
+
+        user, _ = check_token(token, VerificationToken.TOKEN_TYPE_PASSWORD)
+        self.assertIsNone(user)
+
+    def test_expired_token_rejected(self):
+        generator = GENERATORS[VerificationToken.TOKEN_TYPE_PASSWORD]
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_PASSWORD)
+        later = generator._now() + timedelta(hours=2)
+        with patch.object(type(generator), '_now', return_value=later):
+            user, _ = check_token(token, VerificationToken.TOKEN_TYPE_PASSWORD)
+        self.assertIsNone(user)
+
+    def test_tampered_token_rejected(self):
+        token = issue_token(self.user, VerificationToken.TOKEN_TYPE_EMAIL)
+        for bad in (token[:-1] + ('0' if token[-1] != '0' else '1'), 'abc.def', '!!.1-2'):
+            with self.subTest(token=bad):
+                self.assertEqual(check_token(bad, VerificationToken.TOKEN_TYPE_EMAIL), (None, None))
@@ -3,7 +3,6 @@ Tests for user authentication views.
 """
 
 import pytest
-from unittest.mock import patch
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -40,8 +39,7 @@ class TestRegistrationView(TestCase):
         response = self.client.get(self.register_url)
         self.assertEqual(response.status_code, 302)
 
-    @patch('users.views.send_mail')
-    def test_register_valid_submission(self, mock_send_mail):
+    def test_register_valid_submission(self):
         """Test valid registration submission."""
         response = self.client.post(self.register_url, {
             'email': 'newuser@example.com',
@@ -55,8 +53,7 @@ class TestRegistrationView(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(User.objects.filter(email='newuser@example.com').exists())
 
-    @patch('users.views.send_mail')
-    def test_register_creates_buyer(self, mock_send_mail):
+    def test_register_creates_buyer(self):
         """Test registration creates buyer user."""
         self.client.post(self.register_url, {
             'email': 'buyer@example.com',
@@ -69,8 +66,7 @@ class TestRegistrationView(TestCase):
         self.assertTrue(user.is_buyer)
         self.assertFalse(user.is_seller)
 
-    @patch('users.views.send_mail')
-    def test_register_creates_seller(self, mock_send_mail):
+    def test_register_creates_seller(self):
         """Test registration creates seller user."""
         self.client.post(self.register_url, {
             'email': 'seller@example.com',
@@ -83,8 +79,7 @@ class TestRegistrationView(TestCase):
         self.assertFalse(user.is_buyer)
         self.assertTrue(user.is_seller)
 
-    @patch('users.views.send_mail')
-    def test_register_creates_both_buyer_seller(self, mock_send_mail):
+    def test_register_creates_both_buyer_seller(self):
         """Test registration creates both buyer and seller."""
         self.client.post(self.register_url, {
             'email': 'both@example.com',
@@ -127,8 +122,7 @@ class TestRegistrationView(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertFalse(User.objects.filter(email='newuser@example.com').exists())
 
-    @patch('users.views.send_mail')
-    def test_register_email_not_verified_initially(self, mock_send_mail):
+    def test_register_email_not_verified_initially(self):
         """Test newly registered user email is not verified."""
         self.client.post(self.register_url, {
             'email': 'newuser@example.com',
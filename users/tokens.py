@@ -0,0 +1,140 @@
+"""
+Email verification and password reset tokens.
+
+Two interchangeable modes, selected with ``VERIFICATION_TOKEN_MODE``:
+
+``"db"``
+    A random token stored as a ``VerificationToken`` row and marked used
+    once redeemed. At most ``VERIFICATION_TOKEN_MAX_OUTSTANDING`` unused
+    tokens of each type are kept per user.
+
+``"signed"``
+    A stateless HMAC token (``<uidb64>.<timestamp>-<hash>``) built like
+    Django's ``PasswordResetTokenGenerator``. Nothing is written when it
+    is issued and checking it reads only the user row. The hash covers
+    the user state the token is meant to change (password hash and last
+    login for resets, verification status and email for verification),
+    so redeeming a token invalidates it without storing anything.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.utils.crypto import constant_time_compare, get_random_string
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import base36_to_int, urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils import timezone
+
+from .models import User, VerificationToken
+
+TOKEN_LIFETIMES = {
+    VerificationToken.TOKEN_TYPE_EMAIL: timedelta(hours=24),
+    VerificationToken.TOKEN_TYPE_PASSWORD: timedelta(hours=1),
+}
+
+
+class ExpiringTokenGenerator(PasswordResetTokenGenerator):
+    """``PasswordResetTokenGenerator`` with a per-generator lifetime."""
+
+    lifetime = None
+
+    def check_token(self, user, token):
+        if not (user and token):
+            return False
+        try:
+            ts_b36, _ = token.split("-")
+            ts = base36_to_int(ts_b36)
+        except ValueError:
+            return False
+
+        for secret in [self.secret, *self.secret_fallbacks]:
+            if constant_time_compare(self._make_token_with_timestamp(user, ts, secret), token):
+                break
+        else:
+            return False
+        return self._num_seconds(self._now()) - ts <= self.lifetime.total_seconds()
+
+
+class PasswordResetTokens(ExpiringTokenGenerator):
+    key_salt = "users.tokens.PasswordResetTokens"
+    lifetime = TOKEN_LIFETIMES[VerificationToken.TOKEN_TYPE_PASSWORD]
+
+    def _make_hash_value(self, user, timestamp):
+        login_timestamp = user.last_login.replace(microsecond=0, tzinfo=None) if user.last_login else ""
+        return f"{user.pk}{user.password}{login_timestamp}{timestamp}{user.email}"
+
+
+class EmailVerificationTokens(ExpiringTokenGenerator):
+    key_salt = "users.tokens.EmailVerificationTokens"
+    lifetime = TOKEN_LIFETIMES[VerificationToken.TOKEN_TYPE_EMAIL]
+
+    def _make_hash_value(self, user, timestamp):
+        return f"{user.pk}{user.email}{user.email_verified}{timestamp}"
+
+
+GENERATORS = {
+    VerificationToken.TOKEN_TYPE_EMAIL: EmailVerificationTokens(),
+    VerificationToken.TOKEN_TYPE_PASSWORD: PasswordResetTokens(),
+}
+
+
+def issue_token(user, token_type):
+    """Create a token of ``token_type`` for ``user`` and return its URL-safe string."""
+    if settings.VERIFICATION_TOKEN_MODE == "signed":
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        return f"{uidb64}.{GENERATORS[token_type].make_token(user)}"
+
+    # Cap outstanding tokens so repeated resends cannot grow the table;
+    # the newest links stay valid.
+    keep = max(settings.VERIFICATION_TOKEN_MAX_OUTSTANDING - 1, 0)
+    stale = list(
+        VerificationToken.objects.filter(user=user, token_type=token_type, is_used=False)
+        .order_by("-created_at")
+        .values_list("pk", flat=True)[keep:]
+    )
+    if stale:
+        VerificationToken.objects.filter(pk__in=stale).delete()
+
+    token = get_random_string(50)
+    VerificationToken.objects.create(
+        user=user,
+        token=token,
+        token_type=token_type,
+        expires_at=timezone.now() + TOKEN_LIFETIMES[token_type],
+    )
+    return token
+
+
+def check_token(token, token_type):
+    """
+    Validate a token string.
+
+    Returns ``(user, record)`` where ``record`` is the ``VerificationToken``
+    in database mode and ``None`` for signed tokens, or ``(None, None)``
+    if the token is invalid, expired or already used.
+    """
+    if "." in token:
+        uidb64, signed = token.split(".", 1)
+        try:
+            user = User.objects.get(pk=force_str(urlsafe_base64_decode(uidb64)))
+        except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+            return None, None
+        if GENERATORS[token_type].check_token(user, signed):
+            return user, None
+        return None, None
+
+    record = (
+        VerificationToken.objects.select_related("user")
+        .filter(token=token, token_type=token_type)
+        .first()
+    )
+    if record is None or not record.is_valid():
+        return None, None
+    return record.user, record
+
+
+def redeem(record):
+    """Mark a database token used; signed tokens are invalidated by the state change."""
+    if record is not None:
+        record.mark_used()
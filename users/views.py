@@ -2,52 +2,71 @@
 User authentication views (registration, login, logout, password reset).
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import alogin, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_protect
-from django.utils.crypto import get_random_string
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from django.urls import reverse
 
+from core.mail import queue_email
+from core.ratelimit import ratelimit
 from .models import User, VerificationToken
+from .hashing import HASHER_BUSY_MESSAGE, HasherBusy, run_hasher
+from .tokens import check_token, issue_token, redeem
 from .forms import (
     UserRegistrationForm,
-    UserLoginForm,
+    AsyncUserLoginForm,
     UserPasswordResetForm,
     UserPasswordSetForm,
     UserPasswordChangeForm,
 )
 from django.utils import timezone
-from datetime import timedelta
+
+
+async def _arender(request, template_name, context, status=200):
+    # Templates read request.user, which queries the database
+    return await sync_to_async(render)(request, template_name, context, status=status)
+
+
+@transaction.atomic
+def _save_new_user(user):
+    user.save()
+    # Queued in the same transaction; delivered by the outbox sender
+    send_verification_email(user)
 
 
 @csrf_protect
 @require_http_methods(["GET", "POST"])
-def register_view(request):
+async def register_view(request):
     """Register a new user (buyer or seller)."""
-    if request.user.is_authenticated:
+    if (await request.auser()).is_authenticated:
         return redirect('home')
     
+    status = 200
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
-        if form.is_valid():
-            user = form.save(commit=False)
-            # Set email as not verified initially
-            user.email_verified = False
-            user.save()
-            
-            # Send verification email
-            send_verification_email(user)
-            
-            messages.success(
-                request,
-                f'Account created! Check your email at {user.email} to verify your account.'
-            )
-            return redirect('login')
+        if await sync_to_async(form.is_valid)():
+            try:
+                # save(commit=False) hashes the password without touching the database
+                user = await run_hasher(form.save, commit=False)
+            except HasherBusy:
+                messages.error(request, HASHER_BUSY_MESSAGE)
+                status = 503
+            else:
+                # Set email as not verified initially
+                user.email_verified = False
+                await sync_to_async(_save_new_user)(user)
+                
+                messages.success(
+                    request,
+                    f'Account created! Check your email at {user.email} to verify your account.'
+                )
+                return redirect('login')
         else:
             for field, errors in form.errors.items():
                 for error in errors:
@@ -59,19 +78,27 @@ def register_view(request):
         'form': form,
         'page_title': 'Register',
     }
-    return render(request, 'users/register.html', context)
+    return await _arender(request, 'users/register.html', context, status=status)
 
 
 @csrf_protect
 @require_http_methods(["GET", "POST"])
-def login_view(request):
+@ratelimit("login")
+async def login_view(request):
     """Login user."""
-    if request.user.is_authenticated:
+    if (await request.auser()).is_authenticated:
         return redirect('home')
     
+    status = 200
     if request.method == 'POST':
-        form = UserLoginForm(request.POST)
-        if form.is_valid():
+        form = AsyncUserLoginForm(request.POST)
+        try:
+            authenticated = form.is_valid() and await form.aauthenticate(request)
+        except HasherBusy:
+            messages.error(request, HASHER_BUSY_MESSAGE)
+            authenticated = False
+            status = 503
+        if authenticated:
             user = form.get_user()
             
             # Check if email is verified
@@ -82,7 +109,7 @@ def login_view(request):
                 )
                 return redirect('verify-email-resend')
             
-            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            await alogin(request, user, backend='django.contrib.auth.backends.ModelBackend')
             
             # Redirect to next page or home
             next_url = request.GET.get('next', 'home')
@@ -92,13 +119,13 @@ def login_view(request):
             for error in form.non_field_errors():
                 messages.error(request, error)
     else:
-        form = UserLoginForm()
+        form = AsyncUserLoginForm()
     
     context = {
         'form': form,
         'page_title': 'Login',
     }
-    return render(request, 'users/login.html', context)
+    return await _arender(request, 'users/login.html', context, status=status)
 
 
 @require_http_methods(["GET"])
@@ -112,6 +139,7 @@ def logout_view(request):
 
 @csrf_protect
 @require_http_methods(["GET", "POST"])
+@ratelimit("password_reset")
 def password_reset_request_view(request):
     """Request password reset via email."""
     if request.user.is_authenticated:
@@ -145,28 +173,18 @@ def password_reset_request_view(request):
 @require_http_methods(["GET", "POST"])
 def password_reset_confirm_view(request, token):
     """Confirm password reset with token."""
-    try:
-        token_obj = VerificationToken.objects.get(
-            token=token,
-            token_type=VerificationToken.TOKEN_TYPE_PASSWORD
-        )
-    except VerificationToken.DoesNotExist:
-        messages.error(request, 'Invalid or expired password reset link.')
-        return redirect('password-reset-request')
-    
-    if not token_obj.is_valid():
+    user, token_obj = check_token(token, VerificationToken.TOKEN_TYPE_PASSWORD)
+    if user is None:
         messages.error(request, 'Invalid or expired password reset link.')
         return redirect('password-reset-request')
     
-    user = token_obj.user
-    
     if request.method == 'POST':
         form = UserPasswordSetForm(user, request.POST)
         if form.is_valid():
             form.save()
             
-            # Mark token as used
-            token_obj.mark_used()
+            # Mark token as used (signed tokens die with the old password hash)
+            redeem(token_obj)
             
             messages.success(request, 'Your password has been reset. Please login.')
             return redirect('login')
@@ -183,27 +201,18 @@ def password_reset_confirm_view(request, token):
 @require_http_methods(["GET", "POST"])
 def verify_email_view(request, token):
     """Verify email with token."""
-    try:
-        token_obj = VerificationToken.objects.get(
-            token=token,
-            token_type=VerificationToken.TOKEN_TYPE_EMAIL
-        )
-    except VerificationToken.DoesNotExist:
-        messages.error(request, 'Invalid or expired verification link.')
-        return redirect('home')
-    
-    if not token_obj.is_valid():
+    user, token_obj = check_token(token, VerificationToken.TOKEN_TYPE_EMAIL)
+    if user is None:
         messages.error(request, 'Invalid or expired verification link.')
         return redirect('home')
     
     # Mark email as verified
-    user = token_obj.user
     user.email_verified = True
     user.email_verified_at = timezone.now()
-    user.save()
+    user.save(update_fields=['email_verified', 'email_verified_at'])
     
-    # Mark token as used
-    token_obj.mark_used()
+    # Mark token as used (signed tokens die with the email_verified change)
+    redeem(token_obj)
     
     messages.success(request, 'Email verified! You can now login.')
     return redirect('login')
@@ -211,6 +220,7 @@ def verify_email_view(request, token):
 
 @csrf_protect
 @require_http_methods(["GET", "POST"])
+@ratelimit("verify_email_resend")
 def verify_email_resend_view(request):
     """Resend email verification."""
     if request.method == 'POST':
@@ -265,17 +275,10 @@ def account_settings_view(request):
 # Email Sending Utilities
 # ============================================================================
 
+@transaction.atomic
 def send_verification_email(user):
-    """Send email verification link to user."""
-    token = get_random_string(50)
-    
-    # Create token in database
-    VerificationToken.objects.create(
-        user=user,
-        token=token,
-        token_type=VerificationToken.TOKEN_TYPE_EMAIL,
-        expires_at=timezone.now() + timedelta(hours=24)
-    )
+    """Create a verification token and queue the link email to the user."""
+    token = issue_token(user, VerificationToken.TOKEN_TYPE_EMAIL)
     
     verification_url = f"{settings.SITE_DOMAIN}/auth/verify-email/{token}/"
     
@@ -295,29 +298,13 @@ Best regards,
 Vintage Shop Team
     """
     
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-    except Exception as e:
-        print(f"Error sending verification email: {e}")
+    queue_email(user.email, subject, message)
 
 
+@transaction.atomic
 def send_password_reset_email(user):
-    """Send password reset link to user."""
-    token = get_random_string(50)
-    
-    # Create token in database
-    VerificationToken.objects.create(
-        user=user,
-        token=token,
-        token_type=VerificationToken.TOKEN_TYPE_PASSWORD,
-        expires_at=timezone.now() + timedelta(hours=1)
-    )
+    """Create a password reset token and queue the link email to the user."""
+    token = issue_token(user, VerificationToken.TOKEN_TYPE_PASSWORD)
     
     reset_url = f"{settings.SITE_DOMAIN}/auth/reset-password/{token}/"
     
@@ -337,13 +324,4 @@ Best regards,
 Vintage Shop Team
     """
     
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-    except Exception as e:
-        print(f"Error sending password reset email: {e}")
+    queue_email(user.email, subject, message)